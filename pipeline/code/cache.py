@@ -0,0 +1,242 @@
+"""Content-addressed cache for preprocess.py outputs.
+
+The key is a SHA-256 over the input bytes plus every setting that changes the encoded bytes
+(encoder version, output format, shard count, loaded preprocessor). An entry is a directory (or
+S3 prefix) `<root>/<key>/` holding one sub-directory per output channel and a `manifest.json`
+that is written last, so a half-written entry is never treated as a hit. A fetch that finds a
+listed file gone (e.g. removed by a concurrent evict) is a miss too. Entries are evicted
+least-recently-used first once the cache exceeds its size budget.
+
+`store` snapshots every file under the output directories, so the caller empties them before
+writing (preprocess.reset_output_dirs) and stale files of an earlier run never get cached.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Iterable
+
+MANIFEST_NAME = "manifest.json"
+_HASH_BLOCK_BYTES = 8 * 1024 * 1024
+
+
+def content_key(paths: Iterable[Path], settings: dict[str, object]) -> str:
+    digest = hashlib.sha256()
+    digest.update(json.dumps(settings, sort_keys=True).encode("utf-8"))
+    for path in paths:
+        digest.update(f"\0{path.stat().st_size}\0".encode("utf-8"))
+        with path.open("rb") as f:
+            while block := f.read(_HASH_BLOCK_BYTES):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def _output_files(outputs: dict[str, Path]) -> dict[str, list[Path]]:
+    return {
+        name: sorted(p for p in directory.rglob("*") if p.is_file())
+        for name, directory in outputs.items()
+    }
+
+
+def _new_manifest(key: str, files: dict[str, list[Path]], outputs: dict[str, Path]) -> dict:
+    now = time.time()
+    return {
+        "key": key,
+        "created": now,
+        "last_used": now,
+        "bytes": sum(p.stat().st_size for paths in files.values() for p in paths),
+        "files": {
+            name: [p.relative_to(outputs[name]).as_posix() for p in paths]
+            for name, paths in files.items()
+        },
+    }
+
+
+def _discard(paths: list[Path], key: str, error: Exception) -> bool:
+    """Undo a partial fetch; returns False, the miss the caller then recomputes."""
+    for path in paths:
+        path.unlink(missing_ok=True)
+    print(f"Output cache entry {key} is incomplete ({error}); treating it as a miss.")
+    return False
+
+
+def _link_or_copy(source: Path, target: Path) -> None:
+    # formats.write_matrix replaces files instead of truncating them, so a hard-linked output
+    # that is later rewritten never changes the cached copy.
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.unlink(missing_ok=True)
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+
+class LocalCache:
+    """Cache rooted at a local (or mounted) directory.
+
+    Entries are stored as copies; hits are hard-linked into the outputs when on the same device.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+
+    def __str__(self) -> str:
+        return str(self.root)
+
+    def _manifest(self, key: str) -> dict | None:
+        path = self.root / key / MANIFEST_NAME
+        if not path.is_file():
+            return None
+        return json.loads(path.read_text(encoding="utf-8"))
+
+    def _write_manifest(self, key: str, manifest: dict) -> None:
+        path = self.root / key / MANIFEST_NAME
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+        tmp_path.replace(path)
+
+    def fetch(self, key: str, outputs: dict[str, Path]) -> bool:
+        manifest = self._manifest(key)
+        if manifest is None or set(manifest["files"]) != set(outputs):
+            return False
+        fetched: list[Path] = []
+        try:
+            for name, relative_paths in manifest["files"].items():
+                for relative in relative_paths:
+                    fetched.append(outputs[name] / relative)
+                    _link_or_copy(self.root / key / name / relative, fetched[-1])
+        except OSError as exc:
+            return _discard(fetched, key, exc)
+        manifest["last_used"] = time.time()
+        self._write_manifest(key, manifest)
+        return True
+
+    def store(self, key: str, outputs: dict[str, Path]) -> None:
+        files = _output_files(outputs)
+        entry = self.root / key
+        shutil.rmtree(entry, ignore_errors=True)
+        for name, paths in files.items():
+            for path in paths:
+                target = entry / name / path.relative_to(outputs[name])
+                target.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(path, target)
+        self._write_manifest(key, _new_manifest(key, files, outputs))
+
+    def entries(self) -> list[dict]:
+        if not self.root.is_dir():
+            return []
+        manifests = (self._manifest(entry.name) for entry in self.root.iterdir() if entry.is_dir())
+        return [manifest for manifest in manifests if manifest is not None]
+
+    def remove(self, key: str) -> None:
+        shutil.rmtree(self.root / key, ignore_errors=True)
+
+
+class S3Cache:
+    """Cache rooted at an S3 prefix (`s3://bucket/prefix`)."""
+
+    def __init__(self, uri: str, s3_client) -> None:
+        bucket, _, prefix = uri[len("s3://") :].partition("/")
+        self.uri = uri.rstrip("/")
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.s3 = s3_client
+
+    def __str__(self) -> str:
+        return self.uri
+
+    def _key(self, *parts: str) -> str:
+        return "/".join(part for part in (self.prefix, *parts) if part)
+
+    def _manifest(self, key: str) -> dict | None:
+        try:
+            response = self.s3.get_object(Bucket=self.bucket, Key=self._key(key, MANIFEST_NAME))
+        except self.s3.exceptions.NoSuchKey:
+            return None
+        return json.loads(response["Body"].read())
+
+    def _write_manifest(self, key: str, manifest: dict) -> None:
+        self.s3.put_object(
+            Bucket=self.bucket,
+            Key=self._key(key, MANIFEST_NAME),
+            Body=json.dumps(manifest, indent=2).encode("utf-8"),
+            ContentType="application/json",
+        )
+
+    def fetch(self, key: str, outputs: dict[str, Path]) -> bool:
+        manifest = self._manifest(key)
+        if manifest is None or set(manifest["files"]) != set(outputs):
+            return False
+        from botocore.exceptions import ClientError
+
+        fetched: list[Path] = []
+        try:
+            for name, relative_paths in manifest["files"].items():
+                for relative in relative_paths:
+                    fetched.append(outputs[name] / relative)
+                    fetched[-1].parent.mkdir(parents=True, exist_ok=True)
+                    self.s3.download_file(
+                        self.bucket, self._key(key, name, relative), str(fetched[-1])
+                    )
+        except (ClientError, OSError) as exc:
+            return _discard(fetched, key, exc)
+        manifest["last_used"] = time.time()
+        self._write_manifest(key, manifest)
+        return True
+
+    def store(self, key: str, outputs: dict[str, Path]) -> None:
+        files = _output_files(outputs)
+        for name, paths in files.items():
+            for path in paths:
+                relative = path.relative_to(outputs[name]).as_posix()
+                self.s3.upload_file(str(path), self.bucket, self._key(key, name, relative))
+        self._write_manifest(key, _new_manifest(key, files, outputs))
+
+    def entries(self) -> list[dict]:
+        manifests = []
+        paginator = self.s3.get_paginator("list_objects_v2")
+        root = self._key("") + "/" if self.prefix else ""
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=root, Delimiter="/"):
+            for common_prefix in page.get("CommonPrefixes", []):
+                manifest = self._manifest(common_prefix["Prefix"][len(root) :].rstrip("/"))
+                if manifest is not None:
+                    manifests.append(manifest)
+        return manifests
+
+    def remove(self, key: str) -> None:
+        paginator = self.s3.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self._key(key) + "/"):
+            objects = [{"Key": item["Key"]} for item in page.get("Contents", [])]
+            if objects:
+                self.s3.delete_objects(Bucket=self.bucket, Delete={"Objects": objects})
+
+
+def open_cache(uri: str, s3_client=None) -> LocalCache | S3Cache:
+    if uri.startswith("s3://"):
+        if s3_client is None:
+            import boto3
+
+            s3_client = boto3.client("s3")
+        return S3Cache(uri, s3_client)
+    return LocalCache(Path(uri))
+
+
+def evict(cache: LocalCache | S3Cache, max_bytes: int, keep: str = "") -> list[str]:
+    """Drop least-recently-used entries (never `keep`) until the cache fits in `max_bytes`."""
+    entries = sorted(cache.entries(), key=lambda manifest: manifest["last_used"])
+    total = sum(manifest["bytes"] for manifest in entries)
+    evicted = []
+    for manifest in entries:
+        if total <= max_bytes:
+            break
+        if manifest["key"] == keep:
+            continue
+        cache.remove(manifest["key"])
+        total -= manifest["bytes"]
+        evicted.append(manifest["key"])
+    return evicted
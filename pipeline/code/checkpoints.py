@@ -0,0 +1,151 @@
+"""Periodic model checkpoints for train.py, and resuming from the newest valid one.
+
+Checkpoints of one run live in `<root>/<key>/checkpoint-<rounds>.json`, where the key covers the
+train channel content and every parameter that changes the trees, so a run never resumes from a
+checkpoint of other data or settings. Each checkpoint is the booster in JSON, written under a
+temporary name, fsynced and renamed, so a reader (or the SageMaker sync of /opt/ml/checkpoints to
+S3) never sees half a file as a checkpoint. Only the newest `keep` checkpoints are kept.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import tempfile
+from pathlib import Path
+
+import xgboost as xgb
+
+from cache import content_key
+
+DEFAULT_CHECKPOINT_DIR = Path("/opt/ml/checkpoints")
+_CHECKPOINT_NAME = re.compile(r"checkpoint-(\d+)\.json")
+_PARTIAL_PREFIX = ".checkpoint-"
+
+
+def checkpoint_name(rounds: int) -> str:
+    return f"checkpoint-{rounds:06d}.json"
+
+
+def run_directory(root: Path, files: list[Path], settings: dict[str, object]) -> Path:
+    """`<root>/<key>` for a run over the train `files` with the tree-changing `settings`."""
+    return root / content_key(files, {**settings, "xgboost": xgb.__version__})[:16]
+
+
+def list_checkpoints(directory: Path) -> list[tuple[int, Path]]:
+    """(rounds, path) of every checkpoint file in `directory`, oldest first."""
+    if not directory.is_dir():
+        return []
+    found = []
+    for path in directory.iterdir():
+        match = _CHECKPOINT_NAME.fullmatch(path.name)
+        if match and path.is_file():
+            found.append((int(match.group(1)), path))
+    return sorted(found)
+
+
+def save_checkpoint(directory: Path, booster: xgb.Booster, keep: int) -> Path:
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / checkpoint_name(booster.num_boosted_rounds())
+    fd, partial = tempfile.mkstemp(dir=directory, prefix=_PARTIAL_PREFIX, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(booster.save_raw("json"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(partial, path)
+    finally:
+        Path(partial).unlink(missing_ok=True)
+    for _, old in list_checkpoints(directory)[:-keep]:
+        old.unlink(missing_ok=True)
+    return path
+
+
+def latest_checkpoint(directory: Path, max_rounds: int) -> tuple[xgb.Booster, int] | None:
+    """Newest checkpoint of at most `max_rounds` rounds that loads and holds the rounds its name
+    says, with that round count.
+
+    Checkpoints that fail either check (e.g. truncated by an interrupted upload) are skipped, and
+    leftover temporary files of an interrupted write are removed.
+    """
+    if directory.is_dir():
+        for partial in directory.glob(f"{_PARTIAL_PREFIX}*.tmp"):
+            partial.unlink(missing_ok=True)
+    for rounds, path in reversed(list_checkpoints(directory)):
+        if rounds > max_rounds:
+            continue
+        try:
+            booster = xgb.Booster(model_file=bytearray(path.read_bytes()))
+        except (OSError, xgb.core.XGBoostError) as exc:
+            print(f"Skipping unreadable checkpoint {path}: {str(exc).splitlines()[0]}")
+            continue
+        if booster.num_boosted_rounds() != rounds:
+            print(f"Skipping checkpoint {path}: it holds {booster.num_boosted_rounds()} rounds.")
+            continue
+        return booster, rounds
+    return None
+
+
+def resume_training(
+    params: dict[str, object],
+    dtrain: xgb.DMatrix,
+    evals: list[tuple[xgb.DMatrix, str]],
+    num_round: int,
+    callbacks: list[xgb.callback.TrainingCallback],
+    booster: xgb.Booster | None = None,
+    start_round: int = 0,
+    interval: int = 0,
+) -> tuple[xgb.Booster, dict[str, dict[str, list[float]]]]:
+    """xgb.train's loop, continuing `booster` at round `start_round` up to `num_round` rounds;
+    returns the booster and the eval history of the rounds trained here.
+
+    xgb.train numbers the rounds of a continued model from 0 again, so with seed_per_iteration
+    the resumed rounds would redraw the row samples of the first rounds, and the log would count
+    from 0. Here every round keeps its own number. A resumed run also starts from a learner
+    rebuilt from the checkpoint JSON, which drops the updater's sampling state; so with `interval`
+    the uninterrupted run rebuilds its learner the same way every `interval` rounds, and a run
+    resumed from any checkpoint grows the same trees as one never interrupted, subsample < 1
+    included.
+    """
+    cache = [dtrain] + [matrix for matrix, _ in evals]
+    booster = _rebuild(params, cache, booster)
+    container = xgb.callback.CallbackContainer([*callbacks, xgb.callback.EvaluationMonitor()])
+    booster = container.before_training(booster)
+    for iteration in range(start_round, num_round):
+        if container.before_iteration(booster, iteration, dtrain, evals):
+            break
+        booster.update(dtrain, iteration=iteration)
+        if container.after_iteration(booster, iteration, dtrain, evals):
+            break
+        if interval and (iteration + 1) % interval == 0:
+            booster = _rebuild(params, cache, booster)
+    booster = container.after_training(booster)
+    return booster.copy(), dict(container.history)
+
+
+def _rebuild(
+    params: dict[str, object],
+    cache: list[xgb.DMatrix],
+    booster: xgb.Booster | None,
+) -> xgb.Booster:
+    """A learner over `cache` holding `booster`'s trees, as latest_checkpoint loads them."""
+    if booster is not None:
+        booster = xgb.Booster(model_file=bytearray(booster.save_raw("json")))
+    return xgb.Booster(params, cache, model_file=booster)
+
+
+class CheckpointCallback(xgb.callback.TrainingCallback):
+    """Saves the booster every `interval` boosted rounds, counting rounds of a resumed model."""
+
+    def __init__(self, directory: Path, interval: int, keep: int) -> None:
+        if interval < 1 or keep < 1:
+            raise ValueError(f"Need interval >= 1 and keep >= 1, got {interval} and {keep}")
+        self._directory = directory
+        self._interval = interval
+        self._keep = keep
+        super().__init__()
+
+    def after_iteration(self, model: xgb.Booster, epoch: int, evals_log: dict) -> bool:
+        if model.num_boosted_rounds() % self._interval == 0:
+            save_checkpoint(self._directory, model, self._keep)
+        return False
@@ -0,0 +1,119 @@
+"""Stratified k-fold cross-validation over one quantized training matrix.
+
+splits assigns every row to a fold. All folds train on the same QuantileDMatrix, so
+the features are quantized once: a fold's held-out rows get weight 0 rather than being sliced
+out, which drops their gradients from every histogram without copying the matrix. Folds run in
+a process pool forked from the process that built the matrix, so the workers share it
+(copy-on-write) and each sets only its own weight vector. Without a pool the folds set the
+weights of `matrix` itself, so build it for cross-validation only.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import xgboost as xgb
+
+from metrics import calibration_metrics, classification_metrics, confusion_matrix, ranking_metrics
+
+FOLD_METRICS = ("accuracy", "precision", "recall", "f1", "roc_auc", "pr_auc", "log_loss", "brier")
+
+# (matrix, fold of every row) of the parent; forked workers inherit them.
+_SHARED: tuple[xgb.DMatrix, np.ndarray] | None = None
+
+
+def fold_metrics(labels: np.ndarray, scores: np.ndarray, threshold: float = 0.5) -> dict:
+    metrics = classification_metrics(confusion_matrix(labels, scores, threshold))
+    ranking = ranking_metrics(labels, scores)
+    calibration = calibration_metrics(labels, scores)
+    metrics.update(
+        roc_auc=ranking["roc_auc"],
+        pr_auc=ranking["pr_auc"],
+        log_loss=calibration["log_loss"],
+        brier=calibration["brier"],
+    )
+    return {name: metrics[name] for name in FOLD_METRICS}
+
+
+def _train_fold(
+    fold: int,
+    params: dict[str, object],
+    rounds: int,
+) -> tuple[int, np.ndarray, int]:
+    matrix, folds = _SHARED
+    held_out = folds == fold
+    matrix.set_weight((~held_out).astype(np.float32))
+    booster = xgb.train(params, matrix, num_boost_round=rounds, verbose_eval=False)
+    # One prediction pass over the shared matrix; only the held-out rows are sent back.
+    scores = booster.predict(matrix)[held_out]
+    return fold, scores, booster.num_boosted_rounds()
+
+
+def cross_validate(
+    params: dict[str, object],
+    matrix: xgb.DMatrix,
+    labels: np.ndarray,
+    folds: np.ndarray,
+    rounds: int,
+    workers: int,
+) -> dict[str, object]:
+    """Per-fold metrics, their mean and std across folds, and metrics of the pooled out-of-fold
+    predictions. `params` carries the per-worker nthread; `folds` holds each row's fold.
+    """
+    global _SHARED
+    sizes = np.bincount(folds)
+    if not sizes.all():
+        raise ValueError(f"Every fold needs rows; fold sizes are {sizes.tolist()}")
+    count = len(sizes)
+    _SHARED = (matrix, folds)
+    pool = None
+    if workers > 1:
+        # fork, not spawn: the workers must inherit _SHARED rather than rebuild the matrix.
+        context = multiprocessing.get_context("fork")
+        pool = ProcessPoolExecutor(max_workers=min(workers, count), mp_context=context)
+    # Fold models must not depend on which worker trained them or on what it trained before.
+    params = {**params, "seed_per_iteration": True}
+    try:
+        if pool is None:
+            results = [_train_fold(fold, params, rounds) for fold in range(count)]
+        else:
+            results = list(pool.map(_train_fold, range(count), [params] * count, [rounds] * count))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        _SHARED = None
+
+    out_of_fold = np.empty(len(labels), dtype=np.float64)
+    per_fold = []
+    for fold, scores, trained in results:
+        held_out = folds == fold
+        out_of_fold[held_out] = scores
+        fold_labels = labels[held_out]
+        per_fold.append(
+            {
+                "fold": fold,
+                "train_rows": int(len(labels) - held_out.sum()),
+                "rows": int(held_out.sum()),
+                "positive_rate": float(fold_labels.mean()),
+                "rounds": trained,
+                "metrics": fold_metrics(fold_labels, scores),
+            }
+        )
+    aggregate = {}
+    for name in FOLD_METRICS:
+        values = np.array([entry["metrics"][name] for entry in per_fold], dtype=np.float64)
+        aggregate[name] = {
+            "mean": float(values.mean()),
+            "std": float(values.std(ddof=1)),
+            "min": float(values.min()),
+            "max": float(values.max()),
+        }
+    return {
+        "folds": count,
+        "rows": int(len(labels)),
+        "per_fold": per_fold,
+        "aggregate": aggregate,
+        "out_of_fold": fold_metrics(labels, out_of_fold),
+    }
@@ -1,43 +1,394 @@
 #!/usr/bin/env python3
-"""Evaluate Titanic XGBoost model and emit SageMaker pipeline-compatible evaluation.json."""
+"""Evaluate Titanic XGBoost model and emit SageMaker pipeline-compatible evaluation.json.
+
+csv and parquet features are read into a C-contiguous float32 array and scored with
+`Booster.inplace_predict`, without building a DMatrix; libsvm and dmatrix channels keep the
+DMatrix readers the training container uses. evaluation.json records the seconds spent on each
+phase under `timings`.
+
+With --chunk-rows the validation channel is read, predicted and scored one fixed-size block at a
+time (metrics.StreamingMetrics), so peak memory is set by the chunk size, not the file size.
+The AUCs are then read from a score histogram and reported as `roc_auc_binned` and
+`pr_auc_binned`; the ROC-AUC gate needs the exact value and is rejected in that mode.
+"""
 
 from __future__ import annotations
 
 import argparse
-import csv
+import hashlib
 import json
+import os
+import shutil
+import sys
 import tarfile
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Iterator
 
+import numpy as np
 import xgboost as xgb
 
+# upsert_pipeline mounts the shared pipeline modules here; locally they sit next to this script.
+SHARED_CODE_DIR = Path("/opt/ml/processing/input/shared")
+sys.path.append(str(SHARED_CODE_DIR))
+
+from features import EMBARKED_MAP, FEATURE_COLUMNS, SEX_MAP  # noqa: E402
+from formats import OUTPUT_FORMATS, channel_files, iter_matrix_chunks, read_matrix  # noqa: E402
+from metrics import (  # noqa: E402
+    BOOTSTRAP_METHODS,
+    DEFAULT_CALIBRATION_BINS,
+    DEFAULT_CURVE_POINTS,
+    DEFAULT_SCORE_BINS,
+    THRESHOLD_METRICS,
+    StreamingMetrics,
+    as_labels,
+    bootstrap_intervals,
+    calibration_metrics,
+    classification_metrics,
+    confusion_matrix,
+    merge_sliced_confusion,
+    ranking_metrics,
+    sliced_confusion,
+    sweep_ranking,
+)
+
+# Built-in XGBoost commonly stores model as xgboost-model; earlier names take precedence.
+MODEL_FILE_NAMES = ("xgboost-model", "model.json", "xgboost-model.json")
+DEFAULT_MODEL_CACHE_DIR = Path("/tmp/model_cache")
+# --model-artifact is reported as this model; --compare-models are compared against it.
+CANDIDATE = "candidate"
+# Categorical feature columns evaluation metrics can be sliced by; "Pclass*Sex" crosses two.
+SLICE_COLUMNS = ("Pclass", "Sex", "SibSp", "Parch", "Embarked")
+CATEGORY_NAMES = {
+    "Sex": {code: name for name, code in SEX_MAP.items()},
+    "Embarked": {code: name for name, code in EMBARKED_MAP.items()},
+}
+_DIGEST_BLOCK_BYTES = 8 * 1024 * 1024
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser()
     parser.add_argument("--model-artifact", default="/opt/ml/processing/model/model.tar.gz")
-    parser.add_argument("--validation", default="/opt/ml/processing/validation/validation_xgb.csv")
+    parser.add_argument(
+        "--compare-models",
+        nargs="*",
+        default=[],
+        metavar="NAME=ARTIFACT",
+        help=(
+            "Other model artifacts, or directories holding a single *.tar.gz (e.g. "
+            "champion=/opt/ml/processing/champion), scored on the same validation matrix; "
+            "evaluation.json gets a comparison section."
+        ),
+    )
+    parser.add_argument(
+        "--model-cache-dir",
+        default=str(DEFAULT_MODEL_CACHE_DIR),
+        help="Extracted model files, one directory per artifact SHA-256.",
+    )
+    parser.add_argument(
+        "--validation",
+        default="/opt/ml/processing/validation/validation_xgb.csv",
+        help="Validation channel file, or a directory of sharded part files.",
+    )
+    parser.add_argument("--validation-format", choices=OUTPUT_FORMATS, default="csv")
     parser.add_argument("--accuracy-threshold", type=float, default=0.78)
+    parser.add_argument(
+        "--roc-auc-threshold",
+        type=float,
+        default=0.0,
+        help="Minimum exact ROC-AUC for thresholds.passed (0 disables the check).",
+    )
+    parser.add_argument(
+        "--optimize-metric",
+        choices=THRESHOLD_METRICS,
+        default="f1",
+        help="Metric maximized by best_threshold in the threshold sweep.",
+    )
+    parser.add_argument(
+        "--curve-points",
+        type=int,
+        default=DEFAULT_CURVE_POINTS,
+        help="Thresholds kept in the downsampled ROC/PR curves of evaluation.json.",
+    )
+    parser.add_argument(
+        "--calibration-bins",
+        type=int,
+        default=DEFAULT_CALIBRATION_BINS,
+        help="Equal-width probability bins for ECE and the reliability table.",
+    )
+    parser.add_argument(
+        "--chunk-rows",
+        type=int,
+        default=0,
+        help="Stream the validation channel in blocks of this many rows (0: load each file).",
+    )
+    parser.add_argument(
+        "--score-bins",
+        type=int,
+        default=DEFAULT_SCORE_BINS,
+        help="Score histogram bins for the ROC/PR sweep in --chunk-rows mode.",
+    )
+    parser.add_argument(
+        "--nthread",
+        type=int,
+        default=0,
+        help="Threads for DMatrix loading and prediction (0: XGBoost default, all cores).",
+    )
+    parser.add_argument(
+        "--predict-batch-rows",
+        type=int,
+        default=0,
+        help="Rows per inplace_predict call (0: the whole file or chunk in one call).",
+    )
+    parser.add_argument(
+        "--bootstrap-replicates",
+        type=int,
+        default=0,
+        help="Bootstrap replicates for metric confidence intervals (0 disables them).",
+    )
+    parser.add_argument("--bootstrap-method", choices=BOOTSTRAP_METHODS, default="poisson")
+    parser.add_argument("--bootstrap-confidence", type=float, default=0.95)
+    parser.add_argument("--bootstrap-seed", type=int, default=0)
+    parser.add_argument(
+        "--bootstrap-workers",
+        type=int,
+        default=1,
+        help="Processes sharing the bootstrap batches (1: in this process).",
+    )
+    parser.add_argument(
+        "--gate-bound",
+        choices=("point", "lower"),
+        default="point",
+        help="Compare the point estimates or the bootstrap lower bounds against the thresholds.",
+    )
+    parser.add_argument(
+        "--slice-columns",
+        nargs="*",
+        default=[],
+        help=(
+            f"Slices for per-cohort metrics, from {', '.join(SLICE_COLUMNS)}; "
+            "join columns with * to cross them (e.g. Pclass*Sex)."
+        ),
+    )
     parser.add_argument("--output", default="/opt/ml/processing/evaluation/evaluation.json")
-    return parser.parse_args()
-
-
-def read_validation(path: Path) -> tuple[list[int], list[list[float]]]:
-    labels: list[int] = []
-    features: list[list[float]] = []
-    with path.open("r", encoding="utf-8") as f:
-        reader = csv.reader(f)
-        for row in reader:
-            if not row:
-                continue
-            labels.append(int(float(row[0])))
-            features.append([float(v) for v in row[1:]])
-    if not labels:
+    args = parser.parse_args()
+    try:
+        args.slices = parse_slices(args.slice_columns)
+        args.compare = parse_compare_models(args.compare_models)
+    except ValueError as exc:
+        parser.error(str(exc))
+    if args.slices and args.validation_format == "dmatrix":
+        parser.error("--slice-columns needs feature values, which dmatrix buffers do not expose.")
+    if args.roc_auc_threshold and args.chunk_rows:
+        parser.error("--roc-auc-threshold gates on the exact ROC-AUC; drop --chunk-rows.")
+    if args.bootstrap_replicates and args.chunk_rows:
+        parser.error("--bootstrap-replicates needs every score in memory; drop --chunk-rows.")
+    if args.gate_bound == "lower" and not args.bootstrap_replicates:
+        parser.error("--gate-bound lower needs --bootstrap-replicates > 0.")
+    return args
+
+
+def parse_slices(specs: list[str]) -> dict[str, list[int]]:
+    """{slice name: feature column indices} for `--slice-columns` entries like Pclass*Sex."""
+    slices = {}
+    for spec in specs:
+        columns = spec.split("*")
+        unknown = [column for column in columns if column not in SLICE_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unsupported slice column(s) {unknown}; use {SLICE_COLUMNS}")
+        slices[spec] = [FEATURE_COLUMNS.index(column) for column in columns]
+    return slices
+
+
+def parse_compare_models(specs: list[str]) -> dict[str, Path]:
+    """{name: artifact} for `--compare-models` entries of the form NAME=ARTIFACT."""
+    models = {}
+    for spec in specs:
+        name, separator, artifact = spec.partition("=")
+        if not separator or not name or not artifact:
+            raise ValueError(f"--compare-models entries look like NAME=ARTIFACT, got {spec!r}")
+        if name == CANDIDATE or name in models:
+            raise ValueError(f"Model name {name!r} in --compare-models is reserved or repeated")
+        models[name] = Path(artifact)
+    return models
+
+
+def category_label(column: str, value: float) -> str:
+    if np.isnan(value):
+        return "missing"
+    if column in CATEGORY_NAMES:
+        return CATEGORY_NAMES[column].get(value, "unknown")
+    return str(int(value))
+
+
+def slice_report(
+    sliced: dict[str, dict[tuple, dict[str, int]]],
+    slices: dict[str, list[int]],
+) -> dict[str, list[dict[str, object]]]:
+    """evaluation.json `slices`: per group, its column values, samples, confusion and metrics."""
+    report = {}
+    for name, groups in sliced.items():
+        columns = name.split("*")
+        report[name] = [
+            {
+                **{column: category_label(column, value) for column, value in zip(columns, key)},
+                "samples": sum(confusion.values()),
+                "confusion_matrix": confusion,
+                "metrics": classification_metrics(confusion),
+            }
+            for key, confusion in sorted(groups.items())
+        ]
+    return report
+
+
+@contextmanager
+def timed(timings: dict[str, float], phase: str) -> Iterator[None]:
+    """Add the wall time of the block to `timings[phase]`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[phase] = timings.get(phase, 0.0) + time.perf_counter() - start
+
+
+def read_validation(
+    path: Path,
+    fmt: str,
+    nthread: int = 0,
+    as_array: bool = False,
+) -> tuple[np.ndarray, np.ndarray | xgb.DMatrix]:
+    """Labels and features: a float32 array for csv/parquet, a DMatrix for libsvm/dmatrix.
+
+    `as_array` reads libsvm into an array too, for callers that need the feature values.
+    """
+    if fmt == "dmatrix" or (fmt == "libsvm" and not as_array):
+        # Same readers the training container uses, so evaluation sees identical matrices.
+        uri = f"{path}?format=libsvm" if fmt == "libsvm" else str(path)
+        data = xgb.DMatrix(uri, nthread=nthread or None)
+        labels = as_labels(data.get_label())
+    else:
+        label_array, data = read_matrix(path, fmt, dtype=np.float32)
+        labels = as_labels(label_array)
+    if not labels.size:
         raise ValueError(f"No validation rows in {path}")
-    return labels, features
-
-
-def safe_div(num: float, den: float) -> float:
-    return num / den if den else 0.0
+    return labels, data
+
+
+def predict_scores(
+    booster: xgb.Booster,
+    data: np.ndarray | xgb.DMatrix,
+    batch_rows: int = 0,
+) -> np.ndarray:
+    """Scores for a DMatrix, or `inplace_predict` over a float32 array `batch_rows` at a time."""
+    if isinstance(data, xgb.DMatrix):
+        return booster.predict(data)
+    if not batch_rows or batch_rows >= data.shape[0]:
+        return booster.inplace_predict(data)
+    scores = np.empty(data.shape[0], dtype=np.float32)
+    for start in range(0, data.shape[0], batch_rows):
+        stop = start + batch_rows
+        scores[start:stop] = booster.inplace_predict(data[start:stop])
+    return scores
+
+
+def predict_models(
+    boosters: dict[str, xgb.Booster],
+    data: np.ndarray | xgb.DMatrix,
+    batch_rows: int = 0,
+    pool: ThreadPoolExecutor | None = None,
+) -> dict[str, np.ndarray]:
+    """Scores of every model on the same loaded data; XGBoost releases the GIL while predicting."""
+    def predict(booster: xgb.Booster) -> np.ndarray:
+        return predict_scores(booster, data, batch_rows)
+
+    if pool is None or len(boosters) == 1:
+        return {name: predict(booster) for name, booster in boosters.items()}
+    return dict(zip(boosters, pool.map(predict, boosters.values())))
+
+
+def score_validation(
+    boosters: dict[str, xgb.Booster],
+    path: Path,
+    fmt: str,
+    timings: dict[str, float],
+    nthread: int = 0,
+    batch_rows: int = 0,
+    slices: dict[str, list[int]] | None = None,
+    pool: ThreadPoolExecutor | None = None,
+) -> tuple[np.ndarray, dict[str, np.ndarray], dict[str, dict[tuple, dict[str, int]]]]:
+    """Labels, per-model scores and the first model's per-slice confusion, for a file or every
+    part file of a channel; each part is read once for all models."""
+    labels: list[np.ndarray] = []
+    scores: dict[str, list[np.ndarray]] = {name: [] for name in boosters}
+    sliced: dict[str, dict[tuple, dict[str, int]]] = {}
+    for part in channel_files(path, fmt):
+        with timed(timings, "load"):
+            part_labels, data = read_validation(part, fmt, nthread, as_array=bool(slices))
+        with timed(timings, "predict"):
+            part_scores = predict_models(boosters, data, batch_rows, pool)
+        if slices:
+            with timed(timings, "slices"):
+                first = next(iter(part_scores.values()))
+                merge_sliced_confusion(sliced, sliced_confusion(part_labels, first, data, slices))
+        labels.append(part_labels)
+        for name, values in part_scores.items():
+            scores[name].append(values)
+    return (
+        np.concatenate(labels),
+        {name: np.concatenate(values) for name, values in scores.items()},
+        sliced,
+    )
+
+
+def stream_validation(
+    boosters: dict[str, xgb.Booster],
+    path: Path,
+    fmt: str,
+    chunk_rows: int,
+    bins: int,
+    timings: dict[str, float],
+    nthread: int = 0,
+    batch_rows: int = 0,
+    slices: dict[str, list[int]] | None = None,
+    pool: ThreadPoolExecutor | None = None,
+    calibration_bins: int = DEFAULT_CALIBRATION_BINS,
+) -> tuple[dict[str, StreamingMetrics], dict[str, dict[tuple, dict[str, int]]]]:
+    """Predict and score the channel one `chunk_rows` block at a time, for every model."""
+    accumulators = {
+        name: StreamingMetrics(threshold=0.5, bins=bins, calibration_bins=calibration_bins)
+        for name in boosters
+    }
+    sliced: dict[str, dict[tuple, dict[str, int]]] = {}
+    for part in channel_files(path, fmt):
+        if fmt == "dmatrix":
+            # A binary DMatrix buffer can only be loaded whole.
+            with timed(timings, "load"):
+                labels, data = read_validation(part, fmt, nthread)
+            chunks = iter([(labels, data)])
+        else:
+            chunks = iter_matrix_chunks(part, fmt, chunk_rows, dtype=np.float32)
+        while True:
+            with timed(timings, "load"):
+                chunk = next(chunks, None)
+            if chunk is None:
+                break
+            labels, features = as_labels(chunk[0]), chunk[1]
+            with timed(timings, "predict"):
+                scores = predict_models(boosters, features, batch_rows, pool)
+            with timed(timings, "metrics"):
+                for name, values in scores.items():
+                    accumulators[name].update(labels, values)
+            if slices:
+                with timed(timings, "slices"):
+                    first = next(iter(scores.values()))
+                    part_sliced = sliced_confusion(labels, first, features, slices)
+                    merge_sliced_confusion(sliced, part_sliced)
+    if not next(iter(accumulators.values())).samples:
+        raise ValueError(f"No validation rows in {path}")
+    return accumulators, sliced
 
 
 def _is_within_dir(base_dir: Path, target: Path) -> bool:
@@ -50,91 +401,243 @@ def _is_within_dir(base_dir: Path, target: Path) -> bool:
         return False
 
 
-def safe_extract_tar(tar: tarfile.TarFile, extract_dir: Path) -> None:
-    for member in tar.getmembers():
-        member_path = extract_dir / member.name
+def artifact_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as f:
+        while block := f.read(_DIGEST_BLOCK_BYTES):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def extract_model_files(model_artifact: Path, target_dir: Path) -> list[str]:
+    """Stream the archive once, validating every member and writing only MODEL_FILE_NAMES.
+
+    Returns the names of all members seen, for error reporting.
+    """
+    seen = []
+    # "r|gz" reads members strictly in order: one decompression pass, no seeking back.
+    with tarfile.open(model_artifact, "r|gz") as tar:
+        for member in tar:
+            seen.append(member.name)
+            # Block traversal and symlink/hardlink abuse from untrusted archives.
+            if member.issym() or member.islnk():
+                raise ValueError(f"Refusing to extract link entry from archive: {member.name}")
+            if not _is_within_dir(target_dir, target_dir / member.name):
+                raise ValueError(f"Refusing to extract path outside target dir: {member.name}")
+            name = Path(member.name).as_posix()
+            if not member.isfile() or name not in MODEL_FILE_NAMES:
+                continue
+            source = tar.extractfile(member)
+            with source, (target_dir / name).open("wb") as target:
+                shutil.copyfileobj(source, target)
+    return seen
 
-        # Block traversal and symlink/hardlink abuse from untrusted archives.
-        if member.issym() or member.islnk():
-            raise ValueError(f"Refusing to extract link entry from archive: {member.name}")
-        if not _is_within_dir(extract_dir, member_path):
-            raise ValueError(f"Refusing to extract path outside target dir: {member.name}")
 
-    tar.extractall(extract_dir)
+def find_artifact(directory: Path) -> Path:
+    """The single model.tar.gz-style archive a ProcessingInput placed in `directory`."""
+    archives = sorted(directory.glob("*.tar.gz"))
+    if len(archives) != 1:
+        found = sorted(path.name for path in directory.iterdir())
+        raise FileNotFoundError(f"Expected exactly one *.tar.gz in {directory}, found: {found}")
+    return archives[0]
 
 
-def ensure_model_file(model_artifact: Path) -> Path:
+def ensure_model_file(model_artifact: Path, cache_dir: Path = DEFAULT_MODEL_CACHE_DIR) -> Path:
+    """Model file inside `model_artifact`, extracted once per artifact digest under `cache_dir`.
+
+    `model_artifact` may also be a directory holding a single *.tar.gz.
+    """
+    if model_artifact.is_dir():
+        model_artifact = find_artifact(model_artifact)
     if model_artifact.is_file() and model_artifact.suffix == ".json":
         return model_artifact
 
-    extract_dir = Path("/tmp/model_extract")
-    extract_dir.mkdir(parents=True, exist_ok=True)
-
-    with tarfile.open(model_artifact, "r:gz") as tar:
-        safe_extract_tar(tar, extract_dir)
-
-    # Built-in XGBoost commonly stores model as xgboost-model
-    candidates = [
-        extract_dir / "xgboost-model",
-        extract_dir / "model.json",
-        extract_dir / "xgboost-model.json",
-    ]
-    for candidate in candidates:
-        if candidate.exists():
-            return candidate
-
-    found = sorted(str(p) for p in extract_dir.rglob("*") if p.is_file())
-    raise FileNotFoundError(f"Could not find model file in extracted artifact. Found: {found}")
+    entry = cache_dir / artifact_digest(model_artifact)
+    if not entry.is_dir():
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=".extract-", dir=cache_dir))
+        try:
+            seen = extract_model_files(model_artifact, staging)
+            if not any((staging / name).exists() for name in MODEL_FILE_NAMES):
+                raise FileNotFoundError(
+                    f"Could not find model file in extracted artifact. Found: {sorted(seen)}"
+                )
+            try:
+                staging.rename(entry)
+            except OSError:
+                # Another evaluation cached the same artifact first; its copy is identical.
+                if not entry.is_dir():
+                    raise
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    for name in MODEL_FILE_NAMES:
+        if (entry / name).exists():
+            return entry / name
+    raise FileNotFoundError(f"Model cache entry {entry} holds no model file.")
+
+
+def load_booster(model_artifact: Path, cache_dir: Path, nthread: int = 0) -> xgb.Booster:
+    booster = xgb.Booster()
+    booster.load_model(str(ensure_model_file(model_artifact, cache_dir)))
+    if nthread:
+        booster.set_param({"nthread": nthread})
+    return booster
+
+
+def model_metrics(confusion: dict, ranking: dict, binned: bool = False) -> dict[str, float]:
+    metrics = classification_metrics(confusion)
+    # AUCs of a score histogram get their own keys, so nothing mistakes them for exact ones.
+    suffix = "_binned" if binned else ""
+    metrics[f"roc_auc{suffix}"] = ranking["roc_auc"]
+    metrics[f"pr_auc{suffix}"] = ranking["pr_auc"]
+    return metrics
+
+
+def comparison_report(models: dict[str, dict]) -> dict[str, object]:
+    """Per-model metrics plus, for every other model, candidate metric minus its metric."""
+    reference = models[CANDIDATE]["metrics"]
+    return {
+        "reference": CANDIDATE,
+        "models": models,
+        "deltas": {
+            name: {metric: reference[metric] - model["metrics"][metric] for metric in reference}
+            for name, model in models.items()
+            if name != CANDIDATE
+        },
+    }
 
 
 def main() -> None:
     args = parse_args()
 
-    model_path = ensure_model_file(Path(args.model_artifact))
-    labels, features = read_validation(Path(args.validation))
-
-    dmatrix = xgb.DMatrix(features)
-    booster = xgb.Booster()
-    booster.load_model(str(model_path))
-
-    scores = booster.predict(dmatrix)
-
-    tp = tn = fp = fn = 0
-    for score, label in zip(scores, labels):
-        pred = 1 if float(score) >= 0.5 else 0
-        if pred == 1 and label == 1:
-            tp += 1
-        elif pred == 0 and label == 0:
-            tn += 1
-        elif pred == 1 and label == 0:
-            fp += 1
+    artifacts = {CANDIDATE: Path(args.model_artifact), **args.compare}
+    nthread = args.nthread
+    if not nthread and len(artifacts) > 1:
+        # Models predict concurrently; split the cores instead of oversubscribing them.
+        nthread = max(1, (os.cpu_count() or 1) // len(artifacts))
+    timings: dict[str, float] = {}
+    pool = ThreadPoolExecutor(max_workers=len(artifacts))
+    with pool, timed(timings, "load_model"):
+        loaded = pool.map(
+            lambda artifact: load_booster(artifact, Path(args.model_cache_dir), nthread),
+            artifacts.values(),
+        )
+        boosters = dict(zip(artifacts, loaded))
+
+    validation = Path(args.validation)
+    results: dict[str, dict[str, object]] = {}
+    pool = ThreadPoolExecutor(max_workers=len(boosters))
+    with pool:
+        if args.chunk_rows:
+            accumulators, sliced = stream_validation(
+                boosters,
+                validation,
+                args.validation_format,
+                args.chunk_rows,
+                args.score_bins,
+                timings,
+                nthread,
+                args.predict_batch_rows,
+                args.slices,
+                pool,
+                calibration_bins=args.calibration_bins,
+            )
+            with timed(timings, "metrics"):
+                for name, accumulator in accumulators.items():
+                    results[name] = {
+                        "confusion": accumulator.confusion,
+                        "ranking": sweep_ranking(
+                            accumulator.sweep(), args.optimize_metric, args.curve_points
+                        ),
+                        "calibration": accumulator.calibration(),
+                        "samples": accumulator.samples,
+                    }
         else:
-            fn += 1
-
-    total = len(labels)
-    accuracy = safe_div(tp + tn, total)
-    precision = safe_div(tp, tp + fp)
-    recall = safe_div(tp, tp + fn)
-    f1 = safe_div(2 * precision * recall, precision + recall)
+            labels, scores, sliced = score_validation(
+                boosters,
+                validation,
+                args.validation_format,
+                timings,
+                nthread,
+                args.predict_batch_rows,
+                args.slices,
+                pool,
+            )
+            with timed(timings, "metrics"):
+                for name, values in scores.items():
+                    results[name] = {
+                        "confusion": confusion_matrix(labels, values, threshold=0.5),
+                        "ranking": ranking_metrics(
+                            labels, values, args.optimize_metric, args.curve_points
+                        ),
+                        "calibration": calibration_metrics(labels, values, args.calibration_bins),
+                        "samples": int(labels.size),
+                    }
+
+    confusion = results[CANDIDATE]["confusion"]
+    ranking = results[CANDIDATE]["ranking"]
+    binned = bool(args.chunk_rows)
+    metrics = model_metrics(confusion, ranking, binned)
+
+    gate_thresholds = {"accuracy": args.accuracy_threshold}
+    if args.roc_auc_threshold:
+        gate_thresholds["roc_auc"] = args.roc_auc_threshold
+    gated = {name: metrics[name] for name in gate_thresholds}
+    bootstrap = None
+    if args.bootstrap_replicates:
+        with timed(timings, "bootstrap"):
+            bootstrap = bootstrap_intervals(
+                labels,
+                scores[CANDIDATE],
+                threshold=0.5,
+                replicates=args.bootstrap_replicates,
+                confidence=args.bootstrap_confidence,
+                method=args.bootstrap_method,
+                seed=args.bootstrap_seed,
+                workers=args.bootstrap_workers,
+            )
+        if args.gate_bound == "lower":
+            gated = {name: bootstrap["intervals"][name]["lower"] for name in gated}
 
     payload = {
-        "metrics": {
-            "accuracy": accuracy,
-            "precision": precision,
-            "recall": recall,
-            "f1": f1,
-        },
+        "metrics": metrics,
         "thresholds": {
             "accuracy_threshold": args.accuracy_threshold,
-            "passed": accuracy >= args.accuracy_threshold,
-        },
-        "confusion_matrix": {
-            "tp": tp,
-            "tn": tn,
-            "fp": fp,
-            "fn": fn,
+            "roc_auc_threshold": args.roc_auc_threshold,
+            "gate_bound": args.gate_bound,
+            "passed": all(gated[name] >= value for name, value in gate_thresholds.items()),
         },
-        "samples": total,
+        "confusion_matrix": confusion,
+        "samples": results[CANDIDATE]["samples"],
+        "best_threshold": ranking["best_threshold"],
+        "curves": ranking["curves"],
+        "calibration": results[CANDIDATE]["calibration"],
+    }
+    if bootstrap is not None:
+        payload["bootstrap"] = bootstrap
+    if args.slices:
+        payload["slices"] = slice_report(sliced, args.slices)
+    if args.compare:
+        payload["comparison"] = comparison_report(
+            {
+                name: {
+                    "metrics": model_metrics(result["confusion"], result["ranking"], binned),
+                    "confusion_matrix": result["confusion"],
+                    "best_threshold": result["ranking"]["best_threshold"],
+                    "calibration": {
+                        key: value for key, value in result["calibration"].items() if key != "bins"
+                    },
+                }
+                for name, result in results.items()
+            }
+        )
+    if args.chunk_rows:
+        payload["streaming"] = {"chunk_rows": args.chunk_rows, "score_bins": args.score_bins}
+    payload["timings"] = {
+        "nthread": nthread,
+        "predict_batch_rows": args.predict_batch_rows,
+        "seconds": {phase: round(seconds, 4) for phase, seconds in timings.items()},
     }
 
     output_path = Path(args.output)
@@ -142,7 +645,7 @@ def main() -> None:
     output_path.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
 
     print(f"Evaluation written to {output_path}")
-    print(json.dumps(payload, indent=2))
+    print(json.dumps({key: value for key, value in payload.items() if key != "curves"}, indent=2))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,584 @@
+"""Columnar Titanic feature encoder shared by preprocess.py and the local prep scripts.
+
+Input CSVs are tokenized in byte blocks with NumPy (quote-aware), the needed columns are parsed,
+imputed and mapped as whole arrays, and rows are formatted exactly like `csv.writer` would
+format `[label, *features]` lists, so outputs stay byte-identical to the per-row encoder.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, Sequence, TextIO
+
+import numpy as np
+
+from quantiles import (
+    DEFAULT_SKETCH_K,
+    QUANTILE_ESTIMATORS,
+    KllSketch,
+    check_quantile,
+    counts_quantile,
+    exact_quantile,
+)
+
+FEATURE_COLUMNS = ("Pclass", "Sex", "Age", "SibSp", "Parch", "Fare", "Embarked")
+LABEL_COLUMN = "Survived"
+INPUT_COLUMNS = (LABEL_COLUMN, *FEATURE_COLUMNS)
+
+SEX_MAP = {"male": 0.0, "female": 1.0}
+EMBARKED_MAP = {"C": 0.0, "Q": 1.0, "S": 2.0}
+UNKNOWN_CATEGORY = -1.0
+
+INT_DEFAULTS = {"Pclass": 3, "SibSp": 0, "Parch": 0}
+
+# Bump whenever a change alters encoded output bytes; it is part of the preprocess cache key.
+ENCODER_VERSION = 1
+PREPROCESSOR_SCHEMA_VERSION = 1
+PREPROCESSOR_FILE_NAME = "preprocessor.json"
+
+DEFAULT_BLOCK_BYTES = 16 * 1024 * 1024
+
+_QUOTE = ord('"')
+_COMMA = ord(",")
+_NEWLINE = ord("\n")
+
+
+def read_header(stream: BinaryIO) -> list[str]:
+    line = stream.readline()
+    if not line.strip():
+        raise ValueError("Input CSV has no headers.")
+    return next(csv.reader([line.decode("utf-8")]))
+
+
+def iter_row_blocks(stream: BinaryIO, block_bytes: int = DEFAULT_BLOCK_BYTES) -> Iterator[bytes]:
+    """Yield chunks of whole CSV records; a quoted newline never ends a block."""
+    carry = b""
+    while True:
+        chunk = stream.read(block_bytes)
+        if not chunk:
+            break
+        data = carry + chunk
+        cut = _last_record_end(data)
+        if cut < 0:
+            carry = data
+            continue
+        carry = data[cut + 1 :]
+        yield data[: cut + 1]
+    if carry.strip():
+        yield carry if carry.endswith(b"\n") else carry + b"\n"
+
+
+def _last_record_end(data: bytes) -> int:
+    buf = np.frombuffer(data, dtype=np.uint8)
+    newlines = np.flatnonzero(buf == _NEWLINE)
+    if not newlines.size:
+        return -1
+    # A newline ends a record only when an even number of quotes precedes it.
+    quotes = np.flatnonzero(buf == _QUOTE)
+    quotes_before = np.searchsorted(quotes, newlines)
+    outside = newlines[quotes_before % 2 == 0]
+    return int(outside[-1]) if outside.size else -1
+
+
+def parse_block(
+    block: bytes,
+    header: Sequence[str],
+    columns: Iterable[str],
+) -> dict[str, np.ndarray]:
+    """Return the requested columns of one row block as NumPy string arrays.
+
+    Columns missing from the header are omitted from the result. Irregular blocks (blank lines,
+    ragged rows, quotes inside numeric fields) go through the `csv` module instead.
+    """
+    wanted = [(name, header.index(name)) for name in columns if name in header]
+    buf = np.frombuffer(block, dtype=np.uint8)
+    bounds = _field_bounds(buf, len(header))
+    if bounds is None:
+        return _parse_block_with_csv(block, header, wanted)
+
+    starts, ends = bounds
+    parsed: dict[str, np.ndarray] = {}
+    for name, index in wanted:
+        col_starts = starts[:, index]
+        if (buf[col_starts] == _QUOTE).any():
+            return _parse_block_with_csv(block, header, wanted)
+        parsed[name] = _gather_field(buf, col_starts, ends[:, index])
+    return parsed
+
+
+def _field_bounds(buf: np.ndarray, n_fields: int) -> tuple[np.ndarray, np.ndarray] | None:
+    structural = buf == _COMMA
+    structural |= buf == _NEWLINE
+    quotes = buf == _QUOTE
+    if quotes.any():
+        inside = np.logical_xor.accumulate(quotes)
+        structural &= ~inside
+    separators = np.flatnonzero(structural)
+    if not separators.size or separators.size % n_fields:
+        return None
+    ends = separators.reshape(-1, n_fields)
+    if (buf[ends[:, -1]] != _NEWLINE).any() or (buf[ends[:, :-1]] == _NEWLINE).any():
+        return None
+    starts = np.empty_like(separators)
+    starts[0] = 0
+    np.add(separators[:-1], 1, out=starts[1:])
+    return starts.reshape(-1, n_fields), ends
+
+
+def _gather_field(buf: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    lengths = ends - starts
+    # Short fields are padded to 8 bytes so _dictionary_encode can treat them as uint64 keys.
+    width = max(int(lengths.max(initial=0)), 1)
+    width = 8 if width <= 8 else width
+    offsets = np.arange(width)
+    raw = buf.take(starts[:, None] + offsets, mode="clip")
+    raw *= offsets < lengths[:, None]
+    values = np.ascontiguousarray(raw).view(f"S{width}").ravel()
+    if (raw >= 0x80).any():
+        return np.char.decode(values, "utf-8")
+    return values
+
+
+def _parse_block_with_csv(
+    block: bytes,
+    header: Sequence[str],
+    wanted: Sequence[tuple[str, int]],
+) -> dict[str, np.ndarray]:
+    rows = [row for row in csv.reader(io.StringIO(block.decode("utf-8"), newline="")) if row]
+    parsed: dict[str, np.ndarray] = {}
+    for name, index in wanted:
+        if name == LABEL_COLUMN and any(len(row) <= index for row in rows):
+            raise ValueError(f"Missing '{LABEL_COLUMN}' column in row.")
+        parsed[name] = np.array([row[index] if index < len(row) else "" for row in rows], dtype=str)
+    return parsed
+
+
+def iter_column_batches(
+    stream: BinaryIO,
+    columns: Iterable[str] = INPUT_COLUMNS,
+    block_bytes: int = DEFAULT_BLOCK_BYTES,
+) -> Iterator[dict[str, np.ndarray]]:
+    header = read_header(stream)
+    columns = tuple(columns)
+    for block in iter_row_blocks(stream, block_bytes=block_bytes):
+        yield parse_block(block, header, columns)
+
+
+def shard_byte_ranges(path: Path, shards: int) -> list[tuple[int, int]]:
+    """Split the data rows of `path` into up to `shards` contiguous byte ranges.
+
+    Each range starts after the header and ends on a record boundary (a newline outside quotes),
+    so a range can be parsed on its own with `iter_range_blocks`. Empty ranges are dropped.
+    """
+    if shards < 1:
+        raise ValueError(f"shards must be >= 1, got {shards}")
+    with path.open("rb") as f:
+        read_header(f)
+        data_start = f.tell()
+    size = path.stat().st_size
+    if data_start >= size:
+        return []
+    buf = np.memmap(path, dtype=np.uint8, mode="r")
+    boundaries = [data_start]
+    quotes_before = 0
+    scanned = data_start
+    for shard in range(1, shards):
+        target = max(data_start + (size - data_start) * shard // shards, boundaries[-1])
+        quotes_before += _count_quotes(buf, scanned, target)
+        scanned = target
+        boundary = _next_record_start(buf, target, quotes_before % 2 == 1)
+        quotes_before += _count_quotes(buf, scanned, boundary)
+        scanned = boundary
+        boundaries.append(boundary)
+    boundaries.append(size)
+    return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start]
+
+
+_SCAN_BYTES = 1024 * 1024
+
+
+def _count_quotes(buf: np.ndarray, start: int, end: int) -> int:
+    total = 0
+    for offset in range(start, end, DEFAULT_BLOCK_BYTES):
+        window = buf[offset : min(offset + DEFAULT_BLOCK_BYTES, end)]
+        total += int(np.count_nonzero(window == _QUOTE))
+    return total
+
+
+def _next_record_start(buf: np.ndarray, offset: int, in_quotes: bool) -> int:
+    """Offset just past the first record-ending newline at or after `offset`."""
+    while offset < buf.size:
+        window = np.asarray(buf[offset : offset + _SCAN_BYTES])
+        quotes = np.cumsum(window == _QUOTE) + int(in_quotes)
+        ends = np.flatnonzero((window == _NEWLINE) & (quotes % 2 == 0))
+        if ends.size:
+            return offset + int(ends[0]) + 1
+        in_quotes = bool(quotes[-1] % 2)
+        offset += window.size
+    return int(buf.size)
+
+
+class _RangeReader:
+    """Minimal binary reader limited to bytes [start, end) of an open file."""
+
+    def __init__(self, stream: BinaryIO, start: int, end: int) -> None:
+        stream.seek(start)
+        self._stream = stream
+        self._remaining = end - start
+
+    def read(self, size: int) -> bytes:
+        chunk = self._stream.read(min(size, self._remaining))
+        self._remaining -= len(chunk)
+        return chunk
+
+
+def iter_range_columns(
+    path: Path,
+    header: Sequence[str],
+    start: int,
+    end: int,
+    columns: Iterable[str] = INPUT_COLUMNS,
+    block_bytes: int = DEFAULT_BLOCK_BYTES,
+) -> Iterator[dict[str, np.ndarray]]:
+    """Column batches for one `shard_byte_ranges` range of `path`."""
+    columns = tuple(columns)
+    with path.open("rb") as f:
+        reader = _RangeReader(f, start, end)
+        for block in iter_row_blocks(reader, block_bytes=block_bytes):  # type: ignore[arg-type]
+            yield parse_block(block, header, columns)
+
+
+def concat_batches(batches: Sequence[dict[str, np.ndarray]]) -> dict[str, np.ndarray]:
+    if not batches:
+        return {}
+    return {name: np.concatenate([batch[name] for batch in batches]) for name in batches[0]}
+
+
+def batch_rows(batch: dict[str, np.ndarray]) -> int:
+    return len(next(iter(batch.values()))) if batch else 0
+
+
+def read_columns(path: Path, columns: Iterable[str] = INPUT_COLUMNS) -> dict[str, np.ndarray]:
+    with path.open("rb") as f:
+        return read_stream_columns(f, columns, source=str(path))
+
+
+def read_stream_columns(
+    stream: BinaryIO,
+    columns: Iterable[str] = INPUT_COLUMNS,
+    source: str = "<stream>",
+) -> dict[str, np.ndarray]:
+    """`read_columns` for any binary stream, e.g. an S3 object read with s3io.open_s3_stream."""
+    batches = list(iter_column_batches(stream, tuple(columns)))
+    if not batches or not sum(batch_rows(batch) for batch in batches):
+        raise ValueError(f"Input CSV has no rows: {source}")
+    return concat_batches(batches)
+
+
+_HASH_BITS = 16
+_HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _unique_keys(keys: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Distinct uint64 keys and the inverse index, in unspecified order.
+
+    Keys are placed in a 2**16 slot table with a multiplicative hash, which avoids sorting the
+    whole column; only rows whose slot is owned by a different key go through `np.unique`.
+    """
+    if not keys.size:
+        return keys, np.zeros(0, dtype=np.int64)
+    slots = (keys * _HASH_MULTIPLIER) >> np.uint64(64 - _HASH_BITS)
+    owner = np.zeros(1 << _HASH_BITS, dtype=np.int64)
+    owner[slots] = np.arange(keys.size)
+    table = keys[owner]
+    used = np.flatnonzero(np.bincount(slots, minlength=1 << _HASH_BITS))
+    position = np.zeros(1 << _HASH_BITS, dtype=np.int64)
+    position[used] = np.arange(used.size)
+    uniques = table[used]
+    inverse = position[slots]
+
+    collided = np.flatnonzero(table[slots] != keys)
+    if collided.size:
+        extra, extra_inverse = np.unique(keys[collided], return_inverse=True)
+        uniques = np.concatenate([uniques, extra])
+        inverse[collided] = used.size + extra_inverse.ravel()
+    return uniques, inverse
+
+
+def _dictionary_encode(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Return (distinct values, inverse index) so each distinct cell is parsed only once."""
+    if values.dtype.kind == "S" and values.dtype.itemsize == 8:
+        uniques, inverse = _unique_keys(np.ascontiguousarray(values).view(np.uint64))
+        return uniques.view("S8"), inverse
+    uniques, inverse = np.unique(values, return_inverse=True)
+    return uniques, inverse.ravel()
+
+
+def parse_float_column(values: np.ndarray | None, rows: int) -> tuple[np.ndarray, np.ndarray]:
+    """Parse a text column into (values, missing_mask); blank cells are missing."""
+    if values is None:
+        return np.zeros(rows), np.ones(rows, dtype=bool)
+    uniques, inverse = _dictionary_encode(values)
+    stripped = np.char.strip(uniques)
+    missing = stripped == stripped.dtype.type()
+    parsed = np.zeros(len(uniques))
+    parsed[~missing] = stripped[~missing].astype(np.float64)
+    return parsed[inverse], missing[inverse]
+
+
+def parse_int_column(values: np.ndarray | None, rows: int, default: int) -> np.ndarray:
+    """Vectorized `int(float(value))` with `default` for blank cells."""
+    parsed, missing = parse_float_column(values, rows)
+    if not np.isfinite(parsed[~missing]).all():
+        raise ValueError("Cannot convert non-finite value to integer.")
+    # + 0.0 turns the -0.0 that trunc keeps for values in (-1, 0) into the 0.0 int() gives.
+    return np.where(missing, float(default), np.trunc(parsed) + 0.0)
+
+
+def map_category_column(
+    values: np.ndarray | None,
+    rows: int,
+    mapping: dict[str, float],
+    upper: bool = False,
+    unknown: float = UNKNOWN_CATEGORY,
+) -> np.ndarray:
+    if values is None:
+        return np.full(rows, unknown)
+    uniques, inverse = _dictionary_encode(values)
+    normalized = np.char.strip(uniques)
+    normalized = np.char.upper(normalized) if upper else np.char.lower(normalized)
+    codes = [
+        mapping.get(value.decode("utf-8") if isinstance(value, bytes) else value, unknown)
+        for value in normalized.tolist()
+    ]
+    return np.asarray(codes, dtype=np.float64)[inverse]
+
+
+FILL_COLUMNS = ("Age", "Fare")
+DEFAULT_FILL_QUANTILE = 0.5
+
+
+def fill_strategy(
+    quantile: float = DEFAULT_FILL_QUANTILE,
+    estimator: str = "exact",
+    sketch_k: int = DEFAULT_SKETCH_K,
+) -> dict[str, object]:
+    """How Age/Fare fills are fitted: which quantile, exact or KLL-sketched (rank error ~1.65/k)."""
+    check_quantile(quantile)
+    if estimator not in QUANTILE_ESTIMATORS:
+        raise ValueError(f"Unsupported quantile estimator {estimator!r}; use {QUANTILE_ESTIMATORS}")
+    return {"quantile": quantile, "estimator": estimator, "sketch_k": sketch_k}
+
+
+def update_value_counts(counts: dict[float, int], values: np.ndarray, missing: np.ndarray) -> None:
+    uniques, frequencies = np.unique(values[~missing], return_counts=True)
+    for value, frequency in zip(uniques.tolist(), frequencies.tolist()):
+        counts[value] = counts.get(value, 0) + frequency
+
+
+def new_fill_state(
+    strategy: dict[str, object],
+    seed: int = 0,
+) -> dict[str, dict[float, int] | KllSketch]:
+    """Per-column accumulator: exact value counts, or a bounded-memory KLL sketch.
+
+    Sketches that will be merged need distinct seeds (e.g. the shard index), so their random
+    compaction offsets are independent and the merged rank errors cancel instead of adding up.
+    """
+    if strategy["estimator"] == "sketch":
+        k = int(strategy["sketch_k"])
+        return {name: KllSketch(k=k, seed=seed) for name in FILL_COLUMNS}
+    return {name: {} for name in FILL_COLUMNS}
+
+
+def update_fill_state(state: dict, batch: dict[str, np.ndarray]) -> None:
+    rows = batch_rows(batch)
+    for name, accumulator in state.items():
+        values, missing = parse_float_column(batch.get(name), rows)
+        if isinstance(accumulator, KllSketch):
+            accumulator.update(values[~missing])
+        else:
+            update_value_counts(accumulator, values, missing)
+
+
+def merge_fill_state(target: dict, state: dict) -> None:
+    """Fold a shard's accumulators into `target`; counts add, sketches merge."""
+    for name, accumulator in state.items():
+        if isinstance(accumulator, KllSketch):
+            target[name].merge(accumulator)
+            continue
+        counts = target[name]
+        for value, frequency in accumulator.items():
+            counts[value] = counts.get(value, 0) + frequency
+
+
+def fill_state_values(state: dict, strategy: dict[str, object]) -> tuple[float, float]:
+    q = float(strategy["quantile"])
+    fills = [
+        accumulator.quantile(q)
+        if isinstance(accumulator, KllSketch)
+        else counts_quantile(accumulator, q)
+        for accumulator in (state[name] for name in FILL_COLUMNS)
+    ]
+    return fills[0], fills[1]
+
+
+def fill_values(
+    columns: dict[str, np.ndarray],
+    strategy: dict[str, object] | None = None,
+) -> tuple[float, float]:
+    """(age_fill, fare_fill) of in-memory columns; exact fills use O(n) selection."""
+    strategy = strategy or fill_strategy()
+    if strategy["estimator"] == "sketch":
+        state = new_fill_state(strategy)
+        update_fill_state(state, columns)
+        return fill_state_values(state, strategy)
+    rows = batch_rows(columns)
+    q = float(strategy["quantile"])
+    fills = []
+    for name in FILL_COLUMNS:
+        values, missing = parse_float_column(columns.get(name), rows)
+        fills.append(exact_quantile(values[~missing], q))
+    return fills[0], fills[1]
+
+
+def fit_preprocessor(
+    age_fill: float,
+    fare_fill: float,
+    strategy: dict[str, object] | None = None,
+) -> dict[str, object]:
+    """Fitted-preprocessor state: everything `transform_columns` needs besides the input rows."""
+    return {
+        "schema_version": PREPROCESSOR_SCHEMA_VERSION,
+        "feature_columns": list(FEATURE_COLUMNS),
+        "label_column": LABEL_COLUMN,
+        "fills": {"Age": age_fill, "Fare": fare_fill},
+        "fill_strategy": strategy or fill_strategy(),
+        "int_defaults": dict(INT_DEFAULTS),
+        "category_maps": {"Sex": dict(SEX_MAP), "Embarked": dict(EMBARKED_MAP)},
+        "unknown_category": UNKNOWN_CATEGORY,
+    }
+
+
+def write_preprocessor(path: Path, preprocessor: dict[str, object]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.unlink(missing_ok=True)
+    path.write_text(json.dumps(preprocessor, indent=2) + "\n", encoding="utf-8")
+
+
+def read_preprocessor(path: Path) -> dict[str, object]:
+    preprocessor = json.loads(path.read_text(encoding="utf-8"))
+    version = preprocessor.get("schema_version")
+    if version != PREPROCESSOR_SCHEMA_VERSION:
+        raise ValueError(
+            f"Unsupported preprocessor schema_version {version!r} in {path}; "
+            f"expected {PREPROCESSOR_SCHEMA_VERSION}."
+        )
+    if tuple(preprocessor.get("feature_columns", ())) != FEATURE_COLUMNS:
+        raise ValueError(f"Preprocessor {path} was fitted for other feature columns.")
+    return preprocessor
+
+
+def preprocessor_fills(preprocessor: dict[str, object]) -> tuple[float, float]:
+    fills = preprocessor["fills"]
+    return float(fills["Age"]), float(fills["Fare"])
+
+
+def transform_columns(
+    columns: dict[str, np.ndarray],
+    preprocessor: dict[str, object],
+) -> np.ndarray:
+    """Encode a column batch into an (n, 7) float64 matrix in FEATURE_COLUMNS order."""
+    rows = batch_rows(columns)
+    age_fill, fare_fill = preprocessor_fills(preprocessor)
+    defaults = preprocessor["int_defaults"]
+    maps = preprocessor["category_maps"]
+    unknown = float(preprocessor["unknown_category"])
+    age, age_missing = parse_float_column(columns.get("Age"), rows)
+    fare, fare_missing = parse_float_column(columns.get("Fare"), rows)
+    return np.column_stack(
+        [
+            parse_int_column(columns.get("Pclass"), rows, default=defaults["Pclass"]),
+            map_category_column(columns.get("Sex"), rows, maps["Sex"], unknown=unknown),
+            np.where(age_missing, age_fill, age),
+            parse_int_column(columns.get("SibSp"), rows, default=defaults["SibSp"]),
+            parse_int_column(columns.get("Parch"), rows, default=defaults["Parch"]),
+            np.where(fare_missing, fare_fill, fare),
+            map_category_column(
+                columns.get("Embarked"), rows, maps["Embarked"], upper=True, unknown=unknown
+            ),
+        ]
+    )
+
+
+def encode_columns(columns: dict[str, np.ndarray], age_fill: float, fare_fill: float) -> np.ndarray:
+    return transform_columns(columns, fit_preprocessor(age_fill, fare_fill))
+
+
+def labels_from_columns(columns: dict[str, np.ndarray]) -> np.ndarray:
+    values = columns.get(LABEL_COLUMN)
+    if values is None:
+        raise ValueError(f"Missing '{LABEL_COLUMN}' column in row.")
+    return parse_int_column(values, len(values), default=0).astype(np.int64)
+
+
+_SMALL_INT_RANGE = 4096
+
+
+def _is_small_integral(values: np.ndarray, low: float, high: float) -> bool:
+    # An all-inf (or NaN) block has no finite range to index; it takes the generic path.
+    if not (np.isfinite(low) and np.isfinite(high)) or high - low >= _SMALL_INT_RANGE:
+        return False
+    if values.dtype.kind != "f":
+        return True
+    return bool((np.trunc(values) == values).all() and not np.signbit(values[values == 0]).any())
+
+
+def format_column(values: np.ndarray, prefix: str = "") -> list[str]:
+    """Format a column like csv.writer does (str for ints, repr for floats), plus `prefix`."""
+    render = repr if values.dtype.kind == "f" else str
+    if values.size:
+        low, high = values.min(), values.max()
+        if _is_small_integral(values, low, high):
+            # Small integral columns (classes, counts, categories) index a table directly.
+            table = np.arange(int(low), int(high) + 1).astype(values.dtype)
+            text = [prefix + render(value) for value in table.tolist()]
+            return np.asarray(text, dtype=object)[(values - low).astype(np.int64)].tolist()
+    if values.dtype.kind == "f":
+        bits = np.ascontiguousarray(values, dtype=np.float64).view(np.uint64)
+        uniques, inverse = _unique_keys(bits)
+        uniques = uniques.view(np.float64)
+    else:
+        uniques, inverse = np.unique(values, return_inverse=True)
+    text = [prefix + render(value) for value in uniques.tolist()]
+    return np.asarray(text, dtype=object)[inverse.ravel()].tolist()
+
+
+def format_rows(
+    labels: np.ndarray | None,
+    features: np.ndarray | None,
+    separator: str = ",",
+    feature_prefixes: Sequence[str] | None = None,
+) -> str:
+    columns: list[list[str]] = []
+    if labels is not None:
+        columns.append(format_column(labels))
+    if features is not None:
+        prefixes = feature_prefixes or [""] * features.shape[1]
+        columns.extend(
+            format_column(features[:, index], prefix) for index, prefix in enumerate(prefixes)
+        )
+    if not columns or not columns[0]:
+        return ""
+    return "\n".join(map(separator.join, zip(*columns))) + "\n"
+
+
+def format_csv_rows(labels: np.ndarray | None, features: np.ndarray | None) -> str:
+    return format_rows(labels, features)
+
+
+def write_csv_rows(f: TextIO, labels: np.ndarray | None, features: np.ndarray | None) -> None:
+    f.write(format_csv_rows(labels, features))
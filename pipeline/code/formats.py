@@ -0,0 +1,288 @@
+"""Training-channel file formats written by preprocess.py and read back by evaluate.py.
+
+- csv: headerless `label,f0,...,f6` text (SageMaker `text/csv`).
+- libsvm: `label 0:f0 ... 6:f6` text with zero-based indices (`text/libsvm`). Every feature is
+  written, zeros included, because XGBoost treats absent libsvm entries as missing.
+- parquet: `label` column followed by the FEATURE_COLUMNS (`application/x-parquet`); needs pyarrow.
+- dmatrix: XGBoost binary DMatrix buffer; needs xgboost. Only XGBoost itself can read it, so it
+  is meant for script-mode training and evaluation, not for the built-in training container.
+"""
+
+from __future__ import annotations
+
+import io
+import re
+from itertools import islice
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+
+from features import FEATURE_COLUMNS, format_rows
+
+OUTPUT_FORMATS = ("csv", "libsvm", "parquet", "dmatrix")
+FILE_SUFFIXES = {
+    "csv": ".csv",
+    "libsvm": ".libsvm",
+    "parquet": ".parquet",
+    "dmatrix": ".buffer",
+}
+CONTENT_TYPES = {
+    "csv": "text/csv",
+    "libsvm": "text/libsvm",
+    "parquet": "application/x-parquet",
+}
+LABEL_FIELD = "label"
+DEFAULT_CHUNK_ROWS = 65_536
+
+
+def check_format(fmt: str) -> str:
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"Unsupported format {fmt!r}; expected one of {', '.join(OUTPUT_FORMATS)}")
+    return fmt
+
+
+def channel_file_name(stem: str, fmt: str) -> str:
+    return f"{stem}{FILE_SUFFIXES[check_format(fmt)]}"
+
+
+def part_file_name(stem: str, index: int, fmt: str) -> str:
+    """Name of one part file of a sharded channel, e.g. `train_xgb-00000.csv`."""
+    return channel_file_name(f"{stem}-{index:05d}", fmt)
+
+
+def channel_files(path: Path, fmt: str) -> list[Path]:
+    """A single channel file, or every `fmt` file of a channel directory in part order."""
+    if not path.is_dir():
+        return [path]
+    suffix = FILE_SUFFIXES[check_format(fmt)]
+    files = sorted(p for p in path.iterdir() if p.is_file() and p.name.endswith(suffix))
+    if not files:
+        raise FileNotFoundError(f"No {fmt} files in {path}")
+    return files
+
+
+def content_type(fmt: str) -> str:
+    if check_format(fmt) not in CONTENT_TYPES:
+        raise ValueError(
+            f"Format {fmt!r} has no SageMaker content type; the built-in XGBoost container reads "
+            f"only {', '.join(CONTENT_TYPES)}."
+        )
+    return CONTENT_TYPES[fmt]
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise RuntimeError("The parquet format requires pyarrow in this container.") from exc
+    return pa, pq
+
+
+def _import_xgboost():
+    try:
+        import xgboost as xgb
+    except ImportError as exc:
+        raise RuntimeError("The dmatrix format requires xgboost in this container.") from exc
+    return xgb
+
+
+def write_matrix(path: Path, labels: np.ndarray, features: np.ndarray, fmt: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    check_format(fmt)
+    # Replace rather than truncate: the old file may be a hard link into the preprocess cache.
+    path.unlink(missing_ok=True)
+    if fmt in ("csv", "libsvm"):
+        with path.open("w", newline="", encoding="utf-8") as f:
+            f.write(format_text_rows(labels, features, fmt))
+    elif fmt == "parquet":
+        pa, pq = _import_pyarrow()
+        arrays = [pa.array(labels)] + [pa.array(features[:, i]) for i in range(features.shape[1])]
+        table = pa.Table.from_arrays(arrays, names=[LABEL_FIELD, *FEATURE_COLUMNS])
+        pq.write_table(table, str(path))
+    else:
+        xgb = _import_xgboost()
+        xgb.DMatrix(features, label=labels).save_binary(str(path))
+
+
+def format_text_rows(labels: np.ndarray, features: np.ndarray, fmt: str) -> str:
+    if fmt == "libsvm":
+        prefixes = [f"{index}:" for index in range(features.shape[1])]
+        return format_rows(labels, features, separator=" ", feature_prefixes=prefixes)
+    return format_rows(labels, features)
+
+
+def read_matrix(
+    path: Path,
+    fmt: str,
+    dtype: np.dtype = np.float64,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Load (labels, features) as NumPy arrays from a csv, libsvm or parquet channel file.
+
+    Features come back C-contiguous in `dtype`; float32 is what XGBoost predicts on, so a
+    float32 matrix goes to `Booster.inplace_predict` without another copy.
+    """
+    check_format(fmt)
+    if fmt == "csv":
+        data = np.loadtxt(path, delimiter=",", ndmin=2, dtype=dtype)
+        labels, features = data[:, 0], data[:, 1:]
+    elif fmt == "libsvm":
+        labels, features = _read_dense_libsvm(path)
+    elif fmt == "parquet":
+        _, pq = _import_pyarrow()
+        table = pq.read_table(str(path))
+        labels = table.column(LABEL_FIELD).to_numpy()
+        features = np.empty((table.num_rows, len(FEATURE_COLUMNS)), dtype=dtype)
+        for index, name in enumerate(FEATURE_COLUMNS):
+            features[:, index] = table.column(name).to_numpy()
+    else:
+        raise ValueError("dmatrix buffers are loaded with xgboost.DMatrix, not as NumPy arrays.")
+    if not len(labels):
+        raise ValueError(f"No rows in {path}")
+    labels = labels.astype(np.float64).astype(np.int64)
+    return labels, np.ascontiguousarray(features, dtype=dtype)
+
+
+def read_first_column(path: Path, dtype: np.dtype = np.float64) -> np.ndarray:
+    """Load the first column of a headerless CSV (one value per line) as a 1-D array.
+
+    With pyarrow the file is memory-mapped and parsed by the Arrow CSV reader; without it
+    np.loadtxt parses it in C. Neither builds a Python object per line. Files those readers
+    reject, such as ragged rows or whitespace-only lines, go through `_read_first_column_lines`,
+    which reads them line by line like the original evaluator. Blank lines are skipped.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+    except ImportError:
+        try:
+            values = np.loadtxt(path, delimiter=",", usecols=0, ndmin=1, dtype=np.float64)
+        except ValueError:
+            values = _read_first_column_lines(path)
+    else:
+        try:
+            with pa.memory_map(str(path)) as source:
+                table = pa_csv.read_csv(
+                    source,
+                    read_options=pa_csv.ReadOptions(autogenerate_column_names=True),
+                    convert_options=pa_csv.ConvertOptions(
+                        include_columns=["f0"], column_types={"f0": pa.float64()}
+                    ),
+                )
+        except pa.ArrowInvalid:
+            if not path.stat().st_size:
+                raise ValueError(f"No values found in file: {path}") from None
+            values = _read_first_column_lines(path)
+        else:
+            if table.column(0).null_count:
+                raise ValueError(f"Empty first-column values in {path}")
+            values = table.column(0).to_numpy()
+            # The Arrow pool keeps freed parse buffers; release them before metrics allocate.
+            del table
+            pa.default_memory_pool().release_unused()
+    if not values.size:
+        raise ValueError(f"No values found in file: {path}")
+    return values.astype(dtype, copy=False)
+
+
+def _read_first_column_lines(path: Path) -> np.ndarray:
+    """First field of every non-blank line, parsed one line at a time."""
+    values: list[float] = []
+    with path.open("r", encoding="utf-8") as f:
+        for number, raw_line in enumerate(f, start=1):
+            line = raw_line.strip()
+            if not line:
+                continue
+            field = line.split(",", 1)[0].strip()
+            try:
+                values.append(float(field))
+            except ValueError:
+                raise ValueError(
+                    f"Could not read the first column of {path}: line {number} starts with "
+                    f"{field!r}"
+                ) from None
+    return np.asarray(values, dtype=np.float64)
+
+
+def iter_matrix_chunks(
+    path: Path,
+    fmt: str,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    dtype: np.dtype = np.float64,
+) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    """Yield (labels, features) for at most `chunk_rows` rows at a time.
+
+    Every chunk is copied into preallocated label and feature blocks, so memory is set by
+    `chunk_rows` and not by the file size. Features are C-contiguous rows in `dtype`. The yielded
+    arrays are views into those blocks and are overwritten by the next chunk; copy them to keep
+    them.
+    """
+    if check_format(fmt) == "dmatrix":
+        raise ValueError("dmatrix buffers are loaded whole with xgboost.DMatrix, not in chunks.")
+    if chunk_rows < 1:
+        raise ValueError(f"chunk_rows must be >= 1, got {chunk_rows}")
+    labels = np.empty(chunk_rows)
+    features = np.empty((chunk_rows, len(FEATURE_COLUMNS)), dtype=dtype)
+    for rows in _fill_blocks(path, fmt, labels, features):
+        yield labels[:rows], features[:rows]
+
+
+def _fill_blocks(
+    path: Path,
+    fmt: str,
+    labels: np.ndarray,
+    features: np.ndarray,
+) -> Iterator[int]:
+    chunk_rows = labels.shape[0]
+    if fmt == "parquet":
+        _, pq = _import_pyarrow()
+        names = [LABEL_FIELD, *FEATURE_COLUMNS]
+        for batch in pq.ParquetFile(str(path)).iter_batches(batch_size=chunk_rows, columns=names):
+            labels[: batch.num_rows] = batch.column(LABEL_FIELD).to_numpy()
+            for index, name in enumerate(FEATURE_COLUMNS):
+                features[: batch.num_rows, index] = batch.column(name).to_numpy()
+            yield batch.num_rows
+        return
+    with path.open("r", encoding="utf-8") as f:
+        while raw_lines := list(islice(f, chunk_rows)):
+            lines = [line for line in raw_lines if line.strip()]
+            if not lines:
+                continue
+            if fmt == "csv":
+                data = np.loadtxt(lines, delimiter=",", ndmin=2)
+                labels[: len(lines)] = data[:, 0]
+                features[: len(lines)] = data[:, 1:]
+            else:
+                labels[: len(lines)], features[: len(lines)] = _parse_libsvm_lines(lines)
+            yield len(lines)
+
+
+_LIBSVM_INDEX = re.compile(r" (\d+):")
+
+
+def _read_dense_libsvm(path: Path) -> tuple[np.ndarray, np.ndarray]:
+    lines = [line for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+    return _parse_libsvm_lines(lines)
+
+
+def _parse_libsvm_lines(lines: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    lines = [line.rstrip("\r\n") for line in lines]
+    width = len(FEATURE_COLUMNS)
+    text = "\n".join(lines)
+    indices = _LIBSVM_INDEX.findall(text)
+    expected = [str(index) for index in range(width)]
+    if len(indices) == len(lines) * width and indices == expected * len(lines):
+        data = np.loadtxt(io.StringIO(_LIBSVM_INDEX.sub(",", text)), delimiter=",", ndmin=2)
+        return data[:, 0], data[:, 1:]
+
+    # Sparse or reordered entries: absent features stay NaN (missing), as XGBoost reads them.
+    labels = np.empty(len(lines))
+    features = np.full((len(lines), width), np.nan)
+    for row_index, line in enumerate(lines):
+        label, *entries = line.split()
+        labels[row_index] = float(label)
+        for entry in entries:
+            column, value = entry.split(":", 1)
+            features[row_index, int(column)] = float(value)
+    return labels, features
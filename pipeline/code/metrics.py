@@ -0,0 +1,579 @@
+"""Vectorized binary-classification metrics shared by evaluate.py and the local evaluator.
+
+Labels and scores are NumPy arrays; the confusion matrix is counted with boolean masks, so there
+is no per-row Python loop. Counts and ratios follow the original per-row rules exactly: a row is
+predicted positive when `score >= threshold`, and any label other than 0 or 1 counts as `fn`.
+
+`threshold_sweep` sorts the scores once and takes cumulative sums, which gives the confusion
+matrix at every distinct score in O(n log n); ROC-AUC, PR-AUC (average precision), the curves
+and the best threshold for any metric are all read from that one sweep.
+
+`bootstrap_intervals` resamples whole batches of bootstrap replicates as one weight matrix
+(Poisson(1) weights, or counts from an index matrix), so every replicate's confusion matrix,
+ROC-AUC and PR-AUC is a matrix product or a cumulative sum over one pre-sorted score order.
+
+`sliced_confusion` counts the confusion matrix of every group of every slice (cohort) with one
+`np.bincount` over combined (group, outcome) keys.
+
+`calibration_counts` bins the scores with `np.digitize` and sums per bin with `np.bincount`;
+the sums add across chunks, and `calibration_from_counts` turns them into log loss, Brier
+score, expected/maximum calibration error and the reliability table.
+
+`StreamingMetrics` accumulates chunk by chunk with fixed memory: the confusion matrix at the
+decision threshold is exact, and the sweep is taken over per-class score histograms whose bin
+edges are the candidate thresholds.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+THRESHOLD_METRICS = ("accuracy", "precision", "recall", "f1")
+OUTCOMES = ("tp", "tn", "fp", "fn")
+DEFAULT_CURVE_POINTS = 101
+DEFAULT_SCORE_BINS = 65_536
+BOOTSTRAP_METHODS = ("poisson", "index")
+MODEL_METRICS = (*THRESHOLD_METRICS, "roc_auc", "pr_auc")
+BOOTSTRAP_METRICS = MODEL_METRICS
+# Cells (replicates x rows) of one weight matrix; bounds the memory of a bootstrap batch.
+DEFAULT_BOOTSTRAP_BATCH_CELLS = 1 << 22
+DEFAULT_CALIBRATION_BINS = 10
+# Scores are clipped to [eps, 1 - eps] so log loss stays finite, as in sklearn.
+LOG_LOSS_EPS = 1e-15
+# Integer-valued slice columns spanning fewer values than this are grouped by counting.
+_DENSE_GROUP_RANGE = 1 << 16
+
+
+def safe_div(num: float, den: float) -> float:
+    return num / den if den else 0.0
+
+
+def as_labels(values) -> np.ndarray:
+    """Integer labels; floats are truncated like `int(value)`."""
+    return np.asarray(values).astype(np.int64, copy=False)
+
+
+def confusion_matrix(labels: np.ndarray, scores: np.ndarray, threshold: float = 0.5) -> dict:
+    labels = np.asarray(labels)
+    scores = np.asarray(scores)
+    if labels.shape != scores.shape:
+        raise ValueError(
+            f"Predictions/labels size mismatch: predictions={scores.size} labels={labels.size}"
+        )
+    predicted = scores >= threshold
+    negatives = labels == 0
+    tp = int(np.count_nonzero(predicted & (labels == 1)))
+    fp = int(np.count_nonzero(predicted & negatives))
+    tn = int(np.count_nonzero(negatives)) - fp
+    fn = labels.size - tp - tn - fp
+    return {"tp": tp, "tn": tn, "fp": fp, "fn": fn}
+
+
+def outcome_codes(labels: np.ndarray, scores: np.ndarray, threshold: float = 0.5) -> np.ndarray:
+    """Per-row index into OUTCOMES, with the same rules as `confusion_matrix`."""
+    predicted = scores >= threshold
+    codes = np.full(labels.shape, OUTCOMES.index("fn"), dtype=np.int64)
+    codes[predicted & (labels == 1)] = OUTCOMES.index("tp")
+    codes[~predicted & (labels == 0)] = OUTCOMES.index("tn")
+    codes[predicted & (labels == 0)] = OUTCOMES.index("fp")
+    return codes
+
+
+def sliced_confusion(
+    labels: np.ndarray,
+    scores: np.ndarray,
+    columns: np.ndarray,
+    slices: dict[str, list[int]],
+    threshold: float = 0.5,
+) -> dict[str, dict[tuple, dict[str, int]]]:
+    """Confusion matrix of every group of every slice, from a single bincount.
+
+    `slices` maps a slice name to indices into the (n, c) `columns`; rows with equal values in
+    all of them form one group (several indices cross the columns). Each column is grouped once,
+    however many slices use it. Returns {slice: {group values: confusion}}.
+    """
+    labels = np.asarray(labels)
+    scores = np.asarray(scores)
+    if labels.shape != scores.shape:
+        raise ValueError(
+            f"Predictions/labels size mismatch: predictions={scores.size} labels={labels.size}"
+        )
+    codes = outcome_codes(labels, scores, threshold)
+    grouped = {
+        index: _group_index(columns[:, index])
+        for index in sorted({index for indices in slices.values() for index in indices})
+    }
+    keys = []
+    layout = {}
+    offset = 0
+    for name, indices in slices.items():
+        group = np.zeros(labels.size, dtype=np.int64)
+        for index in indices:
+            distinct, column_group = grouped[index]
+            group *= len(distinct)
+            group += column_group
+        shape = [len(grouped[index][0]) for index in indices]
+        # Key = global group index * outcomes + outcome: every slice shares one count vector.
+        group += offset
+        group *= len(OUTCOMES)
+        group += codes
+        keys.append(group)
+        layout[name] = (offset, shape, [grouped[index][0] for index in indices])
+        offset += int(np.prod(shape))
+    counts = np.bincount(
+        np.concatenate(keys) if keys else np.empty(0, dtype=np.int64),
+        minlength=offset * len(OUTCOMES),
+    ).reshape(offset, len(OUTCOMES))
+    result = {}
+    for name, (start, shape, distinct) in layout.items():
+        # Crossed groups that no row falls into are left out.
+        present = np.flatnonzero(counts[start : start + int(np.prod(shape))].any(axis=1))
+        positions = np.unravel_index(present, shape)
+        result[name] = {
+            tuple(values[position].item() for values, position in zip(distinct, row)): dict(
+                zip(OUTCOMES, counts[start + flat].tolist())
+            )
+            for flat, row in zip(present.tolist(), zip(*positions))
+        }
+    return result
+
+
+def _group_index(column: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Sorted distinct values of `column` and every row's index into them (NaNs group together)."""
+    codes = column.astype(np.int64) if np.isfinite(column).all() else None
+    dense = (
+        codes is not None
+        and codes.size
+        and np.array_equal(codes, column)
+        and int(codes.max()) - int(codes.min()) < _DENSE_GROUP_RANGE
+    )
+    if not dense:
+        distinct, codes = np.unique(column, return_inverse=True)
+        return distinct, codes.reshape(-1)
+    # Small-integer categories (encoded Pclass, Sex, ...): count instead of sorting.
+    low = int(codes.min())
+    codes -= low
+    present = np.flatnonzero(np.bincount(codes))
+    lookup = np.zeros(present[-1] + 1, dtype=np.int64)
+    lookup[present] = np.arange(present.size)
+    return (present + low).astype(column.dtype), lookup[codes]
+
+
+def merge_sliced_confusion(
+    total: dict[str, dict[tuple, dict[str, int]]],
+    part: dict[str, dict[tuple, dict[str, int]]],
+) -> dict[str, dict[tuple, dict[str, int]]]:
+    """Add the `sliced_confusion` of another chunk or part file into `total`, in place."""
+    for name, groups in part.items():
+        merged = total.setdefault(name, {})
+        for key, confusion in groups.items():
+            counts = merged.setdefault(key, dict.fromkeys(OUTCOMES, 0))
+            for outcome, count in confusion.items():
+                counts[outcome] += count
+    return total
+
+
+def classification_metrics(confusion: dict) -> dict[str, float]:
+    tp, tn, fp, fn = (confusion[key] for key in ("tp", "tn", "fp", "fn"))
+    accuracy = safe_div(tp + tn, tp + tn + fp + fn)
+    precision = safe_div(tp, tp + fp)
+    recall = safe_div(tp, tp + fn)
+    f1 = safe_div(2 * precision * recall, precision + recall)
+    return {"accuracy": accuracy, "precision": precision, "recall": recall, "f1": f1}
+
+
+def _ratio(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    """Elementwise `safe_div`."""
+    return np.divide(num, den, out=np.zeros(num.shape, dtype=np.float64), where=den != 0)
+
+
+def threshold_sweep(labels: np.ndarray, scores: np.ndarray) -> dict[str, np.ndarray]:
+    """Confusion matrix at every distinct score, as arrays ordered by decreasing threshold.
+
+    Entry `i` is what `confusion_matrix(labels, scores, thresholds[i])` returns.
+    """
+    labels = np.asarray(labels)
+    scores = np.asarray(scores)
+    if labels.shape != scores.shape:
+        raise ValueError(
+            f"Predictions/labels size mismatch: predictions={scores.size} labels={labels.size}"
+        )
+    if not scores.size:
+        raise ValueError("No predictions to sweep thresholds over.")
+    order = np.argsort(scores)[::-1]
+    sorted_scores = scores[order]
+    sorted_labels = labels[order]
+    # Last row of each run of equal scores: everything up to it scores >= that threshold.
+    run_ends = np.append(np.flatnonzero(np.diff(sorted_scores)), sorted_scores.size - 1)
+    tp = np.cumsum(sorted_labels == 1, dtype=np.int64)[run_ends]
+    fp = np.cumsum(sorted_labels == 0, dtype=np.int64)[run_ends]
+    negatives = int(np.count_nonzero(labels == 0))
+    tn = negatives - fp
+    fn = labels.size - tp - tn - fp
+    return {"thresholds": sorted_scores[run_ends], "tp": tp, "fp": fp, "tn": tn, "fn": fn}
+
+
+def sweep_metrics(sweep: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+    """`classification_metrics` evaluated at every threshold of the sweep."""
+    tp, tn, fp, fn = (sweep[key].astype(np.float64) for key in ("tp", "tn", "fp", "fn"))
+    precision = _ratio(tp, tp + fp)
+    recall = _ratio(tp, tp + fn)
+    return {
+        "accuracy": _ratio(tp + tn, tp + tn + fp + fn),
+        "precision": precision,
+        "recall": recall,
+        "f1": _ratio(2 * precision * recall, precision + recall),
+    }
+
+
+def roc_auc(sweep: dict[str, np.ndarray]) -> float:
+    """Trapezoidal ROC-AUC (ties count one half); 0.0 without both classes."""
+    positives = sweep["tp"][-1]
+    negatives = sweep["fp"][-1]
+    if not positives or not negatives:
+        return 0.0
+    tpr = np.concatenate([[0.0], sweep["tp"] / positives])
+    fpr = np.concatenate([[0.0], sweep["fp"] / negatives])
+    return float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1])) / 2.0)
+
+
+def pr_auc(sweep: dict[str, np.ndarray]) -> float:
+    """Average precision: precision at each threshold weighted by the recall it adds."""
+    positives = sweep["tp"][-1]
+    if not positives:
+        return 0.0
+    tp = sweep["tp"].astype(np.float64)
+    precision = tp / (tp + sweep["fp"])
+    recall = np.concatenate([[0.0], tp / positives])
+    return float(np.sum(np.diff(recall) * precision))
+
+
+def best_threshold(sweep: dict[str, np.ndarray], metric: str = "f1") -> dict[str, object]:
+    """Threshold that maximizes `metric`; the highest such threshold on ties."""
+    if metric not in THRESHOLD_METRICS:
+        raise ValueError(f"Unsupported metric {metric!r}; use one of {THRESHOLD_METRICS}")
+    values = sweep_metrics(sweep)[metric]
+    index = int(np.argmax(values))
+    return {
+        "metric": metric,
+        "threshold": float(sweep["thresholds"][index]),
+        "value": float(values[index]),
+    }
+
+
+def curve_points(sweep: dict[str, np.ndarray], points: int = DEFAULT_CURVE_POINTS) -> dict:
+    """ROC and PR curves downsampled to at most `points` thresholds (first and last kept)."""
+    size = sweep["thresholds"].size
+    index = np.linspace(0, size - 1, num=max(2, min(points, size))).round().astype(np.int64)
+    index = np.unique(index)
+    tp = sweep["tp"][index].astype(np.float64)
+    fp = sweep["fp"][index].astype(np.float64)
+    positives = np.full_like(tp, sweep["tp"][-1])
+    negatives = np.full_like(fp, sweep["fp"][-1])
+    thresholds = sweep["thresholds"][index].astype(np.float64).tolist()
+    recall = _ratio(tp, positives).tolist()
+    return {
+        "roc": {
+            "fpr": _ratio(fp, negatives).tolist(),
+            "tpr": recall,
+            "thresholds": thresholds,
+        },
+        "pr": {
+            "precision": _ratio(tp, tp + fp).tolist(),
+            "recall": recall,
+            "thresholds": thresholds,
+        },
+    }
+
+
+def ranking_metrics(
+    labels: np.ndarray,
+    scores: np.ndarray,
+    optimize: str = "f1",
+    points: int = DEFAULT_CURVE_POINTS,
+) -> dict[str, object]:
+    """ROC-AUC, PR-AUC, best threshold and downsampled curves from one sorted pass."""
+    return sweep_ranking(threshold_sweep(labels, scores), optimize, points)
+
+
+def sweep_ranking(
+    sweep: dict[str, np.ndarray],
+    optimize: str = "f1",
+    points: int = DEFAULT_CURVE_POINTS,
+) -> dict[str, object]:
+    return {
+        "roc_auc": roc_auc(sweep),
+        "pr_auc": pr_auc(sweep),
+        "best_threshold": best_threshold(sweep, optimize),
+        "curves": curve_points(sweep, points),
+    }
+
+
+def bootstrap_weights(
+    rng: np.random.Generator,
+    replicates: int,
+    size: int,
+    method: str = "poisson",
+) -> np.ndarray:
+    """(replicates, size) row weights: Poisson(1) draws, or how often an index draw hit each row.
+
+    "index" is the classic bootstrap (every replicate has exactly `size` rows); "poisson" is its
+    large-sample approximation and needs no index matrix.
+    """
+    if method == "poisson":
+        return rng.poisson(1.0, size=(replicates, size)).astype(np.float64)
+    if method == "index":
+        index = rng.integers(0, size, size=(replicates, size))
+        index += np.arange(replicates)[:, None] * size
+        counts = np.bincount(index.ravel(), minlength=replicates * size)
+        return counts.reshape(replicates, size).astype(np.float64)
+    raise ValueError(f"Unsupported bootstrap method {method!r}; use one of {BOOTSTRAP_METHODS}")
+
+
+def weighted_metrics(
+    weights: np.ndarray,
+    labels: np.ndarray,
+    scores: np.ndarray,
+    threshold: float = 0.5,
+) -> dict[str, np.ndarray]:
+    """BOOTSTRAP_METRICS for every row of `weights`, with rows weighted like repeated samples.
+
+    `labels` and `scores` must be sorted by decreasing score. A row of ones gives the
+    point metrics of `classification_metrics`, `roc_auc` and `pr_auc` up to float rounding.
+    """
+    positive = (labels == 1).astype(np.float64)
+    negative = (labels == 0).astype(np.float64)
+    predicted = scores >= threshold
+    total = weights.sum(axis=1)
+    tp = weights @ (positive * predicted)
+    fp = weights @ (negative * predicted)
+    tn = weights @ negative - fp
+    values = sweep_metrics({"tp": tp, "fp": fp, "tn": tn, "fn": total - tp - tn - fp})
+
+    run_ends = np.append(np.flatnonzero(np.diff(scores)), scores.size - 1)
+    tp_sweep = np.cumsum(weights * positive, axis=1)[:, run_ends]
+    fp_sweep = np.cumsum(weights * negative, axis=1)[:, run_ends]
+    positives = tp_sweep[:, -1:]
+    negatives = fp_sweep[:, -1:]
+    # A zero denominator only occurs with a zero numerator, so dividing by 1 there gives 0.
+    tpr = tp_sweep / np.where(positives > 0, positives, 1.0)
+    fpr = fp_sweep / np.where(negatives > 0, negatives, 1.0)
+    tpr_step = np.diff(tpr, axis=1, prepend=0.0)
+    fpr_step = np.diff(fpr, axis=1, prepend=0.0)
+    auc = np.sum(fpr_step * (2.0 * tpr - tpr_step), axis=1) / 2.0
+    values["roc_auc"] = np.where((positives[:, 0] > 0) & (negatives[:, 0] > 0), auc, 0.0)
+    predicted_weight = tp_sweep + fp_sweep
+    predicted_weight[predicted_weight == 0] = 1.0
+    values["pr_auc"] = np.sum(tpr_step * (tp_sweep / predicted_weight), axis=1)
+    return values
+
+
+def _bootstrap_batch(
+    labels: np.ndarray,
+    scores: np.ndarray,
+    threshold: float,
+    replicates: int,
+    method: str,
+    seed: np.random.SeedSequence,
+) -> dict[str, np.ndarray]:
+    weights = bootstrap_weights(np.random.default_rng(seed), replicates, labels.size, method)
+    return weighted_metrics(weights, labels, scores, threshold)
+
+
+def bootstrap_intervals(
+    labels: np.ndarray,
+    scores: np.ndarray,
+    threshold: float = 0.5,
+    replicates: int = 1000,
+    confidence: float = 0.95,
+    method: str = "poisson",
+    seed: int = 0,
+    workers: int = 1,
+    batch_cells: int = DEFAULT_BOOTSTRAP_BATCH_CELLS,
+) -> dict[str, object]:
+    """Percentile bootstrap intervals for BOOTSTRAP_METRICS.
+
+    Replicates are drawn in batches of about `batch_cells / rows`, each from its own child of
+    `SeedSequence(seed)`, so the result depends on `seed` but not on `workers`.
+    """
+    labels = np.asarray(labels)
+    scores = np.asarray(scores)
+    if labels.shape != scores.shape:
+        raise ValueError(
+            f"Predictions/labels size mismatch: predictions={scores.size} labels={labels.size}"
+        )
+    if not scores.size:
+        raise ValueError("No predictions to bootstrap.")
+    if method not in BOOTSTRAP_METHODS:
+        raise ValueError(f"Unsupported bootstrap method {method!r}; use one of {BOOTSTRAP_METHODS}")
+    if replicates < 1 or not 0.0 < confidence < 1.0:
+        raise ValueError(
+            f"Need replicates >= 1 and 0 < confidence < 1, got {replicates} and {confidence}"
+        )
+    order = np.argsort(scores)[::-1]
+    labels = labels[order]
+    scores = scores[order]
+
+    per_batch = max(1, min(replicates, batch_cells // scores.size))
+    sizes = [min(per_batch, replicates - start) for start in range(0, replicates, per_batch)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    arguments = [
+        (labels, scores, threshold, size, method, child) for size, child in zip(sizes, seeds)
+    ]
+    if workers <= 1 or len(arguments) <= 1:
+        batches = [_bootstrap_batch(*args) for args in arguments]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(arguments))) as pool:
+            batches = list(pool.map(_bootstrap_batch, *zip(*arguments)))
+
+    alpha = (1.0 - confidence) / 2.0
+    intervals = {}
+    for name in BOOTSTRAP_METRICS:
+        values = np.concatenate([batch[name] for batch in batches])
+        lower, upper = np.quantile(values, [alpha, 1.0 - alpha])
+        intervals[name] = {
+            "lower": float(lower),
+            "upper": float(upper),
+            "std": float(values.std(ddof=1)) if values.size > 1 else 0.0,
+        }
+    return {
+        "method": method,
+        "replicates": replicates,
+        "confidence": confidence,
+        "seed": seed,
+        "intervals": intervals,
+    }
+
+
+def calibration_counts(
+    labels: np.ndarray,
+    scores: np.ndarray,
+    bins: int = DEFAULT_CALIBRATION_BINS,
+) -> dict[str, object]:
+    """Additive calibration sums: log loss and Brier totals plus per-bin count, score and
+    positive sums over `bins` equal-width probability bins. Label 1 is the positive class."""
+    labels = np.asarray(labels)
+    scores = np.asarray(scores, dtype=np.float64)
+    if labels.shape != scores.shape:
+        raise ValueError(
+            f"Predictions/labels size mismatch: predictions={scores.size} labels={labels.size}"
+        )
+    positive = labels == 1
+    clipped = np.clip(scores, LOG_LOSS_EPS, 1.0 - LOG_LOSS_EPS)
+    log_loss = -np.where(positive, np.log(clipped), np.log1p(-clipped)).sum()
+    edges = np.arange(bins + 1) / bins
+    # Interior edges only: scores below 0 land in the first bin and 1.0 in the last.
+    index = np.digitize(scores, edges[1:-1])
+    return {
+        "bins": bins,
+        "samples": int(scores.size),
+        "log_loss_sum": float(log_loss),
+        "brier_sum": float(np.sum((scores - positive) ** 2)),
+        "counts": np.bincount(index, minlength=bins),
+        "score_sums": np.bincount(index, weights=scores, minlength=bins),
+        "positives": np.bincount(index, weights=positive, minlength=bins),
+    }
+
+
+def merge_calibration_counts(total: dict[str, object] | None, part: dict[str, object]) -> dict:
+    if total is None:
+        return dict(part)
+    merged = dict(total)
+    for key in ("samples", "log_loss_sum", "brier_sum", "counts", "score_sums", "positives"):
+        merged[key] = total[key] + part[key]
+    return merged
+
+
+def calibration_from_counts(counts: dict[str, object]) -> dict[str, object]:
+    """Log loss, Brier score, ECE, MCE and the reliability table (empty bins have nulls)."""
+    samples = counts["samples"]
+    if not samples:
+        raise ValueError("No predictions to measure calibration on.")
+    bins = counts["bins"]
+    filled = counts["counts"] > 0
+    mean_score = _ratio(counts["score_sums"], counts["counts"].astype(np.float64))
+    positive_rate = _ratio(counts["positives"], counts["counts"].astype(np.float64))
+    gaps = np.abs(positive_rate - mean_score)
+    edges = np.arange(bins + 1) / bins
+    return {
+        "log_loss": counts["log_loss_sum"] / samples,
+        "brier": counts["brier_sum"] / samples,
+        "ece": float(np.sum(counts["counts"] * gaps) / samples),
+        "mce": float(gaps[filled].max()),
+        "bins": [
+            {
+                "lower": float(edges[index]),
+                "upper": float(edges[index + 1]),
+                "count": int(counts["counts"][index]),
+                "mean_score": float(mean_score[index]) if filled[index] else None,
+                "positive_rate": float(positive_rate[index]) if filled[index] else None,
+            }
+            for index in range(bins)
+        ],
+    }
+
+
+def calibration_metrics(
+    labels: np.ndarray,
+    scores: np.ndarray,
+    bins: int = DEFAULT_CALIBRATION_BINS,
+) -> dict[str, object]:
+    return calibration_from_counts(calibration_counts(labels, scores, bins))
+
+
+class StreamingMetrics:
+    """Metrics accumulated over score chunks in O(bins) memory.
+
+    Scores are probabilities in [0, 1] (values outside are clipped into the end bins). The
+    confusion matrix at `threshold` is exact; the ranking sweep treats scores that share one of
+    `bins` equal-width bins as ties, so AUC is exact up to within-bin ordering.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.5,
+        bins: int = DEFAULT_SCORE_BINS,
+        calibration_bins: int = DEFAULT_CALIBRATION_BINS,
+    ) -> None:
+        self.threshold = threshold
+        self.bins = bins
+        self.calibration_bins = calibration_bins
+        self.calibration_counts: dict[str, object] | None = None
+        self.confusion = {"tp": 0, "tn": 0, "fp": 0, "fn": 0}
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.positives = np.zeros(bins, dtype=np.int64)
+        self.negatives = np.zeros(bins, dtype=np.int64)
+
+    @property
+    def samples(self) -> int:
+        return sum(self.confusion.values())
+
+    def update(self, labels: np.ndarray, scores: np.ndarray) -> None:
+        for key, count in confusion_matrix(labels, scores, self.threshold).items():
+            self.confusion[key] += count
+        index = (np.asarray(scores, dtype=np.float64) * self.bins).astype(np.int64)
+        np.clip(index, 0, self.bins - 1, out=index)
+        self.counts += np.bincount(index, minlength=self.bins)
+        self.positives += np.bincount(index[labels == 1], minlength=self.bins)
+        self.negatives += np.bincount(index[labels == 0], minlength=self.bins)
+        self.calibration_counts = merge_calibration_counts(
+            self.calibration_counts, calibration_counts(labels, scores, self.calibration_bins)
+        )
+
+    def calibration(self) -> dict[str, object]:
+        if self.calibration_counts is None:
+            raise ValueError("No predictions to measure calibration on.")
+        return calibration_from_counts(self.calibration_counts)
+
+    def sweep(self) -> dict[str, np.ndarray]:
+        """`threshold_sweep` over bin lower edges, highest first, for non-empty bins."""
+        if not self.samples:
+            raise ValueError("No predictions to sweep thresholds over.")
+        filled = np.flatnonzero(self.counts)[::-1]
+        tp = np.cumsum(self.positives[filled])
+        fp = np.cumsum(self.negatives[filled])
+        tn = int(self.negatives.sum()) - fp
+        fn = self.samples - tp - tn - fp
+        return {"thresholds": filled / self.bins, "tp": tp, "fp": fp, "tn": tn, "fn": fn}
@@ -1,137 +1,387 @@
 #!/usr/bin/env python3
-"""Preprocess Titanic CSV splits from S3 into XGBoost-friendly numeric files."""
+"""Preprocess Titanic CSV splits from S3 into XGBoost-friendly numeric files.
+
+The training channels are written as csv (default), libsvm, parquet or dmatrix; see formats.py.
+With --shards > 1 (or more than one processing instance) every channel becomes a directory of
+part files encoded in a process pool; see sharding.py. Missing Age/Fare are imputed with a
+train-split quantile (--fill-quantile, median by default), exact or KLL-sketched; see quantiles.py.
+
+Both inputs are read at the same time over one pooled S3 client with ranged GETs (s3io.py). They
+stream straight into the parser unless sharding or the output cache needs local files.
+
+Inputs may also be local paths: a file, a lazily-read FastFile mount, a FIFO, or a
+ProcessingInput directory: in File mode its files are read in sorted order as one CSV, in Pipe
+mode the FIFO found in it is parsed as SageMaker streams the object in. Those are parsed as
+bytes arrive; a FIFO or a multi-file directory is spooled to one file on disk only when sharding
+or the cache needs a seekable file.
+"""
 
 from __future__ import annotations
 
 import argparse
-import csv
+import shutil
+import stat
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from statistics import median
 
-import boto3
+# upsert_pipeline mounts the shared pipeline modules here; locally they sit next to this script.
+SHARED_CODE_DIR = Path("/opt/ml/processing/input/shared")
+sys.path.append(str(SHARED_CODE_DIR))
+
+from cache import content_key, evict, open_cache  # noqa: E402
+from features import (  # noqa: E402
+    ENCODER_VERSION,
+    PREPROCESSOR_FILE_NAME,
+    batch_rows,
+    concat_batches,
+    fill_strategy,
+    fill_values,
+    fit_preprocessor,
+    iter_column_batches,
+    labels_from_columns,
+    preprocessor_fills,
+    read_columns,
+    read_preprocessor,
+    read_stream_columns,
+    transform_columns,
+    write_preprocessor,
+)
+from formats import OUTPUT_FORMATS, channel_file_name, write_matrix  # noqa: E402
+from quantiles import DEFAULT_SKETCH_K, QUANTILE_ESTIMATORS  # noqa: E402
+from s3io import download_s3_file, make_s3_client, open_s3_stream  # noqa: E402
+from sharding import (  # noqa: E402
+    current_host_slot,
+    default_workers,
+    encode_sharded,
+    sharded_fill_values,
+)
+
+TRAIN_OUTPUT_DIR = Path("/opt/ml/processing/output/train")
+VALIDATION_OUTPUT_DIR = Path("/opt/ml/processing/output/validation")
+PREPROCESSOR_OUTPUT_DIR = Path("/opt/ml/processing/output/preprocessor")
+# Downloads and spooled FIFOs or multi-file inputs, when sharding or the cache needs local files.
+WORK_DIR = Path("/tmp/titanic_preprocess")
 
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser()
-    parser.add_argument("--input-train-uri", required=True)
-    parser.add_argument("--input-validation-uri", required=True)
+    parser.add_argument(
+        "--input-train-uri",
+        required=True,
+        help="s3:// URI, or a local file, FastFile mount, FIFO, or File/Pipe-mode input directory.",
+    )
+    parser.add_argument(
+        "--input-validation-uri",
+        required=True,
+        help="Same forms as --input-train-uri.",
+    )
     parser.add_argument("--output-prefix", default="")
     parser.add_argument("--code-bundle-uri", default="")
+    parser.add_argument("--output-format", choices=OUTPUT_FORMATS, default="csv")
+    parser.add_argument(
+        "--preprocessor-uri",
+        default="",
+        help=(
+            "Fitted preprocessor.json (S3 URI or local path) to transform with instead of fitting "
+            "fills on the train split."
+        ),
+    )
+    parser.add_argument(
+        "--fill-quantile",
+        type=float,
+        default=0.5,
+        help="Quantile of the train split used to impute missing Age/Fare (default: median).",
+    )
+    parser.add_argument(
+        "--fill-estimator",
+        choices=QUANTILE_ESTIMATORS,
+        default="exact",
+        help="exact: selection or value counts; sketch: bounded-memory mergeable KLL sketch.",
+    )
+    parser.add_argument(
+        "--sketch-k",
+        type=int,
+        default=DEFAULT_SKETCH_K,
+        help="KLL sketch size for --fill-estimator sketch; rank error is about 1.65 / k.",
+    )
+    parser.add_argument(
+        "--cache-uri",
+        default="",
+        help="Local directory or s3:// prefix of the content-addressed output cache (empty: off).",
+    )
+    parser.add_argument(
+        "--cache-max-gb",
+        type=float,
+        default=10.0,
+        help="Size budget of the output cache; least-recently-used entries are evicted past it.",
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=1,
+        help="Byte-range shards per input; >1 writes part files (train_xgb-00000.csv, ...).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Worker processes for sharded mode (default: one per CPU).",
+    )
     return parser.parse_args()
 
 
-def parse_s3_uri(uri: str) -> tuple[str, str]:
-    if not uri.startswith("s3://"):
-        raise ValueError(f"Invalid S3 URI: {uri}")
-    no_scheme = uri[5:]
-    bucket, key = no_scheme.split("/", 1)
-    return bucket, key
-
-
-def download_s3_csv(uri: str, target_path: Path) -> None:
-    bucket, key = parse_s3_uri(uri)
+def args_fill_strategy(args: argparse.Namespace) -> dict[str, object]:
+    return fill_strategy(args.fill_quantile, args.fill_estimator, args.sketch_k)
+
+
+def load_preprocessor(s3_client, uri: str, work_dir: Path) -> dict[str, object]:
+    if uri.startswith("s3://"):
+        local_path = work_dir / PREPROCESSOR_FILE_NAME
+        download_s3_file(s3_client, uri, local_path)
+        return read_preprocessor(local_path)
+    return read_preprocessor(Path(uri))
+
+
+def resolve_local_inputs(uri: str) -> list[Path]:
+    """The files (or FIFOs) behind a local input path, in the order their rows are read."""
+    path = Path(uri)
+    if path.is_dir():
+        # File mode copies every object under the S3Prefix here, keeping the key layout; Pipe
+        # mode puts the channel's FIFO here. Either is found by listing, not by a guessed name.
+        files = sorted(
+            p
+            for p in path.rglob("*")
+            if (p.is_file() or p.is_fifo())
+            and not any(part.startswith(".") for part in p.relative_to(path).parts)
+        )
+        if not files:
+            raise ValueError(f"No input files in {path}")
+        return files
+    if not path.exists():
+        raise FileNotFoundError(f"Input not found: {uri}")
+    return [path]
+
+
+def is_fifo(path: Path) -> bool:
+    return stat.S_ISFIFO(path.stat().st_mode)
+
+
+def read_input_columns(s3_client, uri: str) -> dict:
+    if uri.startswith("s3://"):
+        with open_s3_stream(s3_client, uri) as stream:
+            return read_stream_columns(stream, source=uri)
+    # Each file of a multi-object prefix carries its own header; columns are picked by name.
+    batches = []
+    for path in resolve_local_inputs(uri):
+        with path.open("rb") as stream:
+            batches.extend(iter_column_batches(stream))
+    if not sum(batch_rows(batch) for batch in batches):
+        raise ValueError(f"Input CSV has no rows: {uri}")
+    return concat_batches(batches)
+
+
+def concatenate_csv_files(paths: list[Path], target_path: Path) -> Path:
+    """One CSV with the first file's header and every file's rows, in order."""
     target_path.parent.mkdir(parents=True, exist_ok=True)
-    boto3.client("s3").download_file(bucket, key, str(target_path))
-
-
-def read_rows(path: Path) -> list[dict[str, str]]:
-    with path.open("r", newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        rows = list(reader)
-    if not rows:
-        raise ValueError(f"Input CSV has no rows: {path}")
-    return rows
-
-
-def parse_float(value: str | None) -> float | None:
-    if value is None:
-        return None
-    value = value.strip()
-    if not value:
-        return None
-    return float(value)
-
-
-def to_int(value: str | None, default: int = 0) -> int:
-    if value is None:
-        return default
-    value = value.strip()
-    if not value:
-        return default
-    return int(float(value))
-
-
-def encode_features(row: dict[str, str], age_fill: float, fare_fill: float) -> list[float]:
-    sex_map = {"male": 0.0, "female": 1.0}
-    embarked_map = {"C": 0.0, "Q": 1.0, "S": 2.0}
-
-    pclass = float(to_int(row.get("Pclass"), default=3))
-    sex = sex_map.get((row.get("Sex") or "").strip().lower(), -1.0)
-    age = parse_float(row.get("Age"))
-    age = age_fill if age is None else age
-    sibsp = float(to_int(row.get("SibSp"), default=0))
-    parch = float(to_int(row.get("Parch"), default=0))
-    fare = parse_float(row.get("Fare"))
-    fare = fare_fill if fare is None else fare
-    embarked = embarked_map.get((row.get("Embarked") or "").strip().upper(), -1.0)
-
-    return [pclass, sex, age, sibsp, parch, fare, embarked]
-
-
-def label_from_row(row: dict[str, str]) -> int:
-    value = row.get("Survived")
-    if value is None:
-        raise ValueError("Missing Survived column")
-    return to_int(value, default=0)
-
-
-def write_csv(path: Path, rows: list[list[float | int]]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f, lineterminator="\n")
-        writer.writerows(rows)
+    header = None
+    with target_path.open("wb") as target:
+        for path in paths:
+            with path.open("rb") as source:
+                line = source.readline()
+                if header is None:
+                    header = line
+                    target.write(line)
+                elif line.rstrip(b"\r\n") != header.rstrip(b"\r\n"):
+                    raise ValueError(f"Input files have different headers: {paths[0]} and {path}")
+                if not line.endswith(b"\n"):
+                    target.write(b"\n")
+                tail = b"\n"
+                while chunk := source.read(8 * 1024 * 1024):
+                    target.write(chunk)
+                    tail = chunk[-1:]
+                if tail != b"\n":
+                    target.write(b"\n")
+    return target_path
+
+
+def materialize_input(s3_client, uri: str, target_path: Path) -> Path:
+    """A seekable local file with the input's bytes, copying only when there is none yet."""
+    if uri.startswith("s3://"):
+        download_s3_file(s3_client, uri, target_path)
+        return target_path
+    paths = resolve_local_inputs(uri)
+    if len(paths) == 1 and not is_fifo(paths[0]):
+        return paths[0]
+    return concatenate_csv_files(paths, target_path)
+
+
+def materialize_inputs(s3_client, targets: list[tuple[str, Path]]) -> list[Path]:
+    with ThreadPoolExecutor(max_workers=len(targets)) as pool:
+        futures = [pool.submit(materialize_input, s3_client, *target) for target in targets]
+        return [future.result() for future in futures]
+
+
+def stream_input_columns(s3_client, uris: list[str]) -> list[dict]:
+    # Both inputs are consumed at once, so a FIFO writer never waits on the other input.
+    with ThreadPoolExecutor(max_workers=len(uris)) as pool:
+        return list(pool.map(lambda uri: read_input_columns(s3_client, uri), uris))
+
+
+def reset_output_dirs(outputs: dict[str, Path]) -> None:
+    """Empty every output directory, so it ends up holding only the files this run writes.
+
+    SageMaker uploads (and the cache stores) whatever is there, including leftovers of an
+    earlier local run.
+    """
+    for directory in outputs.values():
+        directory.mkdir(parents=True, exist_ok=True)
+        # Empty rather than remove the directory: under SageMaker it may be a mount point.
+        for child in directory.iterdir():
+            if child.is_dir() and not child.is_symlink():
+                shutil.rmtree(child)
+            else:
+                child.unlink()
 
 
 def main() -> None:
     args = parse_args()
 
-    work_dir = Path("/tmp/titanic_preprocess")
+    work_dir = WORK_DIR
     train_local = work_dir / "train.csv"
     validation_local = work_dir / "validation.csv"
+    s3_client = make_s3_client()
+
+    preprocessor = None
+    if args.preprocessor_uri:
+        preprocessor = load_preprocessor(s3_client, args.preprocessor_uri, work_dir)
+
+    outputs = {
+        "train": TRAIN_OUTPUT_DIR,
+        "validation": VALIDATION_OUTPUT_DIR,
+        "preprocessor": PREPROCESSOR_OUTPUT_DIR,
+    }
+    reset_output_dirs(outputs)
+
+    host_index, host_count = current_host_slot()
+    sharded = args.shards > 1 or host_count > 1
+    if not sharded and not args.cache_uri:
+        train_columns, validation_columns = stream_input_columns(
+            s3_client, [args.input_train_uri, args.input_validation_uri]
+        )
+        prepare_single(args, train_columns, validation_columns, preprocessor)
+        return
+
+    # Byte-range shards and the cache key both need the inputs as seekable local files.
+    train_local, validation_local = materialize_inputs(
+        s3_client,
+        [(args.input_train_uri, train_local), (args.input_validation_uri, validation_local)],
+    )
 
-    download_s3_csv(args.input_train_uri, train_local)
-    download_s3_csv(args.input_validation_uri, validation_local)
-
-    train_rows = read_rows(train_local)
-    validation_rows = read_rows(validation_local)
-
-    ages = [v for v in (parse_float(r.get("Age")) for r in train_rows) if v is not None]
-    fares = [v for v in (parse_float(r.get("Fare")) for r in train_rows) if v is not None]
-    age_fill = float(median(ages)) if ages else 0.0
-    fare_fill = float(median(fares)) if fares else 0.0
-
-    train_xgb: list[list[float | int]] = []
-    validation_xgb: list[list[float | int]] = []
-
-    for row in train_rows:
-        label = label_from_row(row)
-        features = encode_features(row, age_fill=age_fill, fare_fill=fare_fill)
-        train_xgb.append([label, *features])
+    cache = cache_key = None
+    if args.cache_uri and host_count > 1:
+        print("Output cache disabled: each host writes only its own shards.")
+    elif args.cache_uri:
+        cache = open_cache(args.cache_uri, s3_client)
+        settings = {
+            "encoder_version": ENCODER_VERSION,
+            "output_format": args.output_format,
+            "shards": args.shards,
+            "preprocessor": preprocessor,
+            "fill_strategy": args_fill_strategy(args),
+        }
+        cache_key = content_key([train_local, validation_local], settings)
+        if cache.fetch(cache_key, outputs):
+            print(f"Output cache hit key={cache_key} cache={cache}")
+            return
+        print(f"Output cache miss key={cache_key} cache={cache}")
+
+    if sharded:
+        prepare_sharded(args, train_local, validation_local, preprocessor, host_index, host_count)
+    else:
+        prepare_single(
+            args, read_columns(train_local), read_columns(validation_local), preprocessor
+        )
+
+    if cache is not None:
+        cache.store(cache_key, outputs)
+        evicted = evict(cache, int(args.cache_max_gb * 1024**3), keep=cache_key)
+        print(f"Output cache stored key={cache_key} evicted={len(evicted)}")
+
+
+def prepare_single(
+    args: argparse.Namespace,
+    train_columns: dict,
+    validation_columns: dict,
+    preprocessor: dict[str, object] | None,
+) -> None:
+    if preprocessor is None:
+        strategy = args_fill_strategy(args)
+        preprocessor = fit_preprocessor(*fill_values(train_columns, strategy), strategy)
+    age_fill, fare_fill = preprocessor_fills(preprocessor)
+
+    train_labels = labels_from_columns(train_columns)
+    train_features = transform_columns(train_columns, preprocessor)
+    validation_labels = labels_from_columns(validation_columns)
+    validation_features = transform_columns(validation_columns, preprocessor)
+
+    output_format = args.output_format
+    train_out = TRAIN_OUTPUT_DIR / channel_file_name("train_xgb", output_format)
+    validation_out = VALIDATION_OUTPUT_DIR / channel_file_name("validation_xgb", output_format)
+
+    write_matrix(train_out, train_labels, train_features, output_format)
+    write_matrix(validation_out, validation_labels, validation_features, output_format)
+    write_preprocessor(PREPROCESSOR_OUTPUT_DIR / PREPROCESSOR_FILE_NAME, preprocessor)
 
-    for row in validation_rows:
-        label = label_from_row(row)
-        features = encode_features(row, age_fill=age_fill, fare_fill=fare_fill)
-        validation_xgb.append([label, *features])
+    print(
+        f"Prepared files train={len(train_labels)} validation={len(validation_labels)} "
+        f"age_fill={age_fill:.4f} fare_fill={fare_fill:.4f} format={output_format} "
+        f"preprocessor={'loaded' if args.preprocessor_uri else 'fitted'}"
+    )
 
-    train_out = Path("/opt/ml/processing/output/train/train_xgb.csv")
-    validation_out = Path("/opt/ml/processing/output/validation/validation_xgb.csv")
 
-    write_csv(train_out, train_xgb)
-    write_csv(validation_out, validation_xgb)
+def prepare_sharded(
+    args: argparse.Namespace,
+    train_local: Path,
+    validation_local: Path,
+    preprocessor: dict[str, object] | None,
+    host_index: int,
+    host_count: int,
+) -> None:
+    # Every host needs at least one shard; fills are reduced over the whole train file on each.
+    shards = max(args.shards, host_count)
+    workers = args.workers or default_workers()
+    if preprocessor is None:
+        strategy = args_fill_strategy(args)
+        fills = sharded_fill_values(train_local, shards, workers, strategy)
+        preprocessor = fit_preprocessor(*fills, strategy)
+    age_fill, fare_fill = preprocessor_fills(preprocessor)
+
+    channels = (
+        ("train", train_local, TRAIN_OUTPUT_DIR, "train_xgb"),
+        ("validation", validation_local, VALIDATION_OUTPUT_DIR, "validation_xgb"),
+    )
+    rows = {}
+    for name, local_path, output_dir, stem in channels:
+        rows[name] = encode_sharded(
+            local_path,
+            output_dir,
+            stem,
+            args.output_format,
+            preprocessor,
+            shards=shards,
+            workers=workers,
+            host_index=host_index,
+            host_count=host_count,
+        )
+    if host_index == 0:
+        write_preprocessor(PREPROCESSOR_OUTPUT_DIR / PREPROCESSOR_FILE_NAME, preprocessor)
 
     print(
-        f"Prepared files train={len(train_xgb)} validation={len(validation_xgb)} "
-        f"age_fill={age_fill:.4f} fare_fill={fare_fill:.4f}"
+        f"Prepared shards train={rows['train']} validation={rows['validation']} "
+        f"age_fill={age_fill:.4f} fare_fill={fare_fill:.4f} format={args.output_format} "
+        f"shards={shards} workers={workers} host={host_index + 1}/{host_count} "
+        f"preprocessor={'loaded' if args.preprocessor_uri else 'fitted'}"
     )
 
 
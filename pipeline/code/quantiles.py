@@ -0,0 +1,170 @@
+"""Quantile estimators for imputation statistics.
+
+- `exact_quantile`: selection (`np.partition`, O(n)) over an in-memory column.
+- `counts_quantile`: exact quantile of a value histogram; memory grows with distinct values and
+  histograms from separate shards merge by adding counts.
+- `KllSketch`: KLL sketch with bounded memory (O(k) items) and rank error of about 1.65 / k,
+  mergeable across shards.
+
+All estimators use NumPy's default "linear" definition, so `exact_quantile(values, 0.5)` equals
+`np.median(values)` and `counts_quantile` matches `exact_quantile` on the same data.
+"""
+
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+QUANTILE_ESTIMATORS = ("exact", "sketch")
+DEFAULT_SKETCH_K = 200
+_KLL_CAPACITY_DECAY = 2.0 / 3.0
+_KLL_RANK_ERROR = 1.65
+
+
+def check_quantile(q: float) -> float:
+    if not 0.0 <= q <= 1.0:
+        raise ValueError(f"Quantile must be between 0 and 1, got {q}")
+    return q
+
+
+def _interpolate(lower: float, upper: float, fraction: float, q: float) -> float:
+    if fraction == 0.0 or lower == upper:
+        return float(lower)
+    if q == 0.5:
+        # Same arithmetic as np.median for an even number of values.
+        return float((lower + upper) / 2.0)
+    # Same arithmetic as np.quantile's lerp, which anchors on the nearer neighbour.
+    if fraction < 0.5:
+        return float(lower + (upper - lower) * fraction)
+    return float(upper - (upper - lower) * (1.0 - fraction))
+
+
+def exact_quantile(values: np.ndarray, q: float) -> float:
+    """Exact quantile by selection: two `np.partition` calls instead of a full sort."""
+    check_quantile(q)
+    if not values.size:
+        return 0.0
+    position = (values.size - 1) * q
+    lower_index = math.floor(position)
+    upper_index = min(lower_index + 1, values.size - 1)
+    partitioned = np.partition(values, (lower_index, upper_index))
+    lower, upper = partitioned[lower_index], partitioned[upper_index]
+    return _interpolate(lower, upper, position - lower_index, q)
+
+
+def counts_quantile(counts: dict[float, int], q: float) -> float:
+    """Exact quantile of a value histogram (value -> frequency)."""
+    check_quantile(q)
+    total = sum(counts.values())
+    if not total:
+        return 0.0
+    position = (total - 1) * q
+    lower_rank = math.floor(position)
+    upper_rank = min(lower_rank + 1, total - 1)
+    lower: float | None = None
+    seen = 0
+    for value in sorted(counts):
+        seen += counts[value]
+        if lower is None and seen > lower_rank:
+            lower = value
+        if seen > upper_rank:
+            return _interpolate(lower, value, position - lower_rank, q)
+    raise AssertionError("unreachable: ranks are always within the histogram")
+
+
+class KllSketch:
+    """Mergeable KLL quantile sketch over float64 values.
+
+    Level `h` holds items of weight 2**h. When a level outgrows its capacity it is sorted and
+    every other item (random offset) is promoted to the next level, which keeps the total
+    weight exact and bounds memory to at most about 3 * k items.
+    """
+
+    def __init__(self, k: int = DEFAULT_SKETCH_K, seed: int = 0) -> None:
+        if k < 8:
+            raise ValueError(f"KLL k must be >= 8, got {k}")
+        self.k = k
+        self.count = 0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self.levels: list[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    @classmethod
+    def for_error(cls, rank_error: float, seed: int = 0) -> KllSketch:
+        """Sketch sized for an approximate normalized rank error (e.g. 0.01 for 1%)."""
+        if not 0.0 < rank_error < 1.0:
+            raise ValueError(f"Rank error must be between 0 and 1, got {rank_error}")
+        return cls(k=max(8, math.ceil(_KLL_RANK_ERROR / rank_error)), seed=seed)
+
+    @property
+    def rank_error(self) -> float:
+        return _KLL_RANK_ERROR / self.k
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, math.ceil(self.k * _KLL_CAPACITY_DECAY**depth))
+
+    def update(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if not values.size:
+            return
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.count += values.size
+        self.minimum = min(self.minimum, float(values.min()))
+        self.maximum = max(self.maximum, float(values.max()))
+        self._compress()
+
+    def merge(self, other: KllSketch) -> None:
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        self._compress()
+
+    def _compress(self) -> None:
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if items.size > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # An odd item stays behind so the promoted pairs keep the total weight exact.
+                keep = items[-1:] if items.size % 2 else items[:0]
+                pairs = items[: items.size - keep.size]
+                offset = int(self._rng.integers(2))
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], pairs[offset::2]])
+                self.levels[level] = keep
+            level += 1
+
+    def items(self) -> int:
+        return sum(items.size for items in self.levels)
+
+    def quantile(self, q: float) -> float:
+        """Approximate quantile; the value at rank q * (n - 1) within about `rank_error`."""
+        check_quantile(q)
+        if not self.count:
+            return 0.0
+        if q in (0.0, 1.0):
+            # The extremes are tracked exactly; compaction may have dropped them.
+            return self.minimum if q == 0.0 else self.maximum
+        values = np.concatenate(self.levels)
+        weights = np.concatenate(
+            [
+                np.full(items.size, 2**level, dtype=np.int64)
+                for level, items in enumerate(self.levels)
+            ]
+        )
+        order = np.argsort(values, kind="stable")
+        values, cumulative = values[order], np.cumsum(weights[order])
+        position = (self.count - 1) * q
+        lower_rank = math.floor(position)
+        upper_rank = min(lower_rank + 1, self.count - 1)
+        lower = values[np.searchsorted(cumulative, lower_rank, side="right")]
+        upper = values[np.searchsorted(cumulative, upper_rank, side="right")]
+        return _interpolate(lower, upper, position - lower_rank, q)
@@ -0,0 +1,129 @@
+"""Concurrent ranged S3 reads shared by the processing scripts.
+
+One pooled client serves every object. Each object is fetched as fixed-size ranged GETs issued
+by a thread pool, with at most `concurrency` parts in flight per object, and the parts are
+handed over in order, either as a buffered binary stream for the CSV parser
+(`open_s3_stream`) or written into a local file (`download_s3_file`). Every part is pinned with
+If-Match to the ETag the read started with, so an object overwritten mid-read fails the read
+instead of mixing bytes of two versions.
+"""
+
+from __future__ import annotations
+
+import io
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Generator
+
+DEFAULT_PART_BYTES = 8 * 1024 * 1024
+DEFAULT_CONCURRENCY = 8
+
+
+def parse_s3_uri(uri: str) -> tuple[str, str]:
+    if not uri.startswith("s3://"):
+        raise ValueError(f"Invalid S3 URI: {uri}")
+    no_scheme = uri[5:]
+    bucket, key = no_scheme.split("/", 1)
+    return bucket, key
+
+
+def make_s3_client(max_pool_connections: int = 2 * DEFAULT_CONCURRENCY):
+    """One S3 client whose HTTP pool fits every ranged GET issued concurrently."""
+    import boto3
+    from botocore.config import Config
+
+    return boto3.client("s3", config=Config(max_pool_connections=max_pool_connections))
+
+
+def _get_range(s3_client, bucket: str, key: str, etag: str, start: int, end: int) -> bytes:
+    from botocore.exceptions import ClientError
+
+    try:
+        response = s3_client.get_object(
+            Bucket=bucket, Key=key, Range=f"bytes={start}-{end - 1}", IfMatch=etag
+        )
+    except ClientError as exc:
+        if exc.response.get("Error", {}).get("Code") in ("PreconditionFailed", "412"):
+            raise RuntimeError(
+                f"s3://{bucket}/{key} changed while it was being read (expected ETag {etag})."
+            ) from exc
+        raise
+    return response["Body"].read()
+
+
+def iter_s3_parts(
+    s3_client,
+    uri: str,
+    part_bytes: int = DEFAULT_PART_BYTES,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> Generator[bytes, None, None]:
+    """Yield the object's bytes in order, fetching up to `concurrency` ranges ahead."""
+    bucket, key = parse_s3_uri(uri)
+    head = s3_client.head_object(Bucket=bucket, Key=key)
+    size, etag = head["ContentLength"], head["ETag"]
+    ranges = ((start, min(start + part_bytes, size)) for start in range(0, size, part_bytes))
+    pool = ThreadPoolExecutor(max_workers=concurrency)
+    in_flight: deque[Future[bytes]] = deque()
+    try:
+        for start, end in ranges:
+            in_flight.append(pool.submit(_get_range, s3_client, bucket, key, etag, start, end))
+            if len(in_flight) >= concurrency:
+                yield in_flight.popleft().result()
+        while in_flight:
+            yield in_flight.popleft().result()
+    finally:
+        # Also runs when the consumer closes the generator early or a part fails: drop the parts
+        # not yet started and wait for the running ones, so no request outlives the read.
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+class _PartsReader(io.RawIOBase):
+    def __init__(self, parts: Generator[bytes, None, None]) -> None:
+        self._parts = parts
+        self._current = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        # Closing the stream stops the part generator, which shuts its thread pool down.
+        if not self.closed:
+            self._parts.close()
+        super().close()
+
+    def readinto(self, buffer) -> int:
+        while not self._current:
+            part = next(self._parts, None)
+            if part is None:
+                return 0
+            self._current = memoryview(part)
+        size = min(len(buffer), len(self._current))
+        buffer[:size] = self._current[:size]
+        self._current = self._current[size:]
+        return size
+
+
+def open_s3_stream(
+    s3_client,
+    uri: str,
+    part_bytes: int = DEFAULT_PART_BYTES,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> io.BufferedReader:
+    """Binary stream over an S3 object; ranged GETs run ahead while the caller parses."""
+    parts = iter_s3_parts(s3_client, uri, part_bytes=part_bytes, concurrency=concurrency)
+    return io.BufferedReader(_PartsReader(parts), buffer_size=part_bytes)
+
+
+def download_s3_file(
+    s3_client,
+    uri: str,
+    target_path: Path,
+    part_bytes: int = DEFAULT_PART_BYTES,
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> None:
+    """Ranged concurrent download for callers that need a local file (hashing, byte shards)."""
+    target_path.parent.mkdir(parents=True, exist_ok=True)
+    with target_path.open("wb") as f:
+        for part in iter_s3_parts(s3_client, uri, part_bytes=part_bytes, concurrency=concurrency):
+            f.write(part)
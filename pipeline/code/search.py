@@ -0,0 +1,150 @@
+"""Successive-halving hyperparameter search over one loaded training matrix.
+
+Candidates are sampled from SEARCH_SPACE and trained in rungs of growing round budgets
+(`min_rounds`, `min_rounds * factor`, ... up to `max_rounds`). After each rung only the best
+`1 / factor` by validation logloss go on, and they continue from their own model instead of
+starting over. Workers are forked from the process that loaded the matrices, so they all read
+the same DMatrix (copy-on-write) instead of loading or pickling their own copy.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import xgboost as xgb
+
+# name: (kind, low, high); log ranges are sampled uniformly in log space.
+SEARCH_SPACE = {
+    "max_depth": ("int", 3, 8),
+    "eta": ("log", 0.02, 0.3),
+    "subsample": ("float", 0.6, 1.0),
+    "colsample_bytree": ("float", 0.6, 1.0),
+    "min_child_weight": ("log", 1.0, 10.0),
+}
+SEARCH_METRIC = "logloss"
+
+# (dtrain, dvalidation) of the parent; forked workers inherit them.
+_MATRICES: tuple[xgb.DMatrix, xgb.DMatrix] | None = None
+
+
+def sample_candidates(count: int, seed: int) -> list[dict[str, object]]:
+    rng = np.random.default_rng(seed)
+    candidates = []
+    for _ in range(count):
+        params: dict[str, object] = {}
+        for name, (kind, low, high) in SEARCH_SPACE.items():
+            if kind == "int":
+                params[name] = int(rng.integers(low, high + 1))
+            elif kind == "log":
+                params[name] = round(float(np.exp(rng.uniform(np.log(low), np.log(high)))), 4)
+            else:
+                params[name] = round(float(rng.uniform(low, high)), 4)
+        candidates.append(params)
+    return candidates
+
+
+def rung_rounds(min_rounds: int, max_rounds: int, factor: int) -> list[int]:
+    """Cumulative rounds per rung, e.g. [25, 75, 200] for 25, 200 and factor 3."""
+    if min_rounds < 1 or factor < 2:
+        raise ValueError(f"Need min_rounds >= 1 and factor >= 2, got {min_rounds} and {factor}")
+    rounds = []
+    budget = min(min_rounds, max_rounds)
+    while budget < max_rounds:
+        rounds.append(budget)
+        budget *= factor
+    rounds.append(max_rounds)
+    return rounds
+
+
+def candidate_params(
+    base_params: dict[str, object],
+    candidate: dict[str, object],
+) -> dict[str, object]:
+    # XGBoost samples rows from a process-wide RNG; reseeding it every round makes a candidate's
+    # trees independent of what its worker trained before, so results do not depend on workers.
+    return {**base_params, **candidate, "eval_metric": SEARCH_METRIC, "seed_per_iteration": True}
+
+
+def _train_candidate(
+    index: int,
+    params: dict[str, object],
+    rounds: int,
+    model: bytes | None,
+) -> tuple[int, float, bytes]:
+    dtrain, dvalidation = _MATRICES
+    history: dict[str, dict[str, list[float]]] = {}
+    booster = xgb.train(
+        params,
+        dtrain,
+        num_boost_round=rounds,
+        evals=[(dvalidation, "validation")],
+        evals_result=history,
+        verbose_eval=False,
+        xgb_model=None if model is None else xgb.Booster(model_file=bytearray(model)),
+    )
+    return index, history["validation"][SEARCH_METRIC][-1], bytes(booster.save_raw("json"))
+
+
+def successive_halving(
+    base_params: dict[str, object],
+    candidates: list[dict[str, object]],
+    dtrain: xgb.DMatrix,
+    dvalidation: xgb.DMatrix,
+    rungs: list[int],
+    factor: int,
+    workers: int,
+) -> tuple[int, bytes, list[dict[str, object]]]:
+    """(best candidate index, its model as JSON bytes, leaderboard best first).
+
+    `base_params` carries the per-worker nthread; candidate params override the rest.
+    """
+    global _MATRICES
+    _MATRICES = (dtrain, dvalidation)
+    params = [candidate_params(base_params, candidate) for candidate in candidates]
+    losses: dict[int, list[float]] = {index: [] for index in range(len(candidates))}
+    models: dict[int, bytes | None] = dict.fromkeys(losses)
+    survivors = list(losses)
+    pool = None
+    if workers > 1 and len(candidates) > 1:
+        # fork, not spawn: the workers must inherit _MATRICES rather than load their own.
+        context = multiprocessing.get_context("fork")
+        pool = ProcessPoolExecutor(max_workers=min(workers, len(candidates)), mp_context=context)
+    try:
+        done = 0
+        for rung, total in enumerate(rungs):
+            tasks = [(index, params[index], total - done, models[index]) for index in survivors]
+            if pool is None:
+                results = [_train_candidate(*task) for task in tasks]
+            else:
+                results = list(pool.map(_train_candidate, *zip(*tasks)))
+            for index, loss, model in results:
+                losses[index].append(loss)
+                models[index] = model
+            done = total
+            if rung < len(rungs) - 1:
+                survivors.sort(key=lambda index: (losses[index][-1], index))
+                keep = max(1, len(survivors) // factor)
+                for index in survivors[keep:]:
+                    models[index] = None
+                survivors = survivors[:keep]
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        _MATRICES = None
+
+    best = min(survivors, key=lambda index: (losses[index][-1], index))
+    order = sorted(losses, key=lambda index: (-len(losses[index]), losses[index][-1], index))
+    leaderboard = [
+        {
+            "rank": rank,
+            "candidate": index,
+            "params": candidates[index],
+            "rounds": rungs[len(losses[index]) - 1],
+            "validation_logloss": losses[index][-1],
+            "rung_logloss": losses[index],
+        }
+        for rank, index in enumerate(order, start=1)
+    ]
+    return best, models[best], leaderboard
@@ -0,0 +1,144 @@
+"""Sharded multi-process encoding of one input CSV into channel part files.
+
+The input is cut into byte ranges on record boundaries (`features.shard_byte_ranges`). Fill
+statistics are reduced once from per-shard value counts or KLL sketches and the fitted
+preprocessor is handed to every worker, which encodes its range and writes its own part file
+(`train_xgb-00000.csv`, ...). With several processing instances, host `i` of `n` takes shards
+`i`, `i + n`, ... so part names never clash in the shared S3 output prefix.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, Sequence
+
+from features import (
+    FILL_COLUMNS,
+    batch_rows,
+    concat_batches,
+    fill_state_values,
+    fill_strategy,
+    iter_range_columns,
+    labels_from_columns,
+    merge_fill_state,
+    new_fill_state,
+    read_header,
+    shard_byte_ranges,
+    transform_columns,
+    update_fill_state,
+)
+from formats import part_file_name, write_matrix
+
+RESOURCE_CONFIG = Path("/opt/ml/config/resourceconfig.json")
+
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def current_host_slot(config_path: Path = RESOURCE_CONFIG) -> tuple[int, int]:
+    """(host index, host count) of this processing instance; (0, 1) outside SageMaker."""
+    if not config_path.exists():
+        return 0, 1
+    config = json.loads(config_path.read_text(encoding="utf-8"))
+    hosts = sorted(config["hosts"])
+    return hosts.index(config["current_host"]), len(hosts)
+
+
+def _run(fn: Callable, arguments: Iterable[tuple], workers: int) -> list:
+    arguments = list(arguments)
+    if workers <= 1 or len(arguments) <= 1:
+        return [fn(*args) for args in arguments]
+    with ProcessPoolExecutor(max_workers=min(workers, len(arguments))) as pool:
+        return list(pool.map(fn, *zip(*arguments)))
+
+
+def _read_csv_header(path: Path) -> list[str]:
+    with path.open("rb") as f:
+        return read_header(f)
+
+
+def _shard_fill_state(
+    path: Path,
+    header: Sequence[str],
+    start: int,
+    end: int,
+    strategy: dict[str, object],
+    seed: int,
+) -> dict:
+    state = new_fill_state(strategy, seed)
+    for batch in iter_range_columns(path, header, start, end, columns=FILL_COLUMNS):
+        update_fill_state(state, batch)
+    return state
+
+
+def sharded_fill_values(
+    path: Path,
+    shards: int,
+    workers: int,
+    strategy: dict[str, object] | None = None,
+) -> tuple[float, float]:
+    """Same (age_fill, fare_fill) as `features.fill_values`, reduced from per-shard states.
+
+    Exact fills merge per-shard value counts; sketched fills merge per-shard KLL sketches, each
+    seeded with its shard index (the merged sketch with the shard count).
+    """
+    strategy = strategy or fill_strategy()
+    header = _read_csv_header(path)
+    ranges = shard_byte_ranges(path, shards)
+    results = _run(
+        _shard_fill_state,
+        [(path, header, start, end, strategy, index) for index, (start, end) in enumerate(ranges)],
+        workers,
+    )
+    state = new_fill_state(strategy, seed=len(ranges))
+    for shard_state in results:
+        merge_fill_state(state, shard_state)
+    return fill_state_values(state, strategy)
+
+
+def _encode_shard(
+    path: Path,
+    header: Sequence[str],
+    start: int,
+    end: int,
+    preprocessor: dict[str, object],
+    output_path: Path,
+    fmt: str,
+) -> int:
+    columns = concat_batches(list(iter_range_columns(path, header, start, end)))
+    rows = batch_rows(columns)
+    if not rows:
+        return 0
+    labels = labels_from_columns(columns)
+    features = transform_columns(columns, preprocessor)
+    write_matrix(output_path, labels, features, fmt)
+    return rows
+
+
+def encode_sharded(
+    path: Path,
+    output_dir: Path,
+    stem: str,
+    fmt: str,
+    preprocessor: dict[str, object],
+    shards: int,
+    workers: int,
+    host_index: int = 0,
+    host_count: int = 1,
+) -> int:
+    """Encode this host's shards of `path` into `output_dir` part files; returns rows written."""
+    header = _read_csv_header(path)
+    ranges = shard_byte_ranges(path, shards)
+    if not ranges:
+        raise ValueError(f"Input CSV has no rows: {path}")
+    arguments = []
+    for index, (start, end) in enumerate(ranges):
+        if index % host_count != host_index:
+            continue
+        output_path = output_dir / part_file_name(stem, index, fmt)
+        arguments.append((path, header, start, end, preprocessor, output_path, fmt))
+    return sum(_run(_encode_shard, arguments, workers))
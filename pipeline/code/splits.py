@@ -0,0 +1,73 @@
+"""Keyed-hash row assignment shared by prepare_titanic_splits.py and train.py's k-fold CV.
+
+A row's unit value depends only on (seed, label, row id), so assignments are deterministic,
+independent of input order and of every other row, and stratified by label in expectation.
+"""
+
+from __future__ import annotations
+
+import hashlib
+
+import numpy as np
+
+
+def split_hash_unit(seed: int, label: str, row_id: str) -> float:
+    """Uniform value in [0, 1) fixed by (seed, label, row id) and independent of other rows."""
+    digest = hashlib.blake2b(
+        f"{label.strip()}\x1f{row_id.strip()}".encode("utf-8"),
+        digest_size=8,
+        key=str(seed).encode("utf-8"),
+    ).digest()
+    return int.from_bytes(digest, "big") / 2.0**64
+
+
+def hash_units(labels: np.ndarray, seed: int) -> np.ndarray:
+    """split_hash_unit(seed, label, position) of every row, with integer-valued float labels.
+
+    Encoded channels carry no PassengerId, so the row id is the row's position in the channel.
+    blake2b has no vectorized form, so this stays a Python loop over the rows: 1 to 2 us per
+    row on one core (`benchmark_pipeline_code.py cv` reports it), seconds for millions of rows,
+    next to minutes of training on the same rows.
+    """
+    # Same digests as split_hash_unit, without re-keying blake2b for every row.
+    keyed = hashlib.blake2b(digest_size=8, key=str(seed).encode("utf-8"))
+    names = {value: str(int(value)) for value in np.unique(labels).tolist()}
+    digests = bytearray()
+    for position, label in enumerate(labels.tolist()):
+        row = keyed.copy()
+        row.update(f"{names[label]}\x1f{position}".encode("utf-8"))
+        digests += row.digest()
+    return np.frombuffer(bytes(digests), dtype=">u8") / 2.0**64
+
+
+def hash_folds(labels: np.ndarray, folds: int, seed: int) -> np.ndarray:
+    """Fold of every row as int32: floor(unit * folds), stratified by label only in expectation.
+
+    A row's fold never depends on other rows. Fold 0 is exactly the set
+    `prepare_titanic_splits.py --method hash --validation-ratio 1/folds` would send to
+    validation for the same seed, labels and ids.
+    """
+    _check_folds(folds)
+    units = hash_units(labels, seed)
+    return np.minimum((units * folds).astype(np.int32), folds - 1)
+
+
+def stratified_folds(labels: np.ndarray, folds: int, seed: int) -> np.ndarray:
+    """Fold of every row as int32, with each label's rows split evenly (sizes differ by <= 1).
+
+    Each label's rows are ordered by their hash unit and cut into `folds` consecutive blocks, so
+    the assignment is as deterministic as hash_folds, but adding rows can move existing ones.
+    """
+    _check_folds(folds)
+    units = hash_units(labels, seed)
+    assignment = np.empty(len(labels), dtype=np.int32)
+    for label in np.unique(labels):
+        rows = np.flatnonzero(labels == label)
+        ordered = rows[np.argsort(units[rows], kind="stable")]
+        assignment[ordered] = np.arange(len(rows)) * folds // len(rows)
+    return assignment
+
+
+def _check_folds(folds: int) -> None:
+    if folds < 2:
+        raise ValueError(f"Need at least 2 folds, got {folds}")
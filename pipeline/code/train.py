@@ -1,34 +1,687 @@
 #!/usr/bin/env python3
-"""Optional custom training script placeholder for phase 03.
+"""Script-mode XGBoost trainer for the channels written by preprocess.py.
 
-The canonical workflow in this phase uses SageMaker built-in XGBoost, so this script is
-kept for repository completeness and future custom container/script mode experiments.
+The train and validation channels (a single file or a directory of part files, in any
+formats.OUTPUT_FORMATS) are loaded into DMatrix objects and cached as XGBoost binary buffers keyed
+by their content, so a repeat run over the same channels skips parsing. Training uses the hist
+tree method with an explicit thread count and optional early stopping on the validation channel.
+
+The model is written to --output-dir as `xgboost-model` in JSON, the first name
+evaluate.ensure_model_file looks for and a format every XGBoost release since 1.0 loads, next to
+a training.json summary.
+
+With --data-mode quantile or external the channels never sit in memory as float matrices: a
+ChannelIter (xgboost.DataIter) streams their part files --batch-rows at a time into a
+QuantileDMatrix (only the quantized matrix is kept) or into an external-memory DMatrix paged to
+--external-cache-dir. training.json records the peak RSS of the run.
+
+With --search-candidates N, N sampled configurations compete by successive halving (search.py)
+in a process pool sharing the loaded matrices; the winner is written as the model, with its
+config and the leaderboard in search.json.
+
+With --cv-folds K, the train channel is first cross-validated (crossval.py): it is quantized once
+into a QuantileDMatrix, rows get deterministic label-stratified folds from the keyed hash of
+prepare_titanic_splits.py (splits.py), and the K folds train at the same time in a process pool
+sharing that matrix. Per-fold and aggregate metrics go to cv.json; the model itself is still
+trained on the whole train channel.
+
+With --checkpoint-interval N, the booster is checkpointed every N rounds (checkpoints.py) under
+--checkpoint-dir, /opt/ml/checkpoints by default, which SageMaker syncs to the job's checkpoint
+S3 URI. A restarted run (e.g. after a spot interruption) resumes from the newest valid checkpoint
+of the same data and parameters, trains only the remaining rounds and writes the model an
+uninterrupted run would have.
+
+Under SageMaker, /opt/ml/input/config/hyperparameters.json supplies the defaults with the keys the
+built-in container takes (num_round, max_depth, eta, ...); command-line flags override them.
 """
 
 from __future__ import annotations
 
 import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
 from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import xgboost as xgb
+
+from cache import content_key
+from checkpoints import (
+    DEFAULT_CHECKPOINT_DIR,
+    CheckpointCallback,
+    checkpoint_name,
+    latest_checkpoint,
+    resume_training,
+    run_directory,
+)
+from crossval import cross_validate
+from formats import (
+    DEFAULT_CHUNK_ROWS,
+    OUTPUT_FORMATS,
+    channel_files,
+    iter_matrix_chunks,
+    read_matrix,
+)
+from search import candidate_params, rung_rounds, sample_candidates, successive_halving
+from splits import hash_folds, stratified_folds
+
+MODEL_FILE_NAME = "xgboost-model"
+SUMMARY_FILE_NAME = "training.json"
+SEARCH_FILE_NAME = "search.json"
+CV_FILE_NAME = "cv.json"
+CV_ASSIGNMENTS = {"stratified": stratified_folds, "hash": hash_folds}
+HYPERPARAMETERS_PATH = Path("/opt/ml/input/config/hyperparameters.json")
+DEFAULT_DMATRIX_CACHE_DIR = Path("/tmp/dmatrix_cache")
+TREE_METHODS = ("hist", "approx", "exact")
+DATA_MODES = ("memory", "quantile", "external")
 
 
 def parse_args() -> argparse.Namespace:
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--train", default="/opt/ml/input/data/train/train_xgb.csv")
-    parser.add_argument("--validation", default="/opt/ml/input/data/validation/validation_xgb.csv")
-    parser.add_argument("--output-dir", default="/opt/ml/model")
-    return parser.parse_args()
+    parser = argparse.ArgumentParser(description="Train the Titanic XGBoost model.")
+    parser.add_argument(
+        "--train",
+        default=os.environ.get("SM_CHANNEL_TRAIN", "/opt/ml/input/data/train"),
+        help="Train channel: one file or a directory of part files.",
+    )
+    parser.add_argument(
+        "--validation",
+        default=os.environ.get("SM_CHANNEL_VALIDATION", "/opt/ml/input/data/validation"),
+        help="Validation channel for eval metrics and early stopping (empty: none).",
+    )
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="csv")
+    parser.add_argument("--output-dir", default=os.environ.get("SM_MODEL_DIR", "/opt/ml/model"))
+    parser.add_argument(
+        "--dmatrix-cache-dir",
+        default=str(DEFAULT_DMATRIX_CACHE_DIR),
+        help="Directory of binary DMatrix buffers keyed by channel content (empty: no cache).",
+    )
+    parser.add_argument(
+        "--data-mode",
+        "--data_mode",
+        choices=DATA_MODES,
+        default="memory",
+        help=(
+            "memory loads each channel whole; quantile streams it into a QuantileDMatrix; "
+            "external streams it into an external-memory DMatrix with an on-disk page cache."
+        ),
+    )
+    parser.add_argument(
+        "--batch-rows",
+        type=int,
+        default=DEFAULT_CHUNK_ROWS,
+        help="Rows per DataIter batch in the quantile and external data modes.",
+    )
+    parser.add_argument(
+        "--external-cache-dir",
+        default="",
+        help="Page cache of the external data mode (empty: a temporary directory, removed after).",
+    )
+    parser.add_argument("--objective", default="binary:logistic")
+    parser.add_argument("--num-round", "--num_round", type=int, default=200)
+    parser.add_argument("--max-depth", "--max_depth", type=int, default=5)
+    parser.add_argument("--eta", type=float, default=0.2)
+    parser.add_argument("--subsample", type=float, default=0.8)
+    parser.add_argument("--eval-metric", "--eval_metric", default="logloss")
+    parser.add_argument("--tree-method", "--tree_method", choices=TREE_METHODS, default="hist")
+    parser.add_argument("--max-bin", "--max_bin", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--nthread",
+        type=int,
+        default=0,
+        help="Threads for loading and training (0: every core).",
+    )
+    parser.add_argument(
+        "--early-stopping-rounds",
+        "--early_stopping_rounds",
+        type=int,
+        default=0,
+        help="Stop after this many rounds without a better validation eval metric (0: off).",
+    )
+    parser.add_argument(
+        "--search-candidates",
+        type=int,
+        default=0,
+        help="Sampled configurations for a successive-halving search (0: train once).",
+    )
+    parser.add_argument(
+        "--search-min-rounds",
+        type=int,
+        default=25,
+        help="Rounds of the first search rung; each later rung multiplies by the factor.",
+    )
+    parser.add_argument(
+        "--search-reduction-factor",
+        type=int,
+        default=3,
+        help="Each rung keeps the best 1/factor of the candidates by validation logloss.",
+    )
+    parser.add_argument(
+        "--search-workers",
+        type=int,
+        default=0,
+        help="Search processes; each gets nthread // workers threads (0: one per core).",
+    )
+    parser.add_argument(
+        "--cv-folds",
+        "--cv_folds",
+        type=int,
+        default=0,
+        help="Cross-validate the train channel over this many stratified folds first (0: off).",
+    )
+    parser.add_argument(
+        "--cv-seed",
+        "--cv_seed",
+        type=int,
+        default=42,
+        help="Fold assignment seed, with the meaning --seed has in prepare_titanic_splits.py.",
+    )
+    parser.add_argument(
+        "--cv-assignment",
+        choices=tuple(CV_ASSIGNMENTS),
+        default="stratified",
+        help=(
+            "stratified: each label split evenly in keyed-hash order; hash: fold = "
+            "floor(unit * K), stratified in expectation and stable when rows are appended."
+        ),
+    )
+    parser.add_argument(
+        "--cv-workers",
+        "--cv_workers",
+        type=int,
+        default=0,
+        help="Fold processes; each gets nthread // workers threads (0: one per core).",
+    )
+    parser.add_argument(
+        "--checkpoint-interval",
+        "--checkpoint_interval",
+        type=int,
+        default=0,
+        help="Checkpoint the model every this many rounds and resume from them (0: off).",
+    )
+    parser.add_argument(
+        "--checkpoint-dir",
+        default=str(DEFAULT_CHECKPOINT_DIR),
+        help="Checkpoint root; SageMaker syncs /opt/ml/checkpoints with the job's S3 URI.",
+    )
+    parser.add_argument(
+        "--checkpoint-keep",
+        "--checkpoint_keep",
+        type=int,
+        default=3,
+        help="Newest checkpoints kept per run; older ones are deleted.",
+    )
+    parser.set_defaults(**hyperparameter_defaults(parser, HYPERPARAMETERS_PATH))
+    args = parser.parse_args()
+    if args.num_round < 1:
+        parser.error("--num-round must be at least 1.")
+    if args.early_stopping_rounds and not args.validation:
+        parser.error("--early-stopping-rounds needs a --validation channel.")
+    if args.data_mode != "memory":
+        if args.format == "dmatrix":
+            parser.error(f"--data-mode {args.data_mode} streams csv, libsvm or parquet channels.")
+        if args.tree_method != "hist":
+            parser.error(f"--data-mode {args.data_mode} needs --tree-method hist.")
+        if args.batch_rows < 1:
+            parser.error("--batch-rows must be at least 1.")
+    if args.search_candidates:
+        if not args.validation:
+            parser.error("--search-candidates ranks on the validation channel; pass --validation.")
+        if args.early_stopping_rounds:
+            parser.error("--search-candidates prunes by rung; drop --early-stopping-rounds.")
+        if args.data_mode == "external":
+            parser.error("--search-candidates shares in-memory matrices; use memory or quantile.")
+        if args.search_min_rounds < 1 or args.search_reduction_factor < 2:
+            parser.error("--search-min-rounds must be >= 1 and --search-reduction-factor >= 2.")
+    if args.cv_folds:
+        if args.cv_folds < 2:
+            parser.error("--cv-folds must be at least 2.")
+        if args.search_candidates or args.early_stopping_rounds:
+            parser.error(
+                "--cv-folds trains every fold for --num-round rounds; drop the search and early "
+                "stopping."
+            )
+        if args.data_mode == "external" or args.format == "dmatrix":
+            parser.error(
+                "--cv-folds quantizes csv, libsvm or parquet channels in the memory or quantile "
+                "data mode."
+            )
+        if args.tree_method != "hist":
+            parser.error("--cv-folds trains on a QuantileDMatrix and needs --tree-method hist.")
+    if args.checkpoint_interval < 0:
+        parser.error("--checkpoint-interval must be at least 1, or 0 to turn checkpoints off.")
+    if args.checkpoint_interval:
+        if args.checkpoint_keep < 1:
+            parser.error("--checkpoint-keep must be at least 1.")
+        if args.search_candidates:
+            parser.error("--checkpoint-interval checkpoints a single training run, not a search.")
+        if args.early_stopping_rounds:
+            parser.error(
+                "--checkpoint-interval cannot carry early-stopping state across a resume; drop "
+                "--early-stopping-rounds."
+            )
+    return args
+
+
+def hyperparameter_defaults(parser: argparse.ArgumentParser, path: Path) -> dict[str, str]:
+    """SageMaker hyperparameters as parser defaults; unknown keys (sagemaker_*) are ignored.
+
+    Values are passed as strings so argparse applies each flag's type, as for a command line.
+    """
+    if not path.is_file():
+        return {}
+    defaults = {}
+    for key, value in json.loads(path.read_text(encoding="utf-8")).items():
+        dest = key.replace("-", "_")
+        if parser.get_default(dest) is None:
+            continue
+        if isinstance(value, str):
+            # Framework estimators JSON-encode every value, e.g. '"binary:logistic"'.
+            try:
+                value = json.loads(value)
+            except ValueError:
+                pass
+        defaults[dest] = str(value)
+    return defaults
+
+
+def training_params(args: argparse.Namespace) -> dict[str, object]:
+    return {
+        "objective": args.objective,
+        "max_depth": args.max_depth,
+        "eta": args.eta,
+        "subsample": args.subsample,
+        "eval_metric": args.eval_metric,
+        "tree_method": args.tree_method,
+        "max_bin": args.max_bin,
+        "nthread": args.nthread or os.cpu_count() or 1,
+        "seed": args.seed,
+    }
+
+
+def read_channel(files: list[Path], fmt: str) -> tuple[np.ndarray, np.ndarray]:
+    """(labels, float32 features) of every part file of a csv, libsvm or parquet channel."""
+    blocks = [read_matrix(path, fmt, dtype=np.float32) for path in files]
+    if len(blocks) == 1:
+        return blocks[0]
+    return np.concatenate([block[0] for block in blocks]), np.concatenate([b[1] for b in blocks])
+
+
+def build_dmatrix(files: list[Path], fmt: str, nthread: int) -> xgb.DMatrix:
+    if fmt == "dmatrix":
+        if len(files) != 1:
+            raise ValueError(f"A dmatrix channel is a single buffer; found {len(files)} files.")
+        return xgb.DMatrix(str(files[0]), nthread=nthread)
+    labels, features = read_channel(files, fmt)
+    # Absent libsvm entries come back as NaN, the missing value XGBoost assumes by default.
+    return xgb.DMatrix(features, label=labels, nthread=nthread)
+
+
+def load_channel(
+    path: Path,
+    fmt: str,
+    nthread: int,
+    cache_dir: Path | None,
+) -> tuple[xgb.DMatrix, str]:
+    """DMatrix for a channel and whether it came from the binary cache (hit, miss or off)."""
+    files = channel_files(path, fmt)
+    if cache_dir is None:
+        return build_dmatrix(files, fmt, nthread), "off"
+
+    # The binary layout belongs to the XGBoost release, so the version is part of the key.
+    key = content_key(files, {"format": fmt, "xgboost": xgb.__version__})
+    buffer = cache_dir / f"{key}.buffer"
+    if buffer.is_file():
+        return xgb.DMatrix(str(buffer), nthread=nthread), "hit"
+
+    matrix = build_dmatrix(files, fmt, nthread)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    # Write under a temporary name and rename, so a concurrent run never loads half a buffer.
+    fd, partial = tempfile.mkstemp(dir=cache_dir, prefix=f".{key}.")
+    os.close(fd)
+    try:
+        matrix.save_binary(partial)
+        os.replace(partial, buffer)
+    finally:
+        Path(partial).unlink(missing_ok=True)
+    return matrix, "miss"
+
+
+class ChannelIter(xgb.DataIter):
+    """Feeds a channel to XGBoost `batch_rows` rows at a time, part file after part file.
+
+    Each batch is a view into formats.iter_matrix_chunks' reused blocks; XGBoost consumes it
+    inside `input_data`, before the next batch overwrites it.
+    """
+
+    def __init__(
+        self,
+        files: list[Path],
+        fmt: str,
+        batch_rows: int,
+        cache_prefix: str | None = None,
+    ) -> None:
+        self._files = files
+        self._fmt = fmt
+        self._batch_rows = batch_rows
+        self._batches: Iterator[tuple[np.ndarray, np.ndarray]] | None = None
+        super().__init__(cache_prefix=cache_prefix)
+
+    def _iter_batches(self) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        for path in self._files:
+            yield from iter_matrix_chunks(path, self._fmt, self._batch_rows, dtype=np.float32)
+
+    def next(self, input_data) -> int:
+        if self._batches is None:
+            self._batches = self._iter_batches()
+        batch = next(self._batches, None)
+        if batch is None:
+            return 0
+        labels, features = batch
+        input_data(data=features, label=labels)
+        return 1
+
+    def reset(self) -> None:
+        self._batches = None
+
+
+def stream_channel(
+    path: Path,
+    args: argparse.Namespace,
+    nthread: int,
+    cache_prefix: str,
+    ref: xgb.DMatrix | None = None,
+) -> xgb.DMatrix:
+    """QuantileDMatrix (quantile mode) or external-memory DMatrix (external mode) of a channel."""
+    files = channel_files(path, args.format)
+    if args.data_mode == "quantile":
+        # Validation reuses the train cuts through `ref`, as XGBoost requires for evaluation.
+        return xgb.QuantileDMatrix(
+            ChannelIter(files, args.format, args.batch_rows),
+            max_bin=args.max_bin,
+            ref=ref,
+            nthread=nthread,
+        )
+    iterator = ChannelIter(files, args.format, args.batch_rows, cache_prefix)
+    return xgb.DMatrix(iterator, nthread=nthread)
+
+
+def load_evals(
+    args: argparse.Namespace,
+    nthread: int,
+    external_dir: Path,
+) -> tuple[list[tuple[xgb.DMatrix, str]], dict[str, str]]:
+    """(matrix, name) pairs for xgb.train and the binary-cache state of each channel."""
+    channels = [("train", Path(args.train))]
+    if args.validation:
+        channels.append(("validation", Path(args.validation)))
+    evals: list[tuple[xgb.DMatrix, str]] = []
+    dmatrix_cache: dict[str, str] = {}
+    cache_dir = Path(args.dmatrix_cache_dir) if args.dmatrix_cache_dir else None
+    for name, path in channels:
+        if args.data_mode == "memory":
+            matrix, dmatrix_cache[name] = load_channel(path, args.format, nthread, cache_dir)
+        else:
+            ref = evals[0][0] if evals else None
+            matrix = stream_channel(path, args, nthread, str(external_dir / name), ref)
+            dmatrix_cache[name] = "off"
+        evals.append((matrix, name))
+    return evals, dmatrix_cache
+
+
+def peak_rss_mib() -> int:
+    # VmHWM belongs to this address space; ru_maxrss can carry over a forked parent's peak.
+    try:
+        with open("/proc/self/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmHWM"):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    import resource
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024
+
+
+def run_search(
+    args: argparse.Namespace,
+    params: dict[str, object],
+    evals: list[tuple[xgb.DMatrix, str]],
+) -> tuple[xgb.Booster, dict[str, object], dict[str, object]]:
+    """Best booster, its params and the search report for search.json."""
+    workers = min(args.search_workers or os.cpu_count() or 1, args.search_candidates)
+    # Every worker trains with its share of the threads, so the pool never oversubscribes cores.
+    base_params = {**params, "nthread": max(1, params["nthread"] // workers)}
+    candidates = sample_candidates(args.search_candidates, args.seed)
+    rungs = rung_rounds(args.search_min_rounds, args.num_round, args.search_reduction_factor)
+    best, model, leaderboard = successive_halving(
+        base_params,
+        candidates,
+        evals[0][0],
+        evals[1][0],
+        rungs,
+        args.search_reduction_factor,
+        workers,
+    )
+    best_params = candidate_params(params, candidates[best])
+    report = {
+        "metric": "validation-logloss",
+        "candidates": args.search_candidates,
+        "rungs": rungs,
+        "reduction_factor": args.search_reduction_factor,
+        "workers": workers,
+        "nthread_per_worker": base_params["nthread"],
+        "best": {
+            "candidate": best,
+            "params": best_params,
+            "validation_logloss": leaderboard[0]["validation_logloss"],
+        },
+        "leaderboard": leaderboard,
+    }
+    return xgb.Booster(model_file=bytearray(model)), best_params, report
+
+
+def run_cv(
+    args: argparse.Namespace,
+    params: dict[str, object],
+    nthread: int,
+) -> dict[str, object]:
+    """Cross-validation report of the train channel for cv.json."""
+    seconds: dict[str, float] = {}
+    start = time.perf_counter()
+    files = channel_files(Path(args.train), args.format)
+    if args.data_mode == "quantile":
+        data = ChannelIter(files, args.format, args.batch_rows)
+        matrix = xgb.QuantileDMatrix(data, max_bin=args.max_bin, nthread=nthread)
+    else:
+        labels, features = read_channel(files, args.format)
+        matrix = xgb.QuantileDMatrix(features, label=labels, max_bin=args.max_bin, nthread=nthread)
+        # Only the quantized matrix is kept; the folds never touch the float features again.
+        del labels, features
+    labels = matrix.get_label()
+    seconds["quantize"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    folds = CV_ASSIGNMENTS[args.cv_assignment](labels, args.cv_folds, args.cv_seed)
+    seconds["assign"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    workers = min(args.cv_workers or os.cpu_count() or 1, args.cv_folds)
+    fold_params = {**params, "nthread": max(1, nthread // workers)}
+    report = cross_validate(fold_params, matrix, labels, folds, args.num_round, workers)
+    seconds["train"] = time.perf_counter() - start
+    return {
+        "assignment": args.cv_assignment,
+        "seed": args.cv_seed,
+        "num_round": args.num_round,
+        "workers": workers,
+        "nthread_per_worker": fold_params["nthread"],
+        **report,
+        "timings": {"seconds": {phase: round(value, 4) for phase, value in seconds.items()}},
+    }
+
+
+def resume_checkpoint(
+    args: argparse.Namespace,
+    params: dict[str, object],
+) -> tuple[Path, xgb.Booster | None, int]:
+    """Checkpoint directory of this run, and the booster to resume with its rounds (None, 0:
+    start over). nthread is left out of the run key: it does not change the trees.
+    """
+    settings = {
+        "params": {name: value for name, value in params.items() if name != "nthread"},
+        "format": args.format,
+    }
+    files = channel_files(Path(args.train), args.format)
+    directory = run_directory(Path(args.checkpoint_dir), files, settings)
+    latest = latest_checkpoint(directory, args.num_round)
+    if latest is None:
+        return directory, None, 0
+    booster, rounds = latest
+    print(f"Resuming from {directory / checkpoint_name(rounds)} after {rounds} rounds.")
+    return directory, booster, rounds
+
+
+def train_model(
+    args: argparse.Namespace,
+    params: dict[str, object],
+    nthread: int,
+    external_dir: Path,
+) -> tuple[xgb.Booster, dict[str, object], dict[str, dict[str, object]]]:
+    """Trained booster, the training.json summary and the extra reports by file name
+    (search.json with a search, cv.json with cross-validation).
+    """
+    seconds: dict[str, float] = {}
+    reports: dict[str, dict[str, object]] = {}
+    if args.cv_folds:
+        start = time.perf_counter()
+        reports[CV_FILE_NAME] = run_cv(args, params, nthread)
+        seconds["cv"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    evals, dmatrix_cache = load_evals(args, nthread, external_dir)
+    dtrain = evals[0][0]
+    seconds["load"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    history: dict[str, dict[str, list[float]]] = {}
+    resumed_rounds = 0
+    if args.search_candidates:
+        booster, params, reports[SEARCH_FILE_NAME] = run_search(args, params, evals)
+    elif args.checkpoint_interval:
+        # Reseed by round number, so the rounds after a resume draw their own row samples; the
+        # learner restarts at every checkpoint, so a resumed run matches an uninterrupted one.
+        params = {**params, "seed_per_iteration": True}
+        directory, resumed, resumed_rounds = resume_checkpoint(args, params)
+        callback = CheckpointCallback(directory, args.checkpoint_interval, args.checkpoint_keep)
+        booster, history = resume_training(
+            params,
+            dtrain,
+            evals,
+            args.num_round,
+            [callback],
+            resumed,
+            resumed_rounds,
+            args.checkpoint_interval,
+        )
+    else:
+        booster = xgb.train(
+            params,
+            dtrain,
+            num_boost_round=args.num_round,
+            evals=evals,
+            early_stopping_rounds=args.early_stopping_rounds or None,
+            evals_result=history,
+            verbose_eval=True,
+        )
+    seconds["train"] = time.perf_counter() - start
+
+    summary: dict[str, object] = {
+        "params": params,
+        "num_round": args.num_round,
+        "early_stopping_rounds": args.early_stopping_rounds,
+        "rows": {name: int(matrix.num_row()) for matrix, name in evals},
+        "data_mode": args.data_mode,
+        "dmatrix_cache": dmatrix_cache,
+    }
+    if args.early_stopping_rounds:
+        # Keep only the trees up to the best round, so every reader predicts with the same model.
+        summary["best_iteration"] = booster.best_iteration
+        summary["best_score"] = booster.best_score
+        booster = booster[: booster.best_iteration + 1]
+    summary["rounds"] = booster.num_boosted_rounds()
+    # A resumed run only logs the rounds it trained itself.
+    summary["eval"] = {
+        f"{name}-{metric}": values[summary["rounds"] - 1 - resumed_rounds]
+        for name, metrics in history.items()
+        for metric, values in metrics.items()
+        if values
+    }
+    if args.checkpoint_interval:
+        summary["checkpoints"] = {
+            "directory": str(directory),
+            "interval": args.checkpoint_interval,
+            "keep": args.checkpoint_keep,
+            "resumed_rounds": resumed_rounds,
+        }
+    if SEARCH_FILE_NAME in reports:
+        best = reports[SEARCH_FILE_NAME]["best"]
+        summary["eval"] = {"validation-logloss": best["validation_logloss"]}
+    if CV_FILE_NAME in reports:
+        aggregate = reports[CV_FILE_NAME]["aggregate"]
+        summary["cv"] = {
+            "folds": args.cv_folds,
+            **{f"{name}_mean": values["mean"] for name, values in aggregate.items()},
+            **{f"{name}_std": values["std"] for name, values in aggregate.items()},
+        }
+    summary["timings"] = {"seconds": {phase: round(value, 4) for phase, value in seconds.items()}}
+    summary["peak_rss_mib"] = peak_rss_mib()
+    return booster, summary, reports
 
 
 def main() -> None:
     args = parse_args()
-    Path(args.output_dir).mkdir(parents=True, exist_ok=True)
+    params = training_params(args)
+    nthread = params["nthread"]
+    output_dir = Path(args.output_dir)
+    if args.external_cache_dir:
+        external_dir = Path(args.external_cache_dir)
+        external_dir.mkdir(parents=True, exist_ok=True)
+    else:
+        external_dir = Path(tempfile.mkdtemp(prefix="xgb_external_"))
+    try:
+        booster, summary, reports = train_model(args, params, nthread, external_dir)
+    finally:
+        if not args.external_cache_dir:
+            shutil.rmtree(external_dir, ignore_errors=True)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    model_path = output_dir / MODEL_FILE_NAME
+    model_path.write_bytes(booster.save_raw("json"))
+    (output_dir / SUMMARY_FILE_NAME).write_text(json.dumps(summary, indent=2) + "\n")
+    for file_name, report in reports.items():
+        (output_dir / file_name).write_text(json.dumps(report, indent=2) + "\n")
+
+    cv_notes = []
+    if "cv" in summary:
+        cv = summary["cv"]
+        cv_notes.append(f"cv_accuracy={cv['accuracy_mean']:.4f}+-{cv['accuracy_std']:.4f}")
     print(
-        "train.py is present for completeness. "
-        "Phase 03 uses built-in XGBoost training job by default.",
-        f"train={args.train}",
-        f"validation={args.validation}",
+        "Trained model:",
+        f"rounds={summary['rounds']}",
+        *(f"{name}={value:.6f}" for name, value in summary["eval"].items()),
+        *cv_notes,
+        f"data_mode={args.data_mode}",
+        f"dmatrix_cache={','.join(f'{k}:{v}' for k, v in summary['dmatrix_cache'].items())}",
+        f"peak_rss_mib={summary['peak_rss_mib']}",
+        f"output={model_path}",
     )
 
 
 if __name__ == "__main__":
     main()
+
@@ -0,0 +1,76 @@
+"""Shared fixtures for the pipeline/code tests; the modules import each other as siblings."""
+
+from __future__ import annotations
+
+import csv
+import random
+import sys
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+CODE_DIR = REPO_ROOT / "pipeline" / "code"
+if str(CODE_DIR) not in sys.path:
+    sys.path.insert(0, str(CODE_DIR))
+
+RAW_DATASET = REPO_ROOT / "data" / "titanic" / "raw" / "titanic.csv"
+S3_BUCKET = "test-pipeline-code"
+
+
+@pytest.fixture
+def titanic_csv(tmp_path: Path) -> Callable[..., Path]:
+    """Factory for a CSV of raw Titanic rows resampled (with fresh PassengerIds) to `rows`."""
+    with RAW_DATASET.open("r", newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        fieldnames = reader.fieldnames or []
+        source = list(reader)
+
+    def write(rows: int = 2000, seed: int = 7, name: str = "titanic.csv") -> Path:
+        rng = random.Random(seed)
+        path = tmp_path / name
+        with path.open("w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames, lineterminator="\n")
+            writer.writeheader()
+            for passenger_id in range(1, rows + 1):
+                row = dict(rng.choice(source))
+                row["PassengerId"] = str(passenger_id)
+                writer.writerow(row)
+        return path
+
+    return write
+
+
+@pytest.fixture
+def s3_bucket() -> str:
+    return S3_BUCKET
+
+
+@pytest.fixture
+def s3_client(monkeypatch):
+    """S3 client on a moto-mocked account with the S3_BUCKET bucket created."""
+    moto = pytest.importorskip("moto")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    from s3io import make_s3_client
+
+    with moto.mock_aws():
+        client = make_s3_client()
+        client.create_bucket(Bucket=S3_BUCKET)
+        yield client
+
+
+@pytest.fixture
+def s3_upload(s3_client) -> Callable[[Path | bytes, str], str]:
+    """Factory that puts a file (or bytes) at `key` of the mocked bucket and returns its URI."""
+
+    def upload(source: Path | bytes, key: str) -> str:
+        if isinstance(source, Path):
+            s3_client.upload_file(str(source), S3_BUCKET, key)
+        else:
+            s3_client.put_object(Bucket=S3_BUCKET, Key=key, Body=source)
+        return f"s3://{S3_BUCKET}/{key}"
+
+    return upload
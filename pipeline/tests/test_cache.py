@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from cache import MANIFEST_NAME, LocalCache, S3Cache, content_key, evict
+
+
+@pytest.fixture(params=["local", "s3"])
+def cache(request, tmp_path: Path) -> LocalCache | S3Cache:
+    if request.param == "local":
+        return LocalCache(tmp_path / "cache")
+    bucket = request.getfixturevalue("s3_bucket")
+    return S3Cache(f"s3://{bucket}/preprocess-cache", request.getfixturevalue("s3_client"))
+
+
+@pytest.fixture
+def outputs(tmp_path: Path) -> dict[str, Path]:
+    return {name: tmp_path / "output" / name for name in ("train", "validation")}
+
+
+def write_outputs(outputs: dict[str, Path], tag: str) -> dict[str, bytes]:
+    """One csv per channel plus a nested part file in train; returns relative path -> bytes."""
+    files = {
+        "train/train_xgb.csv": f"1,{tag}\n".encode(),
+        "train/parts/part-00001.csv": f"0,{tag}\n".encode(),
+        "validation/validation_xgb.csv": f"0,{tag},{tag}\n".encode(),
+    }
+    for relative, data in files.items():
+        name, rest = relative.split("/", 1)
+        path = outputs[name] / rest
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+    return files
+
+
+def read_outputs(outputs: dict[str, Path]) -> dict[str, bytes]:
+    return {
+        f"{name}/{path.relative_to(directory).as_posix()}": path.read_bytes()
+        for name, directory in outputs.items()
+        if directory.is_dir()
+        for path in directory.rglob("*")
+        if path.is_file()
+    }
+
+
+def clear(outputs: dict[str, Path]) -> None:
+    for directory in outputs.values():
+        for path in sorted(directory.rglob("*"), reverse=True):
+            path.rmdir() if path.is_dir() else path.unlink()
+
+
+def delete_entry_file(cache: LocalCache | S3Cache, key: str, relative: str) -> None:
+    if isinstance(cache, LocalCache):
+        (cache.root / key / relative).unlink()
+    else:
+        cache.s3.delete_object(Bucket=cache.bucket, Key=cache._key(key, relative))
+
+
+def test_stored_entry_is_a_hit(cache, outputs: dict[str, Path]) -> None:
+    written = write_outputs(outputs, "a")
+    cache.store("k1", outputs)
+    clear(outputs)
+    assert cache.fetch("k1", outputs)
+    assert read_outputs(outputs) == written
+    [manifest] = cache.entries()
+    assert manifest["key"] == "k1"
+    assert manifest["bytes"] == sum(len(data) for data in written.values())
+    assert manifest["last_used"] >= manifest["created"]
+
+
+def test_other_key_or_channels_are_a_miss(cache, outputs: dict[str, Path]) -> None:
+    write_outputs(outputs, "a")
+    cache.store("k1", outputs)
+    clear(outputs)
+    assert not cache.fetch("k2", outputs)
+    assert not cache.fetch("k1", {"train": outputs["train"]})
+    assert read_outputs(outputs) == {}
+
+
+def test_key_changes_with_input_bytes_and_settings(tmp_path: Path) -> None:
+    source = tmp_path / "train.csv"
+    source.write_text("PassengerId,Survived\n1,0\n")
+    settings = {"encoder_version": 1, "output_format": "csv", "shards": 1}
+    key = content_key([source], settings)
+    assert content_key([source], dict(reversed(list(settings.items())))) == key
+    assert content_key([source], {**settings, "output_format": "parquet"}) != key
+    assert content_key([source], {**settings, "preprocessor": {"fills": [28.0]}}) != key
+    source.write_text("PassengerId,Survived\n1,1\n")
+    assert content_key([source], settings) != key
+    # The length prefix keeps two inputs from hashing like their concatenation.
+    first, second = tmp_path / "a.csv", tmp_path / "b.csv"
+    first.write_text("ab")
+    second.write_text("c")
+    joined = tmp_path / "joined.csv"
+    joined.write_text("abc")
+    assert content_key([first, second], settings) != content_key([joined], settings)
+
+
+def test_entry_without_manifest_is_a_miss(cache, outputs: dict[str, Path]) -> None:
+    write_outputs(outputs, "a")
+    cache.store("k1", outputs)
+    # What an interrupted store leaves behind: the files, but not the manifest written last.
+    delete_entry_file(cache, "k1", MANIFEST_NAME)
+    clear(outputs)
+    assert not cache.fetch("k1", outputs)
+    assert cache.entries() == []
+
+
+def test_entry_with_a_missing_file_is_a_miss(cache, outputs: dict[str, Path]) -> None:
+    write_outputs(outputs, "a")
+    cache.store("k1", outputs)
+    # A concurrent evict removed a file after the manifest was read.
+    delete_entry_file(cache, "k1", "validation/validation_xgb.csv")
+    clear(outputs)
+    assert not cache.fetch("k1", outputs)
+    # The files fetched before the gap are removed again, so the recompute starts clean.
+    assert read_outputs(outputs) == {}
+
+
+def set_last_used(cache: LocalCache | S3Cache, key: str, last_used: float) -> None:
+    manifest = next(entry for entry in cache.entries() if entry["key"] == key)
+    cache._write_manifest(key, {**manifest, "last_used": last_used})
+
+
+def test_evict_drops_least_recently_used_first(cache, outputs: dict[str, Path]) -> None:
+    size = sum(len(data) for data in write_outputs(outputs, "a").values())
+    for index, key in enumerate(["k1", "k2", "k3", "k4"]):
+        cache.store(key, outputs)
+        set_last_used(cache, key, 1000.0 + index)
+    set_last_used(cache, "k1", 2000.0)
+
+    assert evict(cache, max_bytes=4 * size) == []
+    # k2 and k3 are the least recently used once k1 was touched.
+    assert evict(cache, max_bytes=2 * size) == ["k2", "k3"]
+    assert sorted(entry["key"] for entry in cache.entries()) == ["k1", "k4"]
+    clear(outputs)
+    assert not cache.fetch("k2", outputs)
+
+
+def test_evict_never_drops_the_kept_entry(cache, outputs: dict[str, Path]) -> None:
+    write_outputs(outputs, "a")
+    for index, key in enumerate(["k1", "k2", "k3"]):
+        cache.store(key, outputs)
+        set_last_used(cache, key, 1000.0 + index)
+
+    assert evict(cache, max_bytes=0, keep="k1") == ["k2", "k3"]
+    assert [entry["key"] for entry in cache.entries()] == ["k1"]
+
+
+def test_local_manifest_is_json_written_last(tmp_path: Path, outputs: dict[str, Path]) -> None:
+    cache = LocalCache(tmp_path / "cache")
+    write_outputs(outputs, "a")
+    cache.store("k1", outputs)
+    entry = tmp_path / "cache" / "k1"
+    manifest = json.loads((entry / MANIFEST_NAME).read_text(encoding="utf-8"))
+    assert manifest["files"] == {
+        "train": ["parts/part-00001.csv", "train_xgb.csv"],
+        "validation": ["validation_xgb.csv"],
+    }
+    assert not list(entry.glob("*.tmp"))
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+xgb = pytest.importorskip("xgboost")
+
+from crossval import FOLD_METRICS, cross_validate, fold_metrics  # noqa: E402
+from features import encode_columns, fill_values, labels_from_columns, read_columns  # noqa: E402
+from metrics import calibration_metrics, classification_metrics  # noqa: E402
+from metrics import confusion_matrix, ranking_metrics  # noqa: E402
+from splits import stratified_folds  # noqa: E402
+
+PARAMS = {"objective": "binary:logistic", "tree_method": "hist", "max_depth": 3, "nthread": 1}
+
+
+@pytest.fixture
+def encoded_rows(titanic_csv) -> tuple[np.ndarray, np.ndarray]:
+    columns = read_columns(titanic_csv(rows=1500))
+    labels = labels_from_columns(columns)
+    return labels, encode_columns(columns, *fill_values(columns)).astype(np.float32)
+
+
+def test_fold_metrics_pick_the_metrics_module_values() -> None:
+    rng = np.random.default_rng(0)
+    labels = rng.integers(0, 2, 500)
+    scores = np.clip(labels * 0.3 + rng.uniform(0, 0.7, 500), 0, 1)
+    expected = {
+        **classification_metrics(confusion_matrix(labels, scores, 0.4)),
+        **ranking_metrics(labels, scores),
+        **calibration_metrics(labels, scores),
+    }
+    metrics = fold_metrics(labels, scores, threshold=0.4)
+    assert list(metrics) == list(FOLD_METRICS)
+    assert metrics == {name: expected[name] for name in FOLD_METRICS}
+
+
+def test_per_fold_metrics_match_a_model_trained_without_the_fold(encoded_rows) -> None:
+    labels, features = encoded_rows
+    folds = stratified_folds(labels, 3, 42)
+    matrix = xgb.QuantileDMatrix(features, label=labels)
+    report = cross_validate(PARAMS, matrix, labels, folds, rounds=5, workers=1)
+
+    params = {**PARAMS, "seed_per_iteration": True}
+    # Quantized without weights, as the shared matrix is; each fold then zeroes its rows.
+    reference = xgb.QuantileDMatrix(features, label=labels)
+    out_of_fold = np.empty(len(labels))
+    assert [entry["fold"] for entry in report["per_fold"]] == [0, 1, 2]
+    for entry in report["per_fold"]:
+        held_out = folds == entry["fold"]
+        reference.set_weight((~held_out).astype(np.float32))
+        booster = xgb.train(params, reference, num_boost_round=5)
+        scores = booster.predict(reference)[held_out]
+        out_of_fold[held_out] = scores
+        assert entry["rows"] == held_out.sum()
+        assert entry["train_rows"] == len(labels) - held_out.sum()
+        assert entry["positive_rate"] == labels[held_out].mean()
+        assert entry["rounds"] == 5
+        assert entry["metrics"] == fold_metrics(labels[held_out], scores)
+    assert report["out_of_fold"] == fold_metrics(labels, out_of_fold)
+
+    accuracy = [entry["metrics"]["accuracy"] for entry in report["per_fold"]]
+    assert report["aggregate"]["accuracy"]["mean"] == pytest.approx(np.mean(accuracy))
+    assert report["aggregate"]["accuracy"]["std"] == pytest.approx(np.std(accuracy, ddof=1))
+    assert report["aggregate"]["accuracy"]["min"] == min(accuracy)
+
+
+def test_workers_do_not_change_the_report(encoded_rows) -> None:
+    labels, features = encoded_rows
+    folds = stratified_folds(labels, 4, 7)
+    params = {**PARAMS, "subsample": 0.7}
+    serial = cross_validate(
+        params, xgb.QuantileDMatrix(features, label=labels), labels, folds, 4, workers=1
+    )
+    forked = cross_validate(
+        params, xgb.QuantileDMatrix(features, label=labels), labels, folds, 4, workers=3
+    )
+    assert forked == serial
+
+
+def test_an_empty_fold_is_rejected(encoded_rows) -> None:
+    labels, features = encoded_rows
+    folds = np.where(stratified_folds(labels, 3, 42) == 1, 2, 0)
+    with pytest.raises(ValueError, match="Every fold needs rows"):
+        cross_validate(PARAMS, xgb.QuantileDMatrix(features, label=labels), labels, folds, 2, 1)
@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import io
+import json
+import sys
+import tarfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+xgb = pytest.importorskip("xgboost")
+
+import evaluate  # noqa: E402
+from features import encode_columns, fill_values, labels_from_columns, read_columns  # noqa: E402
+from formats import write_matrix  # noqa: E402
+
+
+def train_artifact(path: Path, labels: np.ndarray, features: np.ndarray, seed: int = 0) -> Path:
+    """A model.tar.gz holding `xgboost-model`, as the training job writes it."""
+    params = {"objective": "binary:logistic", "max_depth": 4, "eta": 0.3, "seed": seed}
+    booster = xgb.train(params, xgb.DMatrix(features, label=labels), num_boost_round=15)
+    model_path = path.with_suffix(".json")
+    booster.save_model(str(model_path))
+    with tarfile.open(path, "w:gz") as tar:
+        tar.add(model_path, arcname="xgboost-model")
+    return path
+
+
+@pytest.fixture
+def evaluation_inputs(titanic_csv, tmp_path: Path) -> dict[str, Path]:
+    columns = read_columns(titanic_csv(rows=3000))
+    labels = labels_from_columns(columns)
+    features = encode_columns(columns, *fill_values(columns))
+    validation = tmp_path / "validation_xgb.csv"
+    write_matrix(validation, labels, features, "csv")
+    half = labels.size // 2
+    return {
+        "validation": validation,
+        "model": train_artifact(tmp_path / "model.tar.gz", labels[:half], features[:half]),
+        "champion": train_artifact(
+            tmp_path / "champion.tar.gz", labels[half:], features[half:], seed=1
+        ),
+    }
+
+
+def run_evaluate(monkeypatch, tmp_path: Path, inputs: dict[str, Path], *extra: str) -> dict:
+    output = tmp_path / "evaluation.json"
+    argv = [
+        "evaluate.py",
+        "--model-artifact",
+        str(inputs["model"]),
+        "--validation",
+        str(inputs["validation"]),
+        "--model-cache-dir",
+        str(tmp_path / "model_cache"),
+        "--output",
+        str(output),
+        *extra,
+    ]
+    monkeypatch.setattr(sys, "argv", argv)
+    evaluate.main()
+    return json.loads(output.read_text(encoding="utf-8"))
+
+
+def test_roc_auc_is_gated_only_when_a_threshold_is_set(
+    monkeypatch, tmp_path: Path, evaluation_inputs: dict[str, Path]
+) -> None:
+    ungated = run_evaluate(monkeypatch, tmp_path, evaluation_inputs, "--accuracy-threshold", "0")
+    assert ungated["thresholds"]["passed"] is True
+    roc_auc = ungated["metrics"]["roc_auc"]
+    gated = run_evaluate(
+        monkeypatch,
+        tmp_path,
+        evaluation_inputs,
+        "--accuracy-threshold",
+        "0",
+        "--roc-auc-threshold",
+        str(roc_auc + 1e-6),
+    )
+    assert gated["thresholds"]["passed"] is False
+
+
+def test_chunked_mode_reports_binned_aucs_only(
+    monkeypatch, tmp_path: Path, evaluation_inputs: dict[str, Path]
+) -> None:
+    exact = run_evaluate(monkeypatch, tmp_path, evaluation_inputs)
+    chunked = run_evaluate(
+        monkeypatch,
+        tmp_path,
+        evaluation_inputs,
+        "--chunk-rows",
+        "700",
+        "--compare-models",
+        f"champion={evaluation_inputs['champion']}",
+    )
+    assert set(chunked["metrics"]) == {
+        "accuracy",
+        "precision",
+        "recall",
+        "f1",
+        "roc_auc_binned",
+        "pr_auc_binned",
+    }
+    assert chunked["confusion_matrix"] == exact["confusion_matrix"]
+    assert chunked["samples"] == exact["samples"]
+    assert chunked["metrics"]["roc_auc_binned"] == pytest.approx(
+        exact["metrics"]["roc_auc"], abs=1e-3
+    )
+    assert set(chunked["comparison"]["deltas"]["champion"]) == set(chunked["metrics"])
+
+
+def test_roc_auc_gate_is_rejected_in_chunked_mode(
+    monkeypatch, tmp_path: Path, evaluation_inputs: dict[str, Path]
+) -> None:
+    with pytest.raises(SystemExit):
+        run_evaluate(
+            monkeypatch,
+            tmp_path,
+            evaluation_inputs,
+            "--chunk-rows",
+            "700",
+            "--roc-auc-threshold",
+            "0.7",
+        )
+
+
+def write_archive(path: Path, members: dict[str, bytes]) -> Path:
+    with tarfile.open(path, "w:gz") as tar:
+        for name, payload in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(payload)
+            tar.addfile(info, io.BytesIO(payload))
+    return path
+
+
+def test_cached_model_file_matches_extractall(monkeypatch, tmp_path: Path) -> None:
+    rng = np.random.default_rng(0)
+    members = {f"code/extra-{index}.bin": rng.bytes(50_000) for index in range(3)}
+    members["xgboost-model"] = rng.bytes(100_000)
+    members["model.json"] = b"{}"
+    artifact = write_archive(tmp_path / "model.tar.gz", members)
+    with tarfile.open(artifact, "r:gz") as tar:
+        tar.extractall(tmp_path / "reference")
+
+    cache_dir = tmp_path / "cache"
+    model_file = evaluate.ensure_model_file(artifact, cache_dir)
+    # Earlier MODEL_FILE_NAMES win, and only model files are kept in the cache entry.
+    assert model_file.name == "xgboost-model"
+    assert model_file.read_bytes() == (tmp_path / "reference" / "xgboost-model").read_bytes()
+    assert sorted(p.name for p in model_file.parent.iterdir()) == ["model.json", "xgboost-model"]
+    assert model_file.parent.name == evaluate.artifact_digest(artifact)
+
+    def no_extract(*args) -> None:
+        raise AssertionError("a cached artifact must not be extracted again")
+
+    monkeypatch.setattr(evaluate, "extract_model_files", no_extract)
+    assert evaluate.ensure_model_file(artifact, cache_dir) == model_file
+
+
+def test_json_model_is_used_in_place(tmp_path: Path) -> None:
+    model = tmp_path / "model.json"
+    model.write_text("{}")
+    assert evaluate.ensure_model_file(model, tmp_path / "cache") == model
+    assert not (tmp_path / "cache").exists()
+
+
+def test_link_members_are_rejected(tmp_path: Path) -> None:
+    artifact = tmp_path / "model.tar.gz"
+    with tarfile.open(artifact, "w:gz") as tar:
+        info = tarfile.TarInfo("xgboost-model")
+        info.type = tarfile.SYMTYPE
+        info.linkname = "/etc/passwd"
+        tar.addfile(info)
+    with pytest.raises(ValueError, match="link entry"):
+        evaluate.ensure_model_file(artifact, tmp_path / "cache")
+    assert list((tmp_path / "cache").iterdir()) == []
+
+
+def test_members_outside_the_target_are_rejected(tmp_path: Path) -> None:
+    artifact = write_archive(tmp_path / "model.tar.gz", {"../xgboost-model": b"model"})
+    with pytest.raises(ValueError, match="outside target dir"):
+        evaluate.ensure_model_file(artifact, tmp_path / "cache")
+    assert not (tmp_path / "xgboost-model").exists()
+
+
+def test_archive_without_a_model_file_is_not_cached(tmp_path: Path) -> None:
+    artifact = write_archive(tmp_path / "model.tar.gz", {"code/train.py": b"print()"})
+    with pytest.raises(FileNotFoundError, match="code/train.py"):
+        evaluate.ensure_model_file(artifact, tmp_path / "cache")
+    assert list((tmp_path / "cache").iterdir()) == []
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet"])
+@pytest.mark.parametrize("nthread", [1, 2])
+def test_inplace_predict_matches_dmatrix_predict(
+    titanic_csv, tmp_path: Path, fmt: str, nthread: int
+) -> None:
+    if fmt == "parquet":
+        pytest.importorskip("pyarrow")
+    columns = read_columns(titanic_csv(rows=3000))
+    labels = labels_from_columns(columns)
+    features = encode_columns(columns, *fill_values(columns))
+    params = {"objective": "binary:logistic", "max_depth": 5, "eta": 0.2, "nthread": nthread}
+    booster = xgb.train(params, xgb.DMatrix(features, label=labels), num_boost_round=30)
+    expected = booster.predict(xgb.DMatrix(features, nthread=nthread))
+
+    path = tmp_path / f"validation.{fmt}"
+    write_matrix(path, labels, features, fmt)
+    loaded_labels, data = evaluate.read_validation(path, fmt, nthread)
+    np.testing.assert_array_equal(loaded_labels, labels)
+    assert data.dtype == np.float32 and data.flags.c_contiguous
+    for batch_rows in (0, 1, 997, 3000, 10_000):
+        scores = evaluate.predict_scores(booster, data, batch_rows)
+        np.testing.assert_array_equal(scores, expected)
+
+
+def test_models_predicted_concurrently_match_one_by_one(evaluation_inputs: dict, tmp_path) -> None:
+    from concurrent.futures import ThreadPoolExecutor
+
+    boosters = {
+        name: evaluate.load_booster(evaluation_inputs[name], tmp_path / "cache", nthread=1)
+        for name in ("model", "champion")
+    }
+    _, data = evaluate.read_validation(evaluation_inputs["validation"], "csv")
+    expected = {name: booster.predict(xgb.DMatrix(data)) for name, booster in boosters.items()}
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        scores = evaluate.predict_models(boosters, data, batch_rows=512, pool=pool)
+    for name in boosters:
+        np.testing.assert_array_equal(scores[name], expected[name])
+
+
+def test_compared_models_score_as_they_do_alone(
+    monkeypatch, tmp_path: Path, evaluation_inputs: dict[str, Path]
+) -> None:
+    champion_alone = run_evaluate(
+        monkeypatch, tmp_path, {**evaluation_inputs, "model": evaluation_inputs["champion"]}
+    )
+    candidate_alone = run_evaluate(monkeypatch, tmp_path, evaluation_inputs)
+    # The champion input is a directory; its archive name is whatever the S3 key was.
+    champion_dir = tmp_path / "champion"
+    champion_dir.mkdir()
+    evaluation_inputs["champion"].rename(champion_dir / "renamed-at-run-time.tar.gz")
+    together = run_evaluate(
+        monkeypatch, tmp_path, evaluation_inputs, "--compare-models", f"champion={champion_dir}"
+    )
+    models = together["comparison"]["models"]
+    assert together["metrics"] == candidate_alone["metrics"]
+    assert models["candidate"]["metrics"] == candidate_alone["metrics"]
+    assert models["champion"]["metrics"] == champion_alone["metrics"]
+    assert models["champion"]["confusion_matrix"] == champion_alone["confusion_matrix"]
+    deltas = together["comparison"]["deltas"]["champion"]
+    for name, value in candidate_alone["metrics"].items():
+        assert deltas[name] == value - champion_alone["metrics"][name]
+
+
+@pytest.mark.parametrize("archives", [[], ["a.tar.gz", "b.tar.gz"]])
+def test_artifact_directory_needs_exactly_one_archive(tmp_path: Path, archives: list) -> None:
+    for name in archives:
+        write_archive(tmp_path / name, {"xgboost-model": b"model"})
+    (tmp_path / "notes.txt").write_text("not a model")
+    with pytest.raises(FileNotFoundError, match=r"exactly one \*\.tar\.gz"):
+        evaluate.ensure_model_file(tmp_path, tmp_path / "cache")
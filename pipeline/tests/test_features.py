@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from features import (
+    encode_columns,
+    fill_values,
+    fit_preprocessor,
+    format_csv_rows,
+    iter_column_batches,
+    labels_from_columns,
+    read_columns,
+    read_preprocessor,
+    transform_columns,
+    write_csv_rows,
+    write_preprocessor,
+)
+
+
+def reference_encode(path: Path) -> str:
+    """Per-row encoder as it existed before features.py, written with csv.writer."""
+
+    def parse_float(value: str | None) -> float | None:
+        stripped = (value or "").strip()
+        return float(stripped) if stripped else None
+
+    def to_int(value: str | None, default: int) -> int:
+        stripped = (value or "").strip()
+        return int(float(stripped)) if stripped else default
+
+    def median(values: list[float]) -> float:
+        ordered = sorted(values)
+        mid = len(ordered) // 2
+        if len(ordered) % 2 == 0:
+            return (ordered[mid - 1] + ordered[mid]) / 2.0
+        return ordered[mid]
+
+    with path.open("r", newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    age_fill = median([v for v in (parse_float(r.get("Age")) for r in rows) if v is not None])
+    fare_fill = median([v for v in (parse_float(r.get("Fare")) for r in rows) if v is not None])
+    sex_map = {"male": 0.0, "female": 1.0}
+    embarked_map = {"C": 0.0, "Q": 1.0, "S": 2.0}
+    encoded = []
+    for row in rows:
+        age = parse_float(row.get("Age"))
+        fare = parse_float(row.get("Fare"))
+        encoded.append(
+            [
+                to_int(row["Survived"], default=0),
+                float(to_int(row.get("Pclass"), default=3)),
+                sex_map.get((row.get("Sex") or "").strip().lower(), -1.0),
+                age_fill if age is None else age,
+                float(to_int(row.get("SibSp"), default=0)),
+                float(to_int(row.get("Parch"), default=0)),
+                fare_fill if fare is None else fare,
+                embarked_map.get((row.get("Embarked") or "").strip().upper(), -1.0),
+            ]
+        )
+    out = io.StringIO()
+    csv.writer(out, lineterminator="\n").writerows(encoded)
+    return out.getvalue()
+
+
+def columnar_encode(path: Path) -> str:
+    columns = read_columns(path)
+    out = io.StringIO()
+    write_csv_rows(out, labels_from_columns(columns), encode_columns(columns, *fill_values(columns)))
+    return out.getvalue()
+
+
+def test_columnar_encoder_matches_per_row_reference(titanic_csv) -> None:
+    path = titanic_csv(rows=3000)
+    assert columnar_encode(path) == reference_encode(path)
+
+
+def test_quoted_and_ragged_rows_match_reference(tmp_path: Path) -> None:
+    path = tmp_path / "irregular.csv"
+    path.write_text(
+        "PassengerId,Survived,Pclass,Name,Sex,Age,SibSp,Parch,Ticket,Fare,Cabin,Embarked\n"
+        '1,0,3,"Braund, Mr. Owen\nHarris",male,22,1,0,A/5 21171,7.25,,S\n'
+        '2,1,1,"Cumings, Mrs. John",female,,1,0,PC 17599,71.2833,C85,c\n'
+        "\n"
+        '3,1,,"Heikkinen, Miss. Laina", Female ,26,0,0,STON/O2. 3101282,,,\n',
+        encoding="utf-8",
+    )
+    assert columnar_encode(path) == reference_encode(path)
+
+
+def test_small_negative_int_cells_match_reference(tmp_path: Path) -> None:
+    path = tmp_path / "negative.csv"
+    path.write_text(
+        "PassengerId,Survived,Pclass,Name,Sex,Age,SibSp,Parch,Ticket,Fare,Cabin,Embarked\n"
+        "1,-0.5,-0.9,A,male,22,-0.25,-0.0,T1,7.25,,S\n"
+        "2,1,-1.5,B,female,38,0.5,-2.7,T2,71.28,,C\n",
+        encoding="utf-8",
+    )
+    encoded = columnar_encode(path)
+    assert encoded == reference_encode(path)
+    assert "-0.0" not in encoded
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        [np.inf],
+        [-np.inf, -np.inf],
+        [np.inf, -np.inf],
+        [np.nan],
+        [1.0, 2.0, -0.0, 4096.0],
+        [0.1, 7.25, 1e300],
+    ],
+)
+def test_csv_rows_match_csv_writer(values: list[float]) -> None:
+    features = np.array(values)[:, None]
+    labels = np.arange(len(values))
+    expected = io.StringIO()
+    csv.writer(expected, lineterminator="\n").writerows(
+        [int(label), float(value)] for label, value in zip(labels, values)
+    )
+    assert format_csv_rows(labels, features) == expected.getvalue()
+
+
+def test_inf_only_block_is_formatted(tmp_path: Path) -> None:
+    path = tmp_path / "inf.csv"
+    header = "PassengerId,Survived,Pclass,Name,Sex,Age,SibSp,Parch,Ticket,Fare,Cabin,Embarked\n"
+    rows = "".join(f"{i},0,3,Name {i},male,30,0,0,T{i},8.05,,S\n" for i in range(1, 50))
+    path.write_text(header + rows + "50,1,1,Name 50,female,40,0,0,T50,inf,,C\n")
+    preprocessor = fit_preprocessor(30.0, 8.05)
+    out = io.StringIO()
+    with path.open("rb") as f:
+        # Small blocks, so the last block holds only the inf Fare row.
+        for batch in iter_column_batches(f, block_bytes=64):
+            write_csv_rows(out, labels_from_columns(batch), transform_columns(batch, preprocessor))
+    assert out.getvalue().splitlines()[-1] == "1,1.0,1.0,40.0,0.0,0.0,inf,0.0"
+
+
+def test_written_preprocessor_transforms_to_the_same_rows(titanic_csv, tmp_path: Path) -> None:
+    train = read_columns(titanic_csv(rows=1500, seed=1, name="train.csv"))
+    validation = read_columns(titanic_csv(rows=500, seed=2, name="validation.csv"))
+    fitted = fit_preprocessor(*fill_values(train))
+    path = tmp_path / "preprocessor.json"
+    write_preprocessor(path, fitted)
+    loaded = read_preprocessor(path)
+    assert loaded == fitted
+    np.testing.assert_array_equal(
+        transform_columns(validation, loaded), transform_columns(validation, fitted)
+    )
+    np.testing.assert_array_equal(
+        transform_columns(validation, loaded), encode_columns(validation, *fill_values(train))
+    )
+
+
+@pytest.mark.parametrize(
+    ("change", "message"),
+    [
+        ({"schema_version": 2}, "Unsupported preprocessor schema_version 2"),
+        ({"schema_version": None}, "Unsupported preprocessor schema_version None"),
+        ({"feature_columns": ["Pclass", "Sex"]}, "fitted for other feature columns"),
+    ],
+)
+def test_read_preprocessor_checks_the_schema(
+    tmp_path: Path, change: dict[str, object], message: str
+) -> None:
+    path = tmp_path / "preprocessor.json"
+    path.write_text(json.dumps({**fit_preprocessor(28.0, 14.45), **change}), encoding="utf-8")
+    with pytest.raises(ValueError, match=message):
+        read_preprocessor(path)
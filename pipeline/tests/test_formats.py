@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from features import encode_columns, fill_values, labels_from_columns, read_columns
+from formats import (
+    OUTPUT_FORMATS,
+    channel_file_name,
+    iter_matrix_chunks,
+    read_first_column,
+    read_matrix,
+    write_matrix,
+)
+
+
+@pytest.fixture
+def encoded(titanic_csv) -> tuple[np.ndarray, np.ndarray]:
+    columns = read_columns(titanic_csv(rows=1500))
+    return labels_from_columns(columns), encode_columns(columns, *fill_values(columns))
+
+
+def write_channel(tmp_path: Path, encoded, fmt: str) -> Path:
+    if fmt == "parquet":
+        pytest.importorskip("pyarrow")
+    path = tmp_path / channel_file_name("train_xgb", fmt)
+    write_matrix(path, *encoded, fmt)
+    return path
+
+
+@pytest.mark.parametrize("fmt", ["csv", "libsvm", "parquet"])
+def test_read_matrix_round_trips_exactly(tmp_path: Path, encoded, fmt: str) -> None:
+    labels, features = encoded
+    loaded_labels, loaded_features = read_matrix(write_channel(tmp_path, encoded, fmt), fmt)
+    np.testing.assert_array_equal(loaded_labels, labels)
+    np.testing.assert_array_equal(loaded_features, features)
+    assert loaded_features.flags.c_contiguous
+
+
+@pytest.mark.parametrize("fmt", ["csv", "libsvm", "parquet"])
+@pytest.mark.parametrize("chunk_rows", [1, 97, 5000])
+def test_chunks_concatenate_to_the_whole_matrix(
+    tmp_path: Path, encoded, fmt: str, chunk_rows: int
+) -> None:
+    path = write_channel(tmp_path, encoded, fmt)
+    chunks = [
+        (labels.copy(), features.copy())
+        for labels, features in iter_matrix_chunks(path, fmt, chunk_rows)
+    ]
+    assert max(labels.size for labels, _ in chunks) <= chunk_rows
+    expected_labels, expected_features = read_matrix(path, fmt)
+    np.testing.assert_array_equal(np.concatenate([c[0] for c in chunks]), expected_labels)
+    np.testing.assert_array_equal(np.concatenate([c[1] for c in chunks]), expected_features)
+
+
+@pytest.mark.parametrize("fmt", OUTPUT_FORMATS)
+def test_every_format_gives_the_same_predictions(tmp_path: Path, encoded, fmt: str) -> None:
+    xgb = pytest.importorskip("xgboost")
+    from evaluate import read_validation
+
+    labels, features = encoded
+    params = {"objective": "binary:logistic", "max_depth": 5, "eta": 0.2, "nthread": 1}
+    reference = xgb.DMatrix(features, label=labels)
+    model = xgb.train(params, reference, num_boost_round=10)
+    expected = model.predict(reference)
+
+    path = write_channel(tmp_path, encoded, fmt)
+    loaded_labels, loaded = read_validation(path, fmt)
+    np.testing.assert_array_equal(loaded_labels, labels)
+    if not isinstance(loaded, xgb.DMatrix):
+        loaded = xgb.DMatrix(loaded, label=loaded_labels)
+    np.testing.assert_array_equal(model.predict(loaded), expected)
+    retrained = xgb.train(params, loaded, num_boost_round=10)
+    np.testing.assert_array_equal(retrained.predict(reference), expected)
+    if fmt == "libsvm":
+        # The built-in container parses libsvm with XGBoost's own reader.
+        native = xgb.DMatrix(f"{path}?format=libsvm")
+        np.testing.assert_array_equal(model.predict(native), expected)
+
+
+def reference_first_column(path: Path) -> list[float]:
+    """The per-line reader evaluate_titanic_predictions.py used before read_first_column."""
+    values: list[float] = []
+    with path.open("r", encoding="utf-8") as f:
+        for raw_line in f:
+            line = raw_line.strip()
+            if not line:
+                continue
+            values.append(float(line.split(",")[0].strip()))
+    return values
+
+
+FIRST_COLUMN_FILES = {
+    "one_value_per_line": "0.25\n0.5\n1\n0\n",
+    "blank_lines": "\n0.25\n\n0.5\n\n",
+    "no_trailing_newline": "0.25\n0.5",
+    "ragged_rows": "0.25\n0.5,1\n0.75,1,2\n",
+    "whitespace_only_lines": "0.25\n   \n\t\n 0.5 \n",
+    "crlf": "0.25\r\n0.5\r\n",
+}
+
+
+@pytest.fixture(params=["pyarrow", "numpy"])
+def first_column_reader(request, monkeypatch):
+    if request.param == "pyarrow":
+        pytest.importorskip("pyarrow")
+    else:
+        # Hide pyarrow so read_first_column takes its np.loadtxt path.
+        monkeypatch.setitem(sys.modules, "pyarrow", None)
+        monkeypatch.setitem(sys.modules, "pyarrow.csv", None)
+    return read_first_column
+
+
+@pytest.mark.parametrize("name", FIRST_COLUMN_FILES)
+def test_first_column_matches_the_line_reader(tmp_path: Path, first_column_reader, name: str):
+    path = tmp_path / f"{name}.out"
+    path.write_bytes(FIRST_COLUMN_FILES[name].encode())
+    expected = reference_first_column(path)
+    np.testing.assert_array_equal(first_column_reader(path), expected)
+
+
+def test_first_column_of_a_large_file(tmp_path: Path, first_column_reader) -> None:
+    scores = np.random.default_rng(0).random(50_000).astype(np.float32)
+    path = tmp_path / "predictions.out"
+    path.write_text("".join(f"{score!r}\n" for score in scores.tolist()))
+    values = first_column_reader(path)
+    np.testing.assert_array_equal(values, reference_first_column(path))
+    np.testing.assert_array_equal(values.astype(np.float32), scores)
+
+
+@pytest.mark.parametrize("content", ["", "\n\n", "  \n"])
+def test_first_column_needs_a_value(tmp_path: Path, first_column_reader, content: str) -> None:
+    path = tmp_path / "empty.out"
+    path.write_text(content)
+    with pytest.raises(ValueError, match="No values"):
+        first_column_reader(path)
+
+
+def test_first_column_rejects_non_numbers(tmp_path: Path, first_column_reader) -> None:
+    path = tmp_path / "bad.out"
+    path.write_text("0.25\nyes,1\n")
+    with pytest.raises(ValueError, match="first column"):
+        first_column_reader(path)
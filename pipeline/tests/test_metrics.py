@@ -0,0 +1,383 @@
+from __future__ import annotations
+
+import itertools
+import json
+import math
+
+import numpy as np
+import pytest
+
+from metrics import (
+    BOOTSTRAP_METHODS,
+    BOOTSTRAP_METRICS,
+    DEFAULT_SCORE_BINS,
+    StreamingMetrics,
+    bootstrap_intervals,
+    bootstrap_weights,
+    calibration_metrics,
+    classification_metrics,
+    confusion_matrix,
+    merge_sliced_confusion,
+    pr_auc,
+    ranking_metrics,
+    roc_auc,
+    safe_div,
+    sliced_confusion,
+    sweep_metrics,
+    threshold_sweep,
+    weighted_metrics,
+)
+
+
+def reference_metrics(labels: list[int], scores: list[float], threshold: float) -> dict:
+    """The per-row loop evaluate.py and evaluate_titanic_predictions.py used before metrics.py."""
+    tp = tn = fp = fn = 0
+    for score, label in zip(scores, labels):
+        pred = 1 if float(score) >= threshold else 0
+        if pred == 1 and label == 1:
+            tp += 1
+        elif pred == 0 and label == 0:
+            tn += 1
+        elif pred == 1 and label == 0:
+            fp += 1
+        else:
+            fn += 1
+    total = len(labels)
+    precision = safe_div(tp, tp + fp)
+    recall = safe_div(tp, tp + fn)
+    return {
+        "metrics": {
+            "accuracy": safe_div(tp + tn, total),
+            "precision": precision,
+            "recall": recall,
+            "f1": safe_div(2 * precision * recall, precision + recall),
+        },
+        "confusion_matrix": {"tp": tp, "tn": tn, "fp": fp, "fn": fn},
+    }
+
+
+def synthetic_predictions(rows: int, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    # float32 scores like Booster.predict, loosely correlated with the label.
+    rng = np.random.default_rng(seed)
+    labels = rng.integers(0, 2, size=rows)
+    scores = np.clip(rng.normal(0.35 + 0.3 * labels, 0.25), 0.0, 1.0).astype(np.float32)
+    return labels, scores
+
+
+def metrics_payload(labels: np.ndarray, scores: np.ndarray, threshold: float) -> dict:
+    confusion = confusion_matrix(labels, scores, threshold)
+    return {"metrics": classification_metrics(confusion), "confusion_matrix": confusion}
+
+
+@pytest.mark.parametrize("threshold", [0.0, 0.3, 0.5, 0.9, 1.1])
+def test_payload_matches_the_per_row_loop(threshold: float) -> None:
+    labels, scores = synthetic_predictions(20_000)
+    expected = reference_metrics(labels.tolist(), scores.tolist(), threshold)
+    assert json.dumps(metrics_payload(labels, scores, threshold)) == json.dumps(expected)
+
+
+def test_scores_at_the_threshold_and_unknown_labels_follow_the_loop() -> None:
+    labels = np.array([1, 0, 1, 0, 2, -1, 1, 0])
+    scores = np.array([0.5, 0.5, 0.49, 0.49, 0.9, 0.1, 1.0, 0.0], dtype=np.float32)
+    expected = reference_metrics(labels.tolist(), scores.tolist(), 0.5)
+    assert metrics_payload(labels, scores, 0.5) == expected
+
+
+def test_size_mismatch_is_rejected() -> None:
+    with pytest.raises(ValueError, match="size mismatch"):
+        confusion_matrix(np.zeros(3), np.zeros(4))
+
+
+def tied_predictions(rows: int, seed: int = 1) -> tuple[np.ndarray, np.ndarray]:
+    # Scores rounded to two decimals, so many rows share a threshold.
+    labels, scores = synthetic_predictions(rows, seed)
+    return labels, np.round(scores, 2)
+
+
+@pytest.mark.parametrize("rows", [5, 178, 3000])
+def test_sweep_matches_the_confusion_matrix_at_every_threshold(rows: int) -> None:
+    labels, scores = tied_predictions(rows)
+    sweep = threshold_sweep(labels, scores)
+    np.testing.assert_array_equal(sweep["thresholds"], np.unique(scores)[::-1])
+    values = sweep_metrics(sweep)
+    for index, threshold in enumerate(sweep["thresholds"]):
+        confusion = confusion_matrix(labels, scores, threshold)
+        assert {key: int(sweep[key][index]) for key in confusion} == confusion
+        expected = classification_metrics(confusion)
+        assert {name: float(values[name][index]) for name in expected} == expected
+
+
+def test_grid_thresholds_read_the_next_distinct_score_of_the_sweep() -> None:
+    labels, scores = synthetic_predictions(5000)
+    sweep = threshold_sweep(labels, scores)
+    grid = np.linspace(0.0, 1.0, 101, dtype=np.float32)
+    # Each grid threshold matches the sweep entry of the smallest distinct score >= it.
+    positions = np.searchsorted(-sweep["thresholds"], -grid, side="right") - 1
+    for position, threshold in zip(positions.tolist(), grid):
+        confusion = confusion_matrix(labels, scores, threshold)
+        if not confusion["tp"] + confusion["fp"]:
+            continue
+        assert {key: int(sweep[key][position]) for key in confusion} == confusion
+
+
+@pytest.mark.parametrize("rows", [5, 178, 3000])
+def test_roc_auc_matches_pairwise_mann_whitney(rows: int) -> None:
+    labels, scores = tied_predictions(rows)
+    positive = scores[labels == 1][:, None]
+    negative = scores[labels == 0][None, :]
+    expected = ((positive > negative).sum() + 0.5 * (positive == negative).sum()) / (
+        positive.size * negative.size
+    )
+    assert roc_auc(threshold_sweep(labels, scores)) == pytest.approx(expected, abs=1e-12)
+
+
+@pytest.mark.parametrize("rows", [5, 178, 3000])
+def test_pr_auc_matches_average_precision_threshold_by_threshold(rows: int) -> None:
+    labels, scores = tied_predictions(rows)
+    positives = int((labels == 1).sum())
+    expected = previous_recall = 0.0
+    for threshold in np.unique(scores)[::-1]:
+        confusion = confusion_matrix(labels, scores, threshold)
+        recall = confusion["tp"] / positives
+        precision = confusion["tp"] / (confusion["tp"] + confusion["fp"])
+        expected += (recall - previous_recall) * precision
+        previous_recall = recall
+    assert pr_auc(threshold_sweep(labels, scores)) == pytest.approx(expected, abs=1e-12)
+
+
+def test_single_class_aucs_are_zero() -> None:
+    sweep = threshold_sweep(np.ones(4, dtype=np.int64), np.array([0.1, 0.2, 0.3, 0.4]))
+    assert roc_auc(sweep) == 0.0
+    sweep = threshold_sweep(np.zeros(4, dtype=np.int64), np.array([0.1, 0.2, 0.3, 0.4]))
+    assert (roc_auc(sweep), pr_auc(sweep)) == (0.0, 0.0)
+
+
+@pytest.mark.parametrize("metric", ["accuracy", "f1"])
+def test_best_threshold_is_the_highest_maximizer(metric: str) -> None:
+    labels, scores = tied_predictions(3000)
+    best = ranking_metrics(labels, scores, optimize=metric)["best_threshold"]
+    values = {}
+    for threshold in np.unique(scores):
+        confusion = confusion_matrix(labels, scores, threshold)
+        values[float(threshold)] = classification_metrics(confusion)[metric]
+    top = max(values.values())
+    assert best["value"] == top
+    assert best["threshold"] == max(t for t, value in values.items() if value == top)
+
+
+def stream(labels: np.ndarray, scores: np.ndarray, chunk_rows: int, bins: int) -> StreamingMetrics:
+    accumulator = StreamingMetrics(threshold=0.5, bins=bins)
+    for start in range(0, labels.size, chunk_rows):
+        accumulator.update(labels[start : start + chunk_rows], scores[start : start + chunk_rows])
+    return accumulator
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 333, 10_000])
+def test_streaming_confusion_and_calibration_match_the_exact_metrics(chunk_rows: int) -> None:
+    labels, scores = synthetic_predictions(5000)
+    accumulator = stream(labels, scores, chunk_rows, bins=1024)
+    assert accumulator.samples == labels.size
+    assert accumulator.confusion == confusion_matrix(labels, scores, 0.5)
+    streamed = accumulator.calibration()
+    exact = calibration_metrics(labels, scores)
+    for key in ("log_loss", "brier", "ece", "mce"):
+        assert streamed[key] == pytest.approx(exact[key], rel=1e-9)
+    assert streamed["bins"] == pytest.approx(exact["bins"])
+
+
+def test_streaming_sweep_is_exact_when_scores_sit_on_bin_edges() -> None:
+    labels, scores = synthetic_predictions(20_000)
+    bins = 256
+    # A score of 1.0 falls into the last bin, so keep every score below it.
+    scores = np.minimum(np.floor(scores.astype(np.float64) * bins), bins - 1) / bins
+    sweep = stream(labels, scores, 1000, bins).sweep()
+    expected = threshold_sweep(labels, scores)
+    for key in expected:
+        np.testing.assert_array_equal(sweep[key], expected[key])
+    assert roc_auc(sweep) == roc_auc(expected)
+
+
+def test_streaming_auc_is_within_the_bin_resolution() -> None:
+    labels, scores = synthetic_predictions(200_000)
+    sweep = stream(labels, scores, 65_536, DEFAULT_SCORE_BINS).sweep()
+    expected = threshold_sweep(labels, scores)
+    assert roc_auc(sweep) == pytest.approx(roc_auc(expected), abs=1e-4)
+    assert pr_auc(sweep) == pytest.approx(pr_auc(expected), abs=1e-4)
+
+
+def test_empty_stream_is_rejected() -> None:
+    with pytest.raises(ValueError, match="No predictions"):
+        StreamingMetrics().sweep()
+
+
+def reference_bootstrap_metrics(labels: np.ndarray, scores: np.ndarray) -> dict[str, float]:
+    values = classification_metrics(confusion_matrix(labels, scores, 0.5))
+    sweep = threshold_sweep(labels, scores)
+    values["roc_auc"] = roc_auc(sweep)
+    values["pr_auc"] = pr_auc(sweep)
+    return values
+
+
+@pytest.mark.parametrize("method", BOOTSTRAP_METHODS)
+def test_weighted_metrics_match_the_rows_repeated(method: str) -> None:
+    labels, scores = tied_predictions(300)
+    rng = np.random.default_rng(5)
+    weights = bootstrap_weights(rng, 40, labels.size, method)
+    order = np.argsort(scores)[::-1]
+    values = weighted_metrics(weights[:, order], labels[order], scores[order])
+    # A weight of k is the row drawn k times.
+    for row, counts in enumerate(weights.astype(np.int64)):
+        rows = np.repeat(np.arange(labels.size), counts)
+        expected = reference_bootstrap_metrics(labels[rows], scores[rows])
+        for name in BOOTSTRAP_METRICS:
+            assert values[name][row] == pytest.approx(expected[name], abs=1e-12)
+
+
+def test_unit_weights_give_the_point_metrics() -> None:
+    labels, scores = tied_predictions(1000)
+    order = np.argsort(scores)[::-1]
+    values = weighted_metrics(np.ones((1, labels.size)), labels[order], scores[order])
+    expected = reference_bootstrap_metrics(labels, scores)
+    for name in BOOTSTRAP_METRICS:
+        assert values[name][0] == pytest.approx(expected[name], abs=1e-12)
+
+
+def test_index_weights_draw_every_replicate_with_all_rows() -> None:
+    weights = bootstrap_weights(np.random.default_rng(0), 25, 400, "index")
+    assert weights.shape == (25, 400)
+    np.testing.assert_array_equal(weights.sum(axis=1), 400)
+
+
+def test_bootstrap_intervals_depend_on_the_seed_not_the_workers() -> None:
+    labels, scores = synthetic_predictions(500)
+    kwargs = {"replicates": 200, "seed": 3, "batch_cells": 500 * 30}
+    single = bootstrap_intervals(labels, scores, workers=1, **kwargs)
+    pooled = bootstrap_intervals(labels, scores, workers=2, **kwargs)
+    assert pooled == single
+    assert bootstrap_intervals(labels, scores, workers=1, **{**kwargs, "seed": 4}) != single
+    point = reference_bootstrap_metrics(labels, scores)
+    for name, interval in single["intervals"].items():
+        assert interval["lower"] <= point[name] <= interval["upper"]
+
+
+def test_bootstrap_rejects_bad_settings() -> None:
+    labels, scores = synthetic_predictions(10)
+    with pytest.raises(ValueError, match="bootstrap method"):
+        bootstrap_intervals(labels, scores, method="jackknife")
+    with pytest.raises(ValueError, match="confidence"):
+        bootstrap_intervals(labels, scores, confidence=1.0)
+
+
+def reference_sliced_confusion(
+    labels: np.ndarray, scores: np.ndarray, columns: np.ndarray, slices: dict[str, list[int]]
+) -> dict:
+    """One boolean mask per group of every slice; NaNs form their own group."""
+    expected = {}
+    for name, indices in slices.items():
+        values = columns[:, indices]
+        expected[name] = {}
+        for key in itertools.product(*(np.unique(column) for column in values.T)):
+            key = np.array(key)
+            same = (values == key) | (np.isnan(values) & np.isnan(key))
+            mask = np.all(same, axis=1)
+            if mask.any():
+                group = tuple(value.item() for value in key)
+                expected[name][group] = confusion_matrix(labels[mask], scores[mask])
+    return expected
+
+
+def slice_columns(rows: int, seed: int = 2) -> np.ndarray:
+    # Encoded Pclass, Sex and Embarked codes, plus a continuous column with missing values.
+    rng = np.random.default_rng(seed)
+    age = np.round(rng.uniform(0, 80, size=rows), 1)
+    age[rng.random(rows) < 0.2] = np.nan
+    return np.column_stack(
+        [
+            rng.integers(1, 4, size=rows),
+            rng.integers(0, 2, size=rows),
+            rng.integers(-1, 3, size=rows),
+            age,
+        ]
+    ).astype(np.float32)
+
+
+SLICES = {"Pclass": [0], "Sex": [1], "Embarked": [2], "Age": [3], "Pclass*Sex": [0, 1]}
+
+
+def test_sliced_confusion_matches_per_group_masks() -> None:
+    labels, scores = synthetic_predictions(5000)
+    columns = slice_columns(labels.size)
+    sliced = sliced_confusion(labels, scores, columns, SLICES)
+    expected = reference_sliced_confusion(labels, scores, columns, SLICES)
+    assert sliced.keys() == expected.keys()
+    for name in SLICES:
+        # NaN keys never compare equal, so match groups through their repr.
+        assert {repr(key): value for key, value in sliced[name].items()} == {
+            repr(key): value for key, value in expected[name].items()
+        }
+    assert sum(len(groups) for groups in sliced.values()) > 3 + 2 + 4 + 6
+
+
+def test_sliced_confusion_of_chunks_merges_to_the_whole() -> None:
+    labels, scores = synthetic_predictions(5000)
+    columns = slice_columns(labels.size)[:, :3]
+    slices = {name: indices for name, indices in SLICES.items() if name != "Age"}
+    merged: dict = {}
+    for start in range(0, labels.size, 700):
+        stop = start + 700
+        part = sliced_confusion(labels[start:stop], scores[start:stop], columns[start:stop], slices)
+        merge_sliced_confusion(merged, part)
+    assert merged == sliced_confusion(labels, scores, columns, slices)
+
+
+def reference_calibration(labels: list[int], scores: list[float], bins: int) -> dict:
+    """Per-row log loss, Brier score, ECE and bin counts."""
+    eps = 1e-15
+    log_loss = brier = 0.0
+    counts = [0] * bins
+    score_sums = [0.0] * bins
+    positives = [0] * bins
+    for label, score in zip(labels, scores):
+        clipped = min(max(score, eps), 1.0 - eps)
+        log_loss -= math.log(clipped) if label == 1 else math.log1p(-clipped)
+        brier += (score - (label == 1)) ** 2
+        index = min(max(int(score * bins), 0), bins - 1)
+        counts[index] += 1
+        score_sums[index] += score
+        positives[index] += label == 1
+    rows = len(scores)
+    gaps = [
+        abs(positive / count - total / count)
+        for count, total, positive in zip(counts, score_sums, positives)
+        if count
+    ]
+    filled = [count for count in counts if count]
+    return {
+        "log_loss": log_loss / rows,
+        "brier": brier / rows,
+        "ece": sum(count / rows * gap for count, gap in zip(filled, gaps)),
+        "mce": max(gaps),
+        "counts": counts,
+    }
+
+
+@pytest.mark.parametrize("bins", [1, 10, 15])
+def test_calibration_matches_the_per_row_loop(bins: int) -> None:
+    labels, scores = synthetic_predictions(20_000)
+    # Bin edges, the extremes and scores that clip in the log loss.
+    edges = [0.0, 1.0, 0.1, 0.2, 0.25, 0.3, 0.5, 0.6, 0.7, 0.8, 0.9, 1e-20, 1 - 1e-9]
+    scores[: len(edges)] = edges
+    expected = reference_calibration(labels.tolist(), scores.astype(np.float64).tolist(), bins)
+    calibration = calibration_metrics(labels, scores, bins)
+    for key in ("log_loss", "brier", "ece", "mce"):
+        assert calibration[key] == pytest.approx(expected[key], rel=1e-12, abs=1e-15)
+    assert [b["count"] for b in calibration["bins"]] == expected["counts"]
+    assert calibration["bins"][0]["lower"] == 0.0 and calibration["bins"][-1]["upper"] == 1.0
+
+
+def test_empty_calibration_bins_are_null() -> None:
+    calibration = calibration_metrics(np.array([0, 1]), np.array([0.05, 0.95]), bins=10)
+    assert [b["count"] for b in calibration["bins"]] == [1] + [0] * 8 + [1]
+    assert calibration["bins"][4]["mean_score"] is None
+    assert calibration["bins"][4]["positive_rate"] is None
+    assert calibration["ece"] == pytest.approx(0.05)
@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import os
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import preprocess
+from features import (
+    PREPROCESSOR_FILE_NAME,
+    fit_preprocessor,
+    read_columns,
+    read_preprocessor,
+    write_preprocessor,
+)
+from preprocess import (
+    load_preprocessor,
+    materialize_input,
+    read_input_columns,
+    resolve_local_inputs,
+)
+
+
+def split_into_directory(source: Path, directory: Path, parts: int) -> list[Path]:
+    """Write `source` as `parts` CSV files, each with the header, as File mode lays out a prefix."""
+    header, *rows = source.read_text(encoding="utf-8").splitlines(keepends=True)
+    paths = []
+    for index, chunk in enumerate(np.array_split(np.arange(len(rows)), parts)):
+        path = directory / f"part-{index // 2}" / f"{index:05d}.csv"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(header + "".join(rows[i] for i in chunk), encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def assert_columns_equal(actual: dict, expected: dict) -> None:
+    assert set(actual) == set(expected)
+    for name, values in expected.items():
+        np.testing.assert_array_equal(actual[name], values)
+
+
+def test_directory_files_are_read_in_sorted_order(titanic_csv, tmp_path: Path) -> None:
+    source = titanic_csv(rows=1500)
+    paths = split_into_directory(source, tmp_path / "input", parts=5)
+    (tmp_path / "input" / ".manifest").write_text("not a csv\n")
+    assert resolve_local_inputs(str(tmp_path / "input")) == paths
+    assert_columns_equal(read_input_columns(None, str(tmp_path / "input")), read_columns(source))
+
+
+def test_directory_is_materialized_as_one_csv(titanic_csv, tmp_path: Path) -> None:
+    source = titanic_csv(rows=1500)
+    paths = split_into_directory(source, tmp_path / "input", parts=3)
+    # A part without a trailing newline must not merge its last row with the next part's first.
+    paths[0].write_bytes(paths[0].read_bytes().rstrip(b"\n"))
+    target = materialize_input(None, str(tmp_path / "input"), tmp_path / "local" / "train.csv")
+    assert target.read_bytes() == source.read_bytes()
+
+
+def test_single_file_directory_is_used_in_place(titanic_csv, tmp_path: Path) -> None:
+    source = titanic_csv(rows=100)
+    (path,) = split_into_directory(source, tmp_path / "input", parts=1)
+    assert materialize_input(None, str(tmp_path / "input"), tmp_path / "copy.csv") == path
+    assert not (tmp_path / "copy.csv").exists()
+
+
+def test_directory_files_must_share_a_header(titanic_csv, tmp_path: Path) -> None:
+    paths = split_into_directory(titanic_csv(rows=100), tmp_path / "input", parts=2)
+    paths[1].write_bytes(paths[1].read_bytes().replace(b"PassengerId", b"Id", 1))
+    with pytest.raises(ValueError, match="different headers"):
+        materialize_input(None, str(tmp_path / "input"), tmp_path / "train.csv")
+
+
+def test_empty_directory_is_rejected(tmp_path: Path) -> None:
+    (tmp_path / "input").mkdir()
+    with pytest.raises(ValueError, match="No input files"):
+        resolve_local_inputs(str(tmp_path / "input"))
+    with pytest.raises(FileNotFoundError):
+        resolve_local_inputs(str(tmp_path / "missing"))
+
+
+def test_fifo_is_spooled_to_disk(titanic_csv, tmp_path: Path) -> None:
+    source = titanic_csv(rows=500)
+    fifo = tmp_path / "train.fifo"
+    os.mkfifo(fifo)
+    writer = threading.Thread(target=lambda: fifo.write_bytes(source.read_bytes()))
+    writer.start()
+    target = materialize_input(None, str(fifo), tmp_path / "local" / "train.csv")
+    writer.join()
+    assert target.read_bytes() == source.read_bytes()
+
+
+def run_preprocess(monkeypatch, output_root: Path, train: Path, validation: Path, *extra: str):
+    """Run preprocess.main on local inputs, writing its channels under `output_root`."""
+    for name in ("train", "validation", "preprocessor"):
+        monkeypatch.setattr(preprocess, f"{name.upper()}_OUTPUT_DIR", output_root / name)
+    argv = [
+        "preprocess.py",
+        "--input-train-uri",
+        str(train),
+        "--input-validation-uri",
+        str(validation),
+        *extra,
+    ]
+    monkeypatch.setattr(sys, "argv", argv)
+    preprocess.main()
+
+
+def channel_bytes(directory: Path) -> bytes:
+    return b"".join(path.read_bytes() for path in sorted(directory.iterdir()))
+
+
+@pytest.mark.parametrize("mode", [(), ("--shards", "2", "--workers", "1")])
+def test_loaded_preprocessor_replaces_fitting(
+    monkeypatch, titanic_csv, tmp_path: Path, mode: tuple
+) -> None:
+    train = titanic_csv(rows=1500, seed=1, name="train.csv")
+    validation = titanic_csv(rows=500, seed=2, name="validation.csv")
+    run_preprocess(monkeypatch, tmp_path / "fitted", train, validation)
+    fitted = tmp_path / "fitted" / "preprocessor" / PREPROCESSOR_FILE_NAME
+
+    # Other train rows would fit other fills; the loaded preprocessor must win.
+    other_train = titanic_csv(rows=800, seed=3, name="other_train.csv")
+    extra = ("--preprocessor-uri", str(fitted), *mode)
+    run_preprocess(monkeypatch, tmp_path / "loaded", other_train, validation, *extra)
+    loaded = tmp_path / "loaded"
+    written = read_preprocessor(loaded / "preprocessor" / PREPROCESSOR_FILE_NAME)
+    assert written == read_preprocessor(fitted)
+    assert channel_bytes(loaded / "validation") == channel_bytes(tmp_path / "fitted" / "validation")
+
+
+def test_preprocessor_is_loaded_from_s3(s3_client, s3_upload, tmp_path: Path) -> None:
+    path = tmp_path / PREPROCESSOR_FILE_NAME
+    write_preprocessor(path, fit_preprocessor(28.0, 14.4542))
+    uri = s3_upload(path, "runtime/preprocessor/preprocessor.json")
+    assert load_preprocessor(s3_client, uri, tmp_path / "work") == read_preprocessor(path)
+
+
+def output_files(output_root: Path) -> dict[str, bytes]:
+    return {
+        path.relative_to(output_root).as_posix(): path.read_bytes()
+        for path in output_root.rglob("*")
+        if path.is_file()
+    }
+
+
+def test_stale_outputs_are_neither_kept_nor_cached(
+    monkeypatch, titanic_csv, tmp_path: Path, capsys
+) -> None:
+    train = titanic_csv(rows=1000, seed=1, name="train.csv")
+    validation = titanic_csv(rows=300, seed=2, name="validation.csv")
+    cache_args = ("--cache-uri", str(tmp_path / "cache"))
+    stale = tmp_path / "first" / "train" / "train_xgb-00003.csv"
+    stale.parent.mkdir(parents=True)
+    stale.write_text("1,2,3\n")
+
+    run_preprocess(monkeypatch, tmp_path / "first", train, validation, *cache_args)
+    assert "Output cache miss" in capsys.readouterr().out
+    assert not stale.exists()
+    written = output_files(tmp_path / "first")
+
+    # A second run in a fresh output root replays exactly the files the first one wrote.
+    run_preprocess(monkeypatch, tmp_path / "second", train, validation, *cache_args)
+    assert "Output cache hit" in capsys.readouterr().out
+    assert output_files(tmp_path / "second") == written
+
+
+def pipe_channel(source: Path, directory: Path) -> threading.Thread:
+    """A Pipe-mode input directory: one FIFO, fed with `source` by a writer thread."""
+    directory.mkdir(parents=True)
+    fifo = directory / f"{directory.name}_0"
+    os.mkfifo(fifo)
+    writer = threading.Thread(target=lambda: fifo.write_bytes(source.read_bytes()))
+    writer.start()
+    return writer
+
+
+def test_fifo_in_a_pipe_directory_is_found_and_streamed(titanic_csv, tmp_path: Path) -> None:
+    source = titanic_csv(rows=800)
+    writer = pipe_channel(source, tmp_path / "train")
+    assert resolve_local_inputs(str(tmp_path / "train")) == [tmp_path / "train" / "train_0"]
+    assert_columns_equal(read_input_columns(None, str(tmp_path / "train")), read_columns(source))
+    writer.join()
+
+
+@pytest.mark.parametrize("mode", [(), ("--shards", "2", "--workers", "1")])
+def test_pipe_mode_inputs_give_the_file_input_outputs(
+    monkeypatch, titanic_csv, tmp_path: Path, mode: tuple
+) -> None:
+    train = titanic_csv(rows=1200, seed=1, name="train.csv")
+    validation = titanic_csv(rows=400, seed=2, name="validation.csv")
+    run_preprocess(monkeypatch, tmp_path / "files", train, validation, *mode)
+
+    writers = [
+        pipe_channel(train, tmp_path / "pipe" / "train"),
+        pipe_channel(validation, tmp_path / "pipe" / "validation"),
+    ]
+    # Shards need seekable files; the FIFOs are spooled under preprocess's work directory.
+    monkeypatch.setattr(preprocess, "WORK_DIR", tmp_path / "work")
+    pipes = (tmp_path / "pipe" / "train", tmp_path / "pipe" / "validation")
+    run_preprocess(monkeypatch, tmp_path / "piped", *pipes, *mode)
+    for writer in writers:
+        writer.join()
+    assert output_files(tmp_path / "piped") == output_files(tmp_path / "files")
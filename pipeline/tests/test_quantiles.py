@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from quantiles import KllSketch, counts_quantile, exact_quantile
+
+QUANTILES = (0.0, 0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 1.0)
+
+
+def fare_like(rows: int, seed: int = 3) -> np.ndarray:
+    # Skewed values with many ties, so ranks and interpolation are both exercised.
+    rng = np.random.default_rng(seed)
+    return np.round(rng.lognormal(mean=2.7, sigma=1.0, size=rows), 2)
+
+
+def rank_error(ordered: np.ndarray, value: float, q: float) -> float:
+    """Distance from q to the nearest normalized rank held by `value` (ties span a range)."""
+    low = np.searchsorted(ordered, value, side="left") / (ordered.size - 1)
+    high = (np.searchsorted(ordered, value, side="right") - 1) / (ordered.size - 1)
+    return 0.0 if low <= q <= high else float(min(abs(q - low), abs(q - high)))
+
+
+@pytest.mark.parametrize("rows", [1, 2, 7, 1000, 1001])
+def test_exact_quantile_matches_numpy(rows: int) -> None:
+    values = fare_like(rows)
+    for q in QUANTILES:
+        assert exact_quantile(values, q) == float(np.quantile(values, q))
+    assert exact_quantile(values, 0.5) == float(np.median(values))
+
+
+@pytest.mark.parametrize("rows", [1, 2, 7, 1000, 1001])
+def test_counts_quantile_matches_exact(rows: int) -> None:
+    values = fare_like(rows)
+    counts = Counter(values.tolist())
+    for q in QUANTILES:
+        assert counts_quantile(counts, q) == exact_quantile(values, q)
+
+
+def test_empty_inputs_have_a_zero_quantile() -> None:
+    assert exact_quantile(np.empty(0), 0.5) == 0.0
+    assert counts_quantile({}, 0.5) == 0.0
+    assert KllSketch().quantile(0.5) == 0.0
+
+
+@pytest.mark.parametrize("k", [50, 200])
+def test_sketch_stays_within_its_rank_error(k: int) -> None:
+    values = fare_like(200_000)
+    ordered = np.sort(values)
+    sketch = KllSketch(k=k, seed=1)
+    for offset in range(0, values.size, 8192):
+        sketch.update(values[offset : offset + 8192])
+    assert sketch.count == values.size
+    assert sketch.items() <= 3 * k
+    worst = max(rank_error(ordered, sketch.quantile(q), q) for q in QUANTILES)
+    # rank_error is the typical error, not a hard bound; allow the tail some slack.
+    assert worst <= 2 * sketch.rank_error
+
+
+def test_merged_shard_sketches_keep_exact_totals_and_error() -> None:
+    values = fare_like(200_000)
+    ordered = np.sort(values)
+    shards = np.array_split(values, 8)
+    merged = KllSketch(k=200, seed=len(shards))
+    for index, shard in enumerate(shards):
+        sketch = KllSketch(k=200, seed=index)
+        sketch.update(shard)
+        merged.merge(sketch)
+    assert merged.count == values.size
+    assert (merged.minimum, merged.maximum) == (values.min(), values.max())
+    assert (merged.quantile(0.0), merged.quantile(1.0)) == (values.min(), values.max())
+    weight = sum(items.size * 2**level for level, items in enumerate(merged.levels))
+    assert weight == values.size
+    worst = max(rank_error(ordered, merged.quantile(q), q) for q in QUANTILES)
+    assert worst <= 2 * merged.rank_error
+
+
+def test_sketch_rejects_a_tiny_k_and_an_out_of_range_quantile() -> None:
+    with pytest.raises(ValueError, match="k must be"):
+        KllSketch(k=4)
+    with pytest.raises(ValueError, match="between 0 and 1"):
+        exact_quantile(np.ones(3), 1.5)
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from features import read_columns, read_stream_columns
+from s3io import download_s3_file, iter_s3_parts, open_s3_stream
+
+
+def count_ranged_gets(s3_client) -> list[str]:
+    ranges = []
+
+    def record(params, **kwargs) -> None:
+        ranges.append(params.get("Range"))
+
+    s3_client.meta.events.register("provide-client-params.s3.GetObject", record)
+    return ranges
+
+
+@pytest.mark.parametrize("part_bytes", [4096, 1 << 20])
+def test_stream_parses_to_the_same_columns(
+    s3_client, s3_upload, titanic_csv, part_bytes: int
+) -> None:
+    path = titanic_csv(rows=2000)
+    uri = s3_upload(path, "curated/train.csv")
+    ranges = count_ranged_gets(s3_client)
+    with open_s3_stream(s3_client, uri, part_bytes=part_bytes, concurrency=3) as stream:
+        streamed = read_stream_columns(stream, source=uri)
+    expected = read_columns(path)
+    assert set(streamed) == set(expected)
+    for name, values in expected.items():
+        np.testing.assert_array_equal(streamed[name], values)
+    size = path.stat().st_size
+    assert len(ranges) == -(-size // part_bytes)
+    assert all(value and value.startswith("bytes=") for value in ranges)
+
+
+def test_parts_arrive_in_order(s3_client, s3_upload, tmp_path: Path) -> None:
+    path = tmp_path / "blob.bin"
+    path.write_bytes(np.random.default_rng(0).bytes(100_003))
+    uri = s3_upload(path, "blob.bin")
+    parts = list(iter_s3_parts(s3_client, uri, part_bytes=1000, concurrency=8))
+    assert [len(part) for part in parts] == [1000] * 100 + [3]
+    assert b"".join(parts) == path.read_bytes()
+
+
+def test_download_is_byte_identical(s3_client, s3_upload, titanic_csv, tmp_path: Path) -> None:
+    path = titanic_csv(rows=500)
+    uri = s3_upload(path, "curated/validation.csv")
+    target = tmp_path / "download" / "validation.csv"
+    download_s3_file(s3_client, uri, target, part_bytes=5000, concurrency=4)
+    assert target.read_bytes() == path.read_bytes()
+
+
+def test_empty_object_has_no_parts(s3_client, s3_upload) -> None:
+    uri = s3_upload(b"", "empty.csv")
+    assert list(iter_s3_parts(s3_client, uri)) == []
+
+
+def test_object_overwritten_mid_read_fails(s3_client, s3_upload) -> None:
+    uri = s3_upload(b"a" * 10_000, "curated/train.csv")
+    parts = iter_s3_parts(s3_client, uri, part_bytes=1000, concurrency=1)
+    assert next(parts) == b"a" * 1000
+    s3_upload(b"b" * 10_000, "curated/train.csv")
+    with pytest.raises(RuntimeError, match="changed while it was being read"):
+        list(parts)
+
+
+def test_closing_the_stream_early_stops_the_part_requests(s3_client, s3_upload) -> None:
+    uri = s3_upload(b"x" * 100_000, "blob.bin")
+    ranges = count_ranged_gets(s3_client)
+    before = set(threading.enumerate())
+    stream = open_s3_stream(s3_client, uri, part_bytes=1000, concurrency=4)
+    assert stream.read(10) == b"x" * 10
+    stream.close()
+    requested = len(ranges)
+    assert requested < 100
+    # The part pool is shut down: no worker thread of it is left, and no GET follows the close.
+    assert {thread for thread in threading.enumerate() if thread.is_alive()} <= before
+    assert len(ranges) == requested
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+xgb = pytest.importorskip("xgboost")
+
+from features import encode_columns, fill_values, labels_from_columns, read_columns  # noqa: E402
+from search import (  # noqa: E402
+    SEARCH_SPACE,
+    rung_rounds,
+    sample_candidates,
+    successive_halving,
+)
+
+BASE_PARAMS = {"objective": "binary:logistic", "tree_method": "hist", "seed": 0, "nthread": 1}
+
+
+@pytest.fixture
+def matrices(titanic_csv) -> tuple[xgb.DMatrix, xgb.DMatrix]:
+    columns = read_columns(titanic_csv(rows=2000))
+    labels = labels_from_columns(columns)
+    features = encode_columns(columns, *fill_values(columns)).astype(np.float32)
+    dtrain = xgb.QuantileDMatrix(features[:1600], label=labels[:1600])
+    dvalidation = xgb.QuantileDMatrix(features[1600:], label=labels[1600:], ref=dtrain)
+    return dtrain, dvalidation
+
+
+@pytest.mark.parametrize(
+    ("min_rounds", "max_rounds", "factor", "expected"),
+    [(25, 200, 3, [25, 75, 200]), (10, 40, 2, [10, 20, 40]), (50, 20, 3, [20]), (5, 5, 2, [5])],
+)
+def test_rung_rounds(min_rounds: int, max_rounds: int, factor: int, expected: list[int]) -> None:
+    assert rung_rounds(min_rounds, max_rounds, factor) == expected
+
+
+@pytest.mark.parametrize(("min_rounds", "factor"), [(0, 3), (10, 1)])
+def test_rung_rounds_rejects_a_bad_schedule(min_rounds: int, factor: int) -> None:
+    with pytest.raises(ValueError, match="min_rounds >= 1 and factor >= 2"):
+        rung_rounds(min_rounds, 100, factor)
+
+
+def test_sample_candidates_is_seeded_and_inside_the_space() -> None:
+    candidates = sample_candidates(50, seed=3)
+    assert candidates == sample_candidates(50, seed=3)
+    assert candidates != sample_candidates(50, seed=4)
+    for candidate in candidates:
+        assert candidate.keys() == SEARCH_SPACE.keys()
+        for name, (kind, low, high) in SEARCH_SPACE.items():
+            assert low <= candidate[name] <= high
+            assert isinstance(candidate[name], int if kind == "int" else float)
+
+
+def test_halving_keeps_the_best_fraction_of_each_rung(matrices) -> None:
+    candidates = sample_candidates(9, seed=0)
+    best, model, leaderboard = successive_halving(
+        BASE_PARAMS, candidates, *matrices, [2, 6, 12], 3, workers=1
+    )
+    assert [entry["rank"] for entry in leaderboard] == list(range(1, 10))
+    assert sorted(entry["candidate"] for entry in leaderboard) == list(range(9))
+    assert [entry["rounds"] for entry in leaderboard] == [12, 6, 6, 2, 2, 2, 2, 2, 2]
+
+    # Each rung's survivors are the lowest losses of the previous rung.
+    for rung, survivors in ((0, 3), (1, 1)):
+        history = [entry["rung_logloss"] for entry in leaderboard]
+        reached = [losses for losses in history if len(losses) > rung]
+        promoted = sorted(losses[rung] for losses in reached if len(losses) > rung + 1)
+        assert promoted == sorted(losses[rung] for losses in reached)[:survivors]
+
+    assert leaderboard[0]["candidate"] == best
+    assert leaderboard[0]["params"] == candidates[best]
+    assert leaderboard[0]["validation_logloss"] == leaderboard[0]["rung_logloss"][-1]
+    booster = xgb.Booster(model_file=bytearray(model))
+    assert booster.num_boosted_rounds() == 12
+
+
+def test_workers_do_not_change_the_result(matrices) -> None:
+    candidates = sample_candidates(6, seed=2)
+    serial = successive_halving(BASE_PARAMS, candidates, *matrices, [2, 4, 8], 2, workers=1)
+    forked = successive_halving(BASE_PARAMS, candidates, *matrices, [2, 4, 8], 2, workers=3)
+    assert forked == serial
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+import features
+from features import (
+    encode_columns,
+    fill_strategy,
+    fill_values,
+    fit_preprocessor,
+    labels_from_columns,
+    read_columns,
+)
+from formats import channel_files, write_matrix
+from sharding import encode_sharded, sharded_fill_values
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_sharded_fills_match_single_pass(titanic_csv, workers: int) -> None:
+    path = titanic_csv(rows=3000)
+    assert sharded_fill_values(path, shards=5, workers=workers) == fill_values(read_columns(path))
+
+
+@pytest.mark.parametrize(("shards", "workers"), [(1, 1), (4, 1), (7, 2)])
+def test_concatenated_parts_match_single_file(
+    tmp_path: Path, titanic_csv, shards: int, workers: int
+) -> None:
+    path = titanic_csv(rows=3000)
+    columns = read_columns(path)
+    fills = fill_values(columns)
+    preprocessor = fit_preprocessor(*fills)
+    single = tmp_path / "single.csv"
+    write_matrix(single, labels_from_columns(columns), encode_columns(columns, *fills), "csv")
+
+    output_dir = tmp_path / "parts"
+    rows = encode_sharded(path, output_dir, "train_xgb", "csv", preprocessor, shards, workers)
+    parts = channel_files(output_dir, "csv")
+    assert rows == 3000
+    assert len(parts) == shards
+    assert b"".join(part.read_bytes() for part in parts) == single.read_bytes()
+
+
+def test_hosts_write_disjoint_parts(tmp_path: Path, titanic_csv) -> None:
+    path = titanic_csv(rows=1000)
+    preprocessor = fit_preprocessor(*fill_values(read_columns(path)))
+    output_dir = tmp_path / "parts"
+    rows = [
+        encode_sharded(path, output_dir, "train_xgb", "csv", preprocessor, 5, 1, host, 2)
+        for host in range(2)
+    ]
+    assert sum(rows) == 1000
+    assert [part.name for part in channel_files(output_dir, "csv")] == [
+        f"train_xgb-{index:05d}.csv" for index in range(5)
+    ]
+
+
+
+def test_shard_sketches_are_seeded_per_shard(monkeypatch, titanic_csv) -> None:
+    seeds = []
+
+    class RecordingSketch(features.KllSketch):
+        def __init__(self, k: int, seed: int = 0) -> None:
+            seeds.append(seed)
+            super().__init__(k=k, seed=seed)
+
+    monkeypatch.setattr(features, "KllSketch", RecordingSketch)
+    strategy = fill_strategy(estimator="sketch", sketch_k=16)
+    sharded_fill_values(titanic_csv(rows=3000), shards=4, workers=1, strategy=strategy)
+    # Two columns per state: four shard states and the merged one each get their own seed.
+    assert sorted(seeds) == sorted(2 * list(range(5)))
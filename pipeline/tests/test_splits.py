@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from splits import hash_folds, hash_units, split_hash_unit, stratified_folds
+
+
+@pytest.fixture
+def labels() -> np.ndarray:
+    return np.random.default_rng(5).binomial(1, 0.38, 3001).astype(np.float64)
+
+
+@pytest.mark.parametrize("seed", [0, 42, 12345])
+def test_hash_units_match_split_hash_unit_row_by_row(labels: np.ndarray, seed: int) -> None:
+    expected = [
+        split_hash_unit(seed, str(int(label)), str(position))
+        for position, label in enumerate(labels.tolist())
+    ]
+    np.testing.assert_array_equal(hash_units(labels, seed), np.array(expected))
+
+
+def test_hash_units_ignore_the_other_rows(labels: np.ndarray) -> None:
+    units = hash_units(labels, 42)
+    assert units.min() >= 0.0 and units.max() < 1.0
+    # A row's unit depends on its own label and position only.
+    np.testing.assert_array_equal(hash_units(labels[:1000], 42), units[:1000])
+    flipped = labels.copy()
+    flipped[1500:] = 1 - flipped[1500:]
+    np.testing.assert_array_equal(hash_units(flipped, 42)[:1500], units[:1500])
+
+
+def test_hash_fold_zero_is_the_hash_split_validation(labels: np.ndarray) -> None:
+    folds = hash_folds(labels, 4, 42)
+    validation = np.array(
+        [
+            split_hash_unit(42, str(int(label)), str(position)) < 1 / 4
+            for position, label in enumerate(labels.tolist())
+        ]
+    )
+    np.testing.assert_array_equal(folds == 0, validation)
+    assert set(np.unique(folds).tolist()) == {0, 1, 2, 3}
+
+
+@pytest.mark.parametrize("count", [2, 5, 7])
+def test_stratified_folds_split_each_label_evenly(labels: np.ndarray, count: int) -> None:
+    folds = stratified_folds(labels, count, 42)
+    assert folds.dtype == np.int32
+    for label in (0.0, 1.0):
+        sizes = np.bincount(folds[labels == label], minlength=count)
+        assert sizes.max() - sizes.min() <= 1
+    np.testing.assert_array_equal(stratified_folds(labels, count, 42), folds)
+
+
+@pytest.mark.parametrize("assign", [hash_folds, stratified_folds])
+def test_folds_need_at_least_two(labels: np.ndarray, assign) -> None:
+    with pytest.raises(ValueError, match="at least 2 folds"):
+        assign(labels, 1, 42)
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+xgb = pytest.importorskip("xgboost")
+
+import train  # noqa: E402
+from features import encode_columns, fill_values, labels_from_columns, read_columns  # noqa: E402
+from formats import part_file_name, write_matrix  # noqa: E402
+from train import load_channel  # noqa: E402
+
+PARAMS = {
+    "objective": "binary:logistic",
+    "max_depth": 4,
+    "eta": 0.3,
+    "tree_method": "hist",
+    "nthread": 2,
+    "seed": 0,
+}
+
+
+@pytest.fixture
+def encoded_rows(titanic_csv) -> tuple[np.ndarray, np.ndarray]:
+    columns = read_columns(titanic_csv(rows=3000))
+    return labels_from_columns(columns), encode_columns(columns, *fill_values(columns))
+
+
+@pytest.fixture
+def train_channel(encoded_rows: tuple[np.ndarray, np.ndarray], tmp_path: Path) -> Path:
+    path = tmp_path / "train_xgb.csv"
+    write_matrix(path, *encoded_rows, "csv")
+    return path
+
+
+@pytest.fixture
+def sharded_channel(encoded_rows: tuple[np.ndarray, np.ndarray], tmp_path: Path) -> Path:
+    """The rows split over three csv part files, as preprocess.py --shards writes them."""
+    labels, features = encoded_rows
+    directory = tmp_path / "train"
+    directory.mkdir()
+    for index, rows in enumerate(np.array_split(np.arange(labels.size), 3)):
+        path = directory / part_file_name("train_xgb", index, "csv")
+        write_matrix(path, labels[rows], features[rows], "csv")
+    return directory
+
+
+def run_train(monkeypatch, output_dir: Path, channel: Path, *extra: str) -> bytes:
+    """Run train.main on `channel` and return the xgboost-model it writes."""
+    argv = [
+        "train.py",
+        "--train",
+        str(channel),
+        "--validation",
+        "",
+        "--output-dir",
+        str(output_dir),
+        "--dmatrix-cache-dir",
+        "",
+        "--num-round",
+        "10",
+        "--nthread",
+        "2",
+        *extra,
+    ]
+    monkeypatch.setattr(sys, "argv", argv)
+    train.main()
+    return (output_dir / train.MODEL_FILE_NAME).read_bytes()
+
+
+def train_raw(matrix: xgb.DMatrix, params: dict[str, object] = PARAMS, rounds: int = 10) -> bytes:
+    return xgb.train(params, matrix, num_boost_round=rounds).save_raw("json")
+
+
+def test_cache_states_go_off_miss_then_hit(train_channel: Path, tmp_path: Path) -> None:
+    cache_dir = tmp_path / "dmatrix_cache"
+    states = [
+        load_channel(train_channel, "csv", 2, cache)[1] for cache in (None, cache_dir, cache_dir)
+    ]
+    assert states == ["off", "miss", "hit"]
+    assert [p.suffix for p in cache_dir.iterdir()] == [".buffer"]
+
+
+def test_a_changed_channel_misses_the_cache(train_channel: Path, tmp_path: Path) -> None:
+    cache_dir = tmp_path / "dmatrix_cache"
+    load_channel(train_channel, "csv", 2, cache_dir)
+    rows = train_channel.read_bytes().splitlines(keepends=True)
+    train_channel.write_bytes(b"".join(rows[:-1]))
+    assert load_channel(train_channel, "csv", 2, cache_dir)[1] == "miss"
+
+
+def test_cache_hit_trains_the_same_model_as_the_parsed_channel(
+    train_channel: Path, tmp_path: Path
+) -> None:
+    cache_dir = tmp_path / "dmatrix_cache"
+    parsed, _ = load_channel(train_channel, "csv", 2, None)
+    load_channel(train_channel, "csv", 2, cache_dir)
+    cached, state = load_channel(train_channel, "csv", 2, cache_dir)
+    assert state == "hit"
+    assert cached.num_row() == parsed.num_row()
+    np.testing.assert_array_equal(cached.get_label(), parsed.get_label())
+    assert train_raw(cached) == train_raw(parsed)
+
+
+@pytest.mark.parametrize("mode", ["quantile", "external"])
+def test_streamed_data_modes_train_the_memory_model(
+    monkeypatch, sharded_channel: Path, tmp_path: Path, mode: str
+) -> None:
+    memory = run_train(monkeypatch, tmp_path / "memory", sharded_channel)
+    # Batches smaller than a part file, so a part file spans several DataIter batches.
+    streamed = run_train(
+        monkeypatch,
+        tmp_path / mode,
+        sharded_channel,
+        "--data-mode",
+        mode,
+        "--batch-rows",
+        "700",
+        "--external-cache-dir",
+        str(tmp_path / "pages"),
+    )
+    assert streamed == memory
+    summary = json.loads((tmp_path / mode / train.SUMMARY_FILE_NAME).read_text(encoding="utf-8"))
+    assert summary["data_mode"] == mode
+    assert summary["dmatrix_cache"] == {"train": "off"}
+
+
+def checkpoint_args(checkpoint_dir: Path, rounds: int, *extra: str) -> list[str]:
+    return [
+        "--num-round",
+        str(rounds),
+        "--checkpoint-interval",
+        "5",
+        "--checkpoint-dir",
+        str(checkpoint_dir),
+        "--subsample",
+        "0.7",
+        *extra,
+    ]
+
+
+@pytest.mark.parametrize("stopped_at", [7, 10, 19])
+def test_a_resumed_run_trains_the_uninterrupted_model(
+    monkeypatch, train_channel: Path, tmp_path: Path, stopped_at: int
+) -> None:
+    uninterrupted = run_train(
+        monkeypatch, tmp_path / "once", train_channel, *checkpoint_args(tmp_path / "a", 20)
+    )
+    # A run stopped after `stopped_at` rounds leaves its checkpoints behind.
+    stopped = checkpoint_args(tmp_path / "b", stopped_at)
+    run_train(monkeypatch, tmp_path / "stopped", train_channel, *stopped)
+    resumed = run_train(
+        monkeypatch, tmp_path / "resumed", train_channel, *checkpoint_args(tmp_path / "b", 20)
+    )
+    assert resumed == uninterrupted
+    summary = json.loads((tmp_path / "resumed" / train.SUMMARY_FILE_NAME).read_text("utf-8"))
+    assert summary["checkpoints"]["resumed_rounds"] == stopped_at // 5 * 5
+    assert summary["rounds"] == 20
+
+
+@pytest.mark.parametrize(("interval", "keep"), [("-1", "3"), ("5", "0")])
+def test_checkpoint_settings_are_checked(
+    monkeypatch, train_channel: Path, tmp_path: Path, interval: str, keep: str
+) -> None:
+    extra = ["--checkpoint-interval", interval, "--checkpoint-keep", keep]
+    with pytest.raises(SystemExit):
+        run_train(monkeypatch, tmp_path / "model", train_channel, *extra)
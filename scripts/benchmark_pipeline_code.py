@@ -0,0 +1,1434 @@
+#!/usr/bin/env python3
+"""
+Local benchmarks and parity checks for the shared pipeline code in pipeline/code/.
+
+Each subcommand builds a synthetic input by resampling the raw Titanic CSV, times the optimized
+path against a reference, checks that both produce the same result and prints a JSON summary.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import itertools
+import json
+import math
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / "pipeline" / "code"))
+
+from features import (  # noqa: E402
+    encode_columns,
+    fill_values,
+    fit_preprocessor,
+    labels_from_columns,
+    read_columns,
+    write_csv_rows,
+)
+from formats import (  # noqa: E402
+    OUTPUT_FORMATS,
+    channel_file_name,
+    channel_files,
+    part_file_name,
+    read_first_column,
+    read_matrix,
+    write_matrix,
+)
+from metrics import (  # noqa: E402
+    BOOTSTRAP_METHODS,
+    BOOTSTRAP_METRICS,
+    bootstrap_intervals,
+    calibration_metrics,
+    classification_metrics,
+    confusion_matrix,
+    pr_auc,
+    ranking_metrics,
+    roc_auc,
+    safe_div,
+    sliced_confusion,
+    threshold_sweep,
+)
+from quantiles import KllSketch, exact_quantile  # noqa: E402
+from sharding import default_workers, encode_sharded, sharded_fill_values  # noqa: E402
+
+RAW_DATASET = REPO_ROOT / "data" / "titanic" / "raw" / "titanic.csv"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark pipeline/code hot paths locally.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    encode = subparsers.add_parser("encode", help="Columnar encoder versus the per-row reference.")
+    encode.add_argument("--rows", type=int, default=1_000_000, help="Synthetic train rows.")
+    encode.add_argument("--seed", type=int, default=42, help="Seed for row resampling.")
+
+    formats = subparsers.add_parser(
+        "formats",
+        help="Size, write and read time of every training-channel format.",
+    )
+    formats.add_argument("--rows", type=int, default=200_000, help="Synthetic train rows.")
+    formats.add_argument("--seed", type=int, default=42, help="Seed for row resampling.")
+
+    shards = subparsers.add_parser(
+        "shards",
+        help="Sharded process-pool encoding versus the single-file path, per worker count.",
+    )
+    shards.add_argument("--rows", type=int, default=2_000_000, help="Synthetic train rows.")
+    shards.add_argument("--seed", type=int, default=42, help="Seed for row resampling.")
+    shards.add_argument("--shards", type=int, default=0, help="Shards (default: 2 x CPUs).")
+    shards.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        help="Worker counts to time (default: 1, 2, 4, ... up to the CPU count).",
+    )
+
+    s3 = subparsers.add_parser(
+        "s3",
+        help="Concurrent ranged streaming read versus sequential download + parse (needs moto).",
+    )
+    s3.add_argument(
+        "--sizes-mb",
+        type=int,
+        nargs="+",
+        default=[1, 8, 32, 128],
+        help="Approximate size of each synthetic object (train and validation) in MiB.",
+    )
+    s3.add_argument("--seed", type=int, default=42, help="Seed for row resampling.")
+    s3.add_argument(
+        "--latency-ms",
+        type=float,
+        default=20.0,
+        help="Simulated first-byte latency per S3 request (moto itself answers instantly).",
+    )
+    s3.add_argument(
+        "--connection-mib-s",
+        type=float,
+        default=80.0,
+        help="Simulated throughput of one S3 connection; 0 disables the simulation.",
+    )
+
+    quantiles = subparsers.add_parser(
+        "quantiles",
+        help="Selection and KLL sketch quantiles versus a full sort; sketch rank error and merge.",
+    )
+    quantiles.add_argument("--rows", type=int, default=10_000_000, help="Synthetic values.")
+    quantiles.add_argument("--seed", type=int, default=42, help="Seed for the value generator.")
+    quantiles.add_argument(
+        "--quantiles",
+        type=float,
+        nargs="+",
+        default=[0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99],
+        help="Quantiles to check.",
+    )
+    quantiles.add_argument(
+        "--sketch-k",
+        type=int,
+        nargs="+",
+        default=[50, 200, 800],
+        help="KLL sketch sizes to time.",
+    )
+    quantiles.add_argument(
+        "--shards", type=int, default=8, help="Shards sketched separately and then merged."
+    )
+    quantiles.add_argument(
+        "--batch-rows", type=int, default=65_536, help="Values per sketch update (parse batch)."
+    )
+
+    metrics = subparsers.add_parser(
+        "metrics",
+        help="Vectorized confusion matrix and metrics versus the per-row loop.",
+    )
+    metrics.add_argument("--rows", type=int, default=10_000_000, help="Synthetic predictions.")
+    metrics.add_argument("--seed", type=int, default=42, help="Seed for labels and scores.")
+    metrics.add_argument("--threshold", type=float, default=0.5, help="Decision threshold.")
+    metrics.add_argument(
+        "--sweep-thresholds",
+        type=int,
+        default=100,
+        help="Thresholds scored one confusion matrix at a time, versus one sorted sweep.",
+    )
+
+    evaluation = subparsers.add_parser(
+        "evaluate",
+        help="evaluate.py peak RSS and time, whole-file versus --chunk-rows streaming.",
+    )
+    evaluation.add_argument("--rows", type=int, default=2_000_000, help="Validation rows.")
+    evaluation.add_argument("--seed", type=int, default=42, help="Seed for row resampling.")
+    evaluation.add_argument("--format", choices=OUTPUT_FORMATS[:3], default="csv")
+    evaluation.add_argument(
+        "--chunk-rows",
+        type=int,
+        nargs="+",
+        default=[16_384, 65_536, 262_144],
+        help="Chunk sizes to run in streaming mode.",
+    )
+
+    extract = subparsers.add_parser(
+        "extract",
+        help="Model extraction: getmembers + extractall versus one streaming pass and the cache.",
+    )
+    extract.add_argument(
+        "--extra-files", type=int, default=64, help="Non-model files packed next to the model."
+    )
+    extract.add_argument(
+        "--extra-file-mib", type=float, default=2.0, help="Size of each extra file in MiB."
+    )
+    extract.add_argument("--seed", type=int, default=42, help="Seed for the extra file bytes.")
+
+    predict = subparsers.add_parser(
+        "predict",
+        help="float64 DMatrix + predict versus float32 inplace_predict, per phase.",
+    )
+    predict.add_argument("--rows", type=int, default=2_000_000, help="Validation rows.")
+    predict.add_argument("--seed", type=int, default=42, help="Seed for row resampling.")
+    predict.add_argument("--format", choices=("csv", "parquet"), default="csv")
+    predict.add_argument(
+        "--nthread", type=int, nargs="+", default=[1], help="Thread counts to time."
+    )
+    predict.add_argument(
+        "--batch-rows",
+        type=int,
+        nargs="+",
+        default=[0, 65_536],
+        help="inplace_predict batch sizes to time (0: one call).",
+    )
+
+    bootstrap = subparsers.add_parser(
+        "bootstrap",
+        help="Vectorized bootstrap intervals versus one resample-and-score loop per replicate.",
+    )
+    bootstrap.add_argument("--rows", type=int, default=179, help="Validation predictions.")
+    bootstrap.add_argument("--replicates", type=int, default=10_000)
+    bootstrap.add_argument("--seed", type=int, default=42, help="Seed for data and resamples.")
+    bootstrap.add_argument(
+        "--workers", type=int, nargs="+", default=[1, 2], help="Process counts to time."
+    )
+    bootstrap.add_argument(
+        "--batch-cells",
+        type=int,
+        default=1 << 22,
+        help="Replicates x rows per weight matrix; smaller spreads batches over --workers.",
+    )
+
+    slices = subparsers.add_parser(
+        "slices",
+        help="Per-cohort confusion matrices: one mask per group versus one combined bincount.",
+    )
+    slices.add_argument("--rows", type=int, default=10_000_000, help="Synthetic predictions.")
+    slices.add_argument("--seed", type=int, default=42, help="Seed for labels, scores, cohorts.")
+
+    compare = subparsers.add_parser(
+        "compare",
+        help="One evaluate.py run per model versus one run with --compare-models.",
+    )
+    compare.add_argument("--rows", type=int, default=1_000_000, help="Validation rows.")
+    compare.add_argument("--seed", type=int, default=42, help="Seed for row resampling.")
+    compare.add_argument(
+        "--models", type=int, default=3, help="Models compared, candidate included."
+    )
+    compare.add_argument("--format", choices=OUTPUT_FORMATS[:3], default="csv")
+
+    calibration = subparsers.add_parser(
+        "calibration",
+        help="Vectorized log loss, Brier, ECE and reliability bins versus a per-row loop.",
+    )
+    calibration.add_argument("--rows", type=int, default=2_000_000, help="Synthetic predictions.")
+    calibration.add_argument("--seed", type=int, default=42, help="Seed for labels and scores.")
+    calibration.add_argument("--bins", type=int, default=10, help="Reliability bins.")
+
+    predictions = subparsers.add_parser(
+        "predictions",
+        help="Bulk first-column loader versus the per-line reader of evaluate_titanic_predictions.",
+    )
+    predictions.add_argument("--rows", type=int, default=5_000_000, help="Lines per file.")
+    predictions.add_argument("--seed", type=int, default=42, help="Seed for labels and scores.")
+
+    train = subparsers.add_parser(
+        "train",
+        help="train.py channel load (parse versus binary DMatrix cache) and hist versus approx.",
+    )
+    train.add_argument("--rows", type=int, default=1_000_000, help="Training rows.")
+    train.add_argument("--seed", type=int, default=42, help="Seed for row resampling.")
+    train.add_argument("--format", choices=OUTPUT_FORMATS[:3], default="csv")
+    train.add_argument("--num-round", type=int, default=20, help="Boosting rounds per run.")
+    train.add_argument(
+        "--nthread", type=int, nargs="+", default=[1], help="Thread counts to time."
+    )
+
+    external = subparsers.add_parser(
+        "external",
+        help="train.py peak RSS and wall time: in-memory versus QuantileDMatrix/external memory.",
+    )
+    external.add_argument("--rows", type=int, default=8_000_000, help="Training rows.")
+    external.add_argument("--shards", type=int, default=8, help="Part files in the channel.")
+    external.add_argument("--format", choices=OUTPUT_FORMATS[:3], default="csv")
+    external.add_argument("--num-round", type=int, default=10, help="Boosting rounds per run.")
+    external.add_argument("--nthread", type=int, default=1, help="Training threads.")
+    external.add_argument(
+        "--memory-limit-mib",
+        type=int,
+        default=0,
+        help="Address-space limit for each train.py run, to emulate a smaller instance (0: none).",
+    )
+
+    search = subparsers.add_parser(
+        "search",
+        help="Successive halving versus training every candidate to num_round, per worker count.",
+    )
+    search.add_argument("--rows", type=int, default=500_000, help="Rows, split 80/20.")
+    search.add_argument("--seed", type=int, default=42, help="Seed for rows and candidates.")
+    search.add_argument("--candidates", type=int, default=27, help="Sampled configurations.")
+    search.add_argument("--num-round", type=int, default=200, help="Rounds of the last rung.")
+    search.add_argument("--min-rounds", type=int, default=25, help="Rounds of the first rung.")
+    search.add_argument("--factor", type=int, default=3, help="Reduction factor per rung.")
+    search.add_argument("--nthread", type=int, default=1, help="Threads shared by the workers.")
+    search.add_argument(
+        "--workers", type=int, nargs="+", default=[1], help="Worker counts to time."
+    )
+
+    cv = subparsers.add_parser(
+        "cv",
+        help="k-fold CV on one shared QuantileDMatrix versus a copied matrix per fold.",
+    )
+    cv.add_argument("--rows", type=int, default=2_000_000, help="Training rows.")
+    cv.add_argument("--seed", type=int, default=42, help="Seed for rows and fold assignment.")
+    cv.add_argument("--folds", type=int, default=5, help="Folds.")
+    cv.add_argument("--num-round", type=int, default=20, help="Rounds per fold.")
+    cv.add_argument("--nthread", type=int, default=1, help="Threads shared by the workers.")
+    cv.add_argument(
+        "--workers", type=int, nargs="+", default=[1], help="Worker counts to time (shared)."
+    )
+    return parser.parse_args()
+
+
+def write_synthetic_csv(path: Path, rows: int, seed: int) -> None:
+    """Resample raw Titanic rows (with fresh PassengerIds) into a CSV of the requested size."""
+    with RAW_DATASET.open("r", newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        fieldnames = reader.fieldnames or []
+        source = list(reader)
+
+    rng = random.Random(seed)
+    with path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, lineterminator="\n")
+        writer.writeheader()
+        for passenger_id in range(1, rows + 1):
+            row = dict(rng.choice(source))
+            row["PassengerId"] = str(passenger_id)
+            writer.writerow(row)
+
+
+def reference_encode(path: Path) -> tuple[str, dict[str, float]]:
+    """Per-row encoder as it existed before pipeline/code/features.py (kept as the oracle)."""
+
+    def parse_float(value: str | None) -> float | None:
+        if value is None:
+            return None
+        stripped = value.strip()
+        return float(stripped) if stripped else None
+
+    def to_int(value: str | None, default: int = 0) -> int:
+        if value is None:
+            return default
+        stripped = value.strip()
+        return int(float(stripped)) if stripped else default
+
+    def median(values: list[float]) -> float:
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        mid = len(ordered) // 2
+        if len(ordered) % 2 == 0:
+            return (ordered[mid - 1] + ordered[mid]) / 2.0
+        return ordered[mid]
+
+    start = time.perf_counter()
+    with path.open("r", newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    read_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    age_fill = median([v for v in (parse_float(r.get("Age")) for r in rows) if v is not None])
+    fare_fill = median([v for v in (parse_float(r.get("Fare")) for r in rows) if v is not None])
+
+    sex_map = {"male": 0.0, "female": 1.0}
+    embarked_map = {"C": 0.0, "Q": 1.0, "S": 2.0}
+    encoded = []
+    for row in rows:
+        age = parse_float(row.get("Age"))
+        fare = parse_float(row.get("Fare"))
+        encoded.append(
+            [
+                to_int(row["Survived"], default=0),
+                float(to_int(row.get("Pclass"), default=3)),
+                sex_map.get((row.get("Sex") or "").strip().lower(), -1.0),
+                age_fill if age is None else age,
+                float(to_int(row.get("SibSp"), default=0)),
+                float(to_int(row.get("Parch"), default=0)),
+                fare_fill if fare is None else fare,
+                embarked_map.get((row.get("Embarked") or "").strip().upper(), -1.0),
+            ]
+        )
+    encode_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    out = io.StringIO()
+    csv.writer(out, lineterminator="\n").writerows(encoded)
+    write_seconds = time.perf_counter() - start
+    return out.getvalue(), {"read": read_seconds, "encode": encode_seconds, "write": write_seconds}
+
+
+def columnar_encode(path: Path) -> tuple[str, dict[str, float]]:
+    start = time.perf_counter()
+    columns = read_columns(path)
+    read_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    age_fill, fare_fill = fill_values(columns)
+    labels = labels_from_columns(columns)
+    features = encode_columns(columns, age_fill, fare_fill)
+    encode_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    out = io.StringIO()
+    write_csv_rows(out, labels, features)
+    write_seconds = time.perf_counter() - start
+    return out.getvalue(), {"read": read_seconds, "encode": encode_seconds, "write": write_seconds}
+
+
+def benchmark_encode(args: argparse.Namespace) -> dict[str, object]:
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        input_path = Path(tmp_dir) / "train.csv"
+        write_synthetic_csv(input_path, args.rows, args.seed)
+        _, reference_seconds = reference_encode(input_path)
+        _, columnar_seconds = columnar_encode(input_path)
+
+    reference_total = sum(reference_seconds.values())
+    columnar_total = sum(columnar_seconds.values())
+    return {
+        "rows": args.rows,
+        "reference_seconds": {k: round(v, 3) for k, v in reference_seconds.items()},
+        "columnar_seconds": {k: round(v, 3) for k, v in columnar_seconds.items()},
+        "encode_speedup": round(reference_seconds["encode"] / columnar_seconds["encode"], 2),
+        "end_to_end_speedup": round(reference_total / columnar_total, 2),
+    }
+
+
+def benchmark_formats(args: argparse.Namespace) -> dict[str, object]:
+    from evaluate import read_validation
+
+    summary: dict[str, object] = {"rows": args.rows, "formats": {}}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        input_path = Path(tmp_dir) / "train.csv"
+        write_synthetic_csv(input_path, args.rows, args.seed)
+        columns = read_columns(input_path)
+        labels = labels_from_columns(columns)
+        features = encode_columns(columns, *fill_values(columns))
+
+        for fmt in OUTPUT_FORMATS:
+            path = Path(tmp_dir) / channel_file_name("train_xgb", fmt)
+            start = time.perf_counter()
+            write_matrix(path, labels, features, fmt)
+            write_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            read_validation(path, fmt)
+            read_seconds = time.perf_counter() - start
+            summary["formats"][fmt] = {
+                "bytes": path.stat().st_size,
+                "write_seconds": round(write_seconds, 3),
+                "read_seconds": round(read_seconds, 3),
+            }
+    return summary
+
+
+def benchmark_shards(args: argparse.Namespace) -> dict[str, object]:
+    cpus = default_workers()
+    worker_counts = args.workers or sorted({min(2**i, cpus) for i in range(cpus.bit_length() + 1)})
+    shards = args.shards or 2 * cpus
+    summary: dict[str, object] = {"rows": args.rows, "cpus": cpus, "shards": shards, "runs": {}}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        input_path = Path(tmp_dir) / "train.csv"
+        write_synthetic_csv(input_path, args.rows, args.seed)
+
+        start = time.perf_counter()
+        columns = read_columns(input_path)
+        features = encode_columns(columns, *fill_values(columns))
+        write_matrix(Path(tmp_dir) / "single.csv", labels_from_columns(columns), features, "csv")
+        single_seconds = time.perf_counter() - start
+        del columns, features
+        summary["single_file_seconds"] = round(single_seconds, 3)
+
+        for workers in worker_counts:
+            output_dir = Path(tmp_dir) / f"parts-{workers}"
+            start = time.perf_counter()
+            preprocessor = fit_preprocessor(*sharded_fill_values(input_path, shards, workers))
+            rows = encode_sharded(
+                input_path, output_dir, "train_xgb", "csv", preprocessor, shards, workers
+            )
+            seconds = time.perf_counter() - start
+            parts = channel_files(output_dir, "csv")
+            summary["runs"][str(workers)] = {
+                "seconds": round(seconds, 3),
+                "speedup_vs_single_file": round(single_seconds / seconds, 2),
+                "parts": len(parts),
+                "rows": rows,
+            }
+    return summary
+
+
+def benchmark_s3(args: argparse.Namespace) -> dict[str, object]:
+    import os
+
+    import boto3
+    from moto import mock_aws
+
+    from features import read_stream_columns
+    from s3io import make_s3_client, open_s3_stream
+
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    bucket = "benchmark-pipeline-code"
+    summary: dict[str, object] = {
+        "latency_ms": args.latency_ms,
+        "connection_mib_s": args.connection_mib_s,
+        "sizes": {},
+    }
+
+    def add_latency(**kwargs) -> None:
+        time.sleep(args.latency_ms / 1000.0)
+
+    def add_transfer_time(parsed: dict, **kwargs) -> None:
+        time.sleep(parsed.get("ContentLength", 0) / (args.connection_mib_s * 1024 * 1024))
+
+    with mock_aws(), tempfile.TemporaryDirectory() as tmp_dir:
+        boto3.client("s3").create_bucket(Bucket=bucket)
+        if args.connection_mib_s:
+            # Every client below comes from the default session, so all of them see the same link.
+            events = boto3.DEFAULT_SESSION.events
+            events.register("before-send.s3.GetObject", add_latency)
+            events.register("before-send.s3.HeadObject", add_latency)
+            events.register("after-call.s3.GetObject", add_transfer_time)
+        sample = Path(tmp_dir) / "sample.csv"
+        write_synthetic_csv(sample, 10_000, args.seed)
+        bytes_per_row = sample.stat().st_size / 10_000
+
+        for size_mb in args.sizes_mb:
+            rows = int(size_mb * 1024 * 1024 / bytes_per_row)
+            local = Path(tmp_dir) / "input.csv"
+            write_synthetic_csv(local, rows, args.seed)
+            uris = []
+            for name in ("train", "validation"):
+                boto3.client("s3").upload_file(str(local), bucket, f"curated/{name}.csv")
+                uris.append(f"s3://{bucket}/curated/{name}.csv")
+
+            # Previous behaviour: one new client and one full download per object, then parse.
+            start = time.perf_counter()
+            sequential = []
+            for uri in uris:
+                target = Path(tmp_dir) / "download.csv"
+                key = uri.split("/", 3)[3]
+                boto3.client("s3").download_file(bucket, key, str(target))
+                sequential.append(read_columns(target))
+            sequential_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            client = make_s3_client()
+
+            def read(uri: str) -> dict:
+                with open_s3_stream(client, uri) as stream:
+                    return read_stream_columns(stream, source=uri)
+
+            with ThreadPoolExecutor(max_workers=len(uris)) as pool:
+                list(pool.map(read, uris))
+            streamed_seconds = time.perf_counter() - start
+
+            summary["sizes"][f"{size_mb}MiB"] = {
+                "bytes_per_object": local.stat().st_size,
+                "sequential_download_then_parse_seconds": round(sequential_seconds, 3),
+                "concurrent_ranged_stream_seconds": round(streamed_seconds, 3),
+                "speedup": round(sequential_seconds / streamed_seconds, 2),
+            }
+    return summary
+
+
+def benchmark_quantiles(args: argparse.Namespace) -> dict[str, object]:
+    # Fare-like skewed values with many ties, so ranks and interpolation are both exercised.
+    rng = np.random.default_rng(args.seed)
+    values = np.round(rng.lognormal(mean=2.7, sigma=1.0, size=args.rows), 2)
+
+    start = time.perf_counter()
+    ordered = np.sort(values)
+    sort_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    exact_quantile(values, 0.5)
+    median_seconds = time.perf_counter() - start
+    exact = {q: exact_quantile(values, q) for q in args.quantiles}
+
+    def rank_error(value: float, q: float) -> float:
+        # Distance from q to the nearest normalized rank held by `value` (ties span a range).
+        low = np.searchsorted(ordered, value, side="left") / (values.size - 1)
+        high = (np.searchsorted(ordered, value, side="right") - 1) / (values.size - 1)
+        return 0.0 if low <= q <= high else float(min(abs(q - low), abs(q - high)))
+
+    def sketch(chunk: np.ndarray, k: int, seed: int) -> KllSketch:
+        result = KllSketch(k=k, seed=seed)
+        for offset in range(0, chunk.size, args.batch_rows):
+            result.update(chunk[offset : offset + args.batch_rows])
+        return result
+
+    summary: dict[str, object] = {
+        "rows": args.rows,
+        "full_sort_seconds": round(sort_seconds, 3),
+        "median_selection_seconds": round(median_seconds, 3),
+        "sketches": {},
+    }
+    for k in args.sketch_k:
+        start = time.perf_counter()
+        single = sketch(values, k, args.seed)
+        sketch_seconds = time.perf_counter() - start
+        # One seed per shard, as sharding.py does, so compaction offsets are independent.
+        merged = KllSketch(k=k, seed=args.seed + args.shards)
+        for index, shard in enumerate(np.array_split(values, args.shards)):
+            merged.merge(sketch(shard, k, args.seed + index))
+        summary["sketches"][str(k)] = {
+            "seconds": round(sketch_seconds, 3),
+            "items_retained": single.items(),
+            "retained_bytes": single.items() * values.itemsize,
+            "expected_rank_error": round(single.rank_error, 5),
+            "max_rank_error": round(max(rank_error(single.quantile(q), q) for q in exact), 5),
+            "merged_shards": args.shards,
+            "merged_max_rank_error": round(
+                max(rank_error(merged.quantile(q), q) for q in exact), 5
+            ),
+        }
+    return summary
+
+
+def reference_metrics(labels: list[int], scores: list[float], threshold: float) -> dict:
+    """The per-row loop evaluate.py and evaluate_titanic_predictions.py used before metrics.py."""
+    tp = tn = fp = fn = 0
+    for score, label in zip(scores, labels):
+        pred = 1 if float(score) >= threshold else 0
+        if pred == 1 and label == 1:
+            tp += 1
+        elif pred == 0 and label == 0:
+            tn += 1
+        elif pred == 1 and label == 0:
+            fp += 1
+        else:
+            fn += 1
+    total = len(labels)
+    precision = safe_div(tp, tp + fp)
+    recall = safe_div(tp, tp + fn)
+    return {
+        "metrics": {
+            "accuracy": safe_div(tp + tn, total),
+            "precision": precision,
+            "recall": recall,
+            "f1": safe_div(2 * precision * recall, precision + recall),
+        },
+        "confusion_matrix": {"tp": tp, "tn": tn, "fp": fp, "fn": fn},
+    }
+
+
+def benchmark_metrics(args: argparse.Namespace) -> dict[str, object]:
+    rng = np.random.default_rng(args.seed)
+    labels = rng.integers(0, 2, size=args.rows)
+    # float32 scores like Booster.predict, loosely correlated with the label.
+    scores = np.clip(rng.normal(0.35 + 0.3 * labels, 0.25), 0.0, 1.0).astype(np.float32)
+
+    start = time.perf_counter()
+    reference_metrics(labels.tolist(), scores.tolist(), args.threshold)
+    reference_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    confusion = confusion_matrix(labels, scores, args.threshold)
+    payload = {"metrics": classification_metrics(confusion), "confusion_matrix": confusion}
+    vectorized_seconds = time.perf_counter() - start
+
+    # Every threshold separately is O(n * k); the sorted cumulative-sum sweep is O(n log n).
+    thresholds = np.linspace(0.0, 1.0, args.sweep_thresholds, dtype=np.float32)
+    start = time.perf_counter()
+    for threshold in thresholds:
+        confusion_matrix(labels, scores, threshold)
+    loop_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ranking = ranking_metrics(labels, scores)
+    sweep_seconds = time.perf_counter() - start
+
+    return {
+        "rows": args.rows,
+        "reference_seconds": round(reference_seconds, 3),
+        "vectorized_seconds": round(vectorized_seconds, 4),
+        "speedup": round(reference_seconds / vectorized_seconds, 1),
+        "metrics": payload["metrics"],
+        "sweep": {
+            "per_threshold_loop_seconds": round(loop_seconds, 3),
+            "loop_thresholds": args.sweep_thresholds,
+            "sorted_sweep_seconds": round(sweep_seconds, 3),
+            "distinct_thresholds": int(np.unique(scores).size),
+            "roc_auc": ranking["roc_auc"],
+            "pr_auc": ranking["pr_auc"],
+            "best_threshold": ranking["best_threshold"],
+        },
+    }
+
+
+def reference_bootstrap_metrics(labels: np.ndarray, scores: np.ndarray) -> dict[str, float]:
+    values = classification_metrics(confusion_matrix(labels, scores, 0.5))
+    sweep = threshold_sweep(labels, scores)
+    values["roc_auc"] = roc_auc(sweep)
+    values["pr_auc"] = pr_auc(sweep)
+    return values
+
+
+def benchmark_bootstrap(args: argparse.Namespace) -> dict[str, object]:
+    rng = np.random.default_rng(args.seed)
+    labels = rng.integers(0, 2, size=args.rows)
+    scores = np.clip(rng.normal(0.35 + 0.3 * labels, 0.25), 0.0, 1.0).astype(np.float32)
+
+    start = time.perf_counter()
+    loop_values = {name: [] for name in BOOTSTRAP_METRICS}
+    for _ in range(args.replicates):
+        rows = rng.integers(0, args.rows, size=args.rows)
+        for name, value in reference_bootstrap_metrics(labels[rows], scores[rows]).items():
+            loop_values[name].append(value)
+    loop_seconds = time.perf_counter() - start
+    loop_intervals = {
+        name: np.quantile(values, [0.025, 0.975]).tolist() for name, values in loop_values.items()
+    }
+
+    summary: dict[str, object] = {
+        "rows": args.rows,
+        "replicates": args.replicates,
+        "loop_seconds": round(loop_seconds, 2),
+        "runs": {},
+    }
+    for method in BOOTSTRAP_METHODS:
+        for workers in args.workers:
+            start = time.perf_counter()
+            result = bootstrap_intervals(
+                labels,
+                scores,
+                replicates=args.replicates,
+                method=method,
+                seed=args.seed,
+                workers=workers,
+                batch_cells=args.batch_cells,
+            )
+            intervals = result["intervals"]
+            summary["runs"][f"{method},workers={workers}"] = {
+                "seconds": round(time.perf_counter() - start, 3),
+                # Different random draws: bounds agree to Monte Carlo error, not exactly.
+                "max_bound_diff_vs_loop": round(
+                    max(
+                        abs(intervals[name][bound] - loop_intervals[name][index])
+                        for name in BOOTSTRAP_METRICS
+                        for index, bound in enumerate(("lower", "upper"))
+                    ),
+                    4,
+                ),
+                "accuracy": intervals["accuracy"],
+                "roc_auc": intervals["roc_auc"],
+            }
+    return summary
+
+
+def benchmark_slices(args: argparse.Namespace) -> dict[str, object]:
+    rng = np.random.default_rng(args.seed)
+    labels = rng.integers(0, 2, size=args.rows)
+    scores = np.clip(rng.normal(0.35 + 0.3 * labels, 0.25), 0.0, 1.0).astype(np.float32)
+    # Encoded Pclass, Sex and Embarked codes, as evaluate.py sees them in the feature matrix.
+    columns = np.column_stack(
+        [
+            rng.integers(1, 4, size=args.rows),
+            rng.integers(0, 2, size=args.rows),
+            rng.integers(-1, 3, size=args.rows),
+        ]
+    ).astype(np.float32)
+    slices = {"Pclass": [0], "Sex": [1], "Embarked": [2], "Pclass*Sex": [0, 1]}
+
+    start = time.perf_counter()
+    for name, indices in slices.items():
+        values = columns[:, indices]
+        for key in itertools.product(*(np.unique(column) for column in values.T)):
+            mask = np.all(values == np.array(key), axis=1)
+            if mask.any():
+                confusion_matrix(labels[mask], scores[mask])
+    loop_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sliced = sliced_confusion(labels, scores, columns, slices)
+    bincount_seconds = time.perf_counter() - start
+
+    return {
+        "rows": args.rows,
+        "groups": sum(len(value) for value in sliced.values()),
+        "per_group_mask_seconds": round(loop_seconds, 3),
+        "bincount_seconds": round(bincount_seconds, 3),
+        "speedup": round(loop_seconds / bincount_seconds, 1),
+    }
+
+
+def reference_calibration(labels: list[int], scores: list[float], bins: int) -> dict:
+    eps = 1e-15
+    log_loss = brier = 0.0
+    counts = [0] * bins
+    score_sums = [0.0] * bins
+    positives = [0] * bins
+    for label, score in zip(labels, scores):
+        clipped = min(max(score, eps), 1.0 - eps)
+        log_loss -= math.log(clipped) if label == 1 else math.log1p(-clipped)
+        brier += (score - (label == 1)) ** 2
+        index = min(max(int(score * bins), 0), bins - 1)
+        counts[index] += 1
+        score_sums[index] += score
+        positives[index] += label == 1
+    rows = len(scores)
+    ece = sum(
+        count / rows * abs(positive / count - total / count)
+        for count, total, positive in zip(counts, score_sums, positives)
+        if count
+    )
+    return {"log_loss": log_loss / rows, "brier": brier / rows, "ece": ece, "counts": counts}
+
+
+def benchmark_calibration(args: argparse.Namespace) -> dict[str, object]:
+    rng = np.random.default_rng(args.seed)
+    labels = rng.integers(0, 2, size=args.rows)
+    scores = np.clip(rng.normal(0.35 + 0.3 * labels, 0.25), 0.0, 1.0).astype(np.float32)
+
+    start = time.perf_counter()
+    reference_calibration(labels.tolist(), scores.astype(np.float64).tolist(), args.bins)
+    reference_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    calibration = calibration_metrics(labels, scores, args.bins)
+    vectorized_seconds = time.perf_counter() - start
+
+    return {
+        "rows": args.rows,
+        "reference_seconds": round(reference_seconds, 3),
+        "vectorized_seconds": round(vectorized_seconds, 4),
+        "speedup": round(reference_seconds / vectorized_seconds, 1),
+        "calibration": {key: value for key, value in calibration.items() if key != "bins"},
+    }
+
+
+def reference_first_column(path: Path) -> list[float]:
+    """The per-line reader evaluate_titanic_predictions.py used before formats.read_first_column."""
+    values: list[float] = []
+    with path.open("r", encoding="utf-8") as f:
+        for raw_line in f:
+            line = raw_line.strip()
+            if not line:
+                continue
+            values.append(float(line.split(",")[0].strip()))
+    return values
+
+
+def benchmark_predictions(args: argparse.Namespace) -> dict[str, object]:
+    rng = np.random.default_rng(args.seed)
+    labels = rng.integers(0, 2, size=args.rows)
+    scores = np.clip(rng.normal(0.35 + 0.3 * labels, 0.25), 0.0, 1.0).astype(np.float32)
+
+    summary: dict[str, object] = {"rows": args.rows}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        predictions_path = Path(tmp_dir) / "predictions.csv"
+        labels_path = Path(tmp_dir) / "labels.csv"
+        predictions_path.write_text("\n".join(map(str, scores.tolist())) + "\n", encoding="utf-8")
+        labels_path.write_text("\n".join(map(str, labels.tolist())) + "\n", encoding="utf-8")
+        summary["megabytes"] = round(
+            (predictions_path.stat().st_size + labels_path.stat().st_size) / 2**20, 1
+        )
+
+        start = time.perf_counter()
+        np.asarray(reference_first_column(predictions_path))
+        np.asarray(reference_first_column(labels_path)).astype(np.int64)
+        reference_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        read_first_column(predictions_path)
+        read_first_column(labels_path).astype(np.int64)
+        bulk_seconds = time.perf_counter() - start
+
+    summary.update(
+        {
+            "reference_seconds": round(reference_seconds, 3),
+            "bulk_seconds": round(bulk_seconds, 3),
+            "speedup": round(reference_seconds / bulk_seconds, 1),
+        }
+    )
+    return summary
+
+
+def benchmark_train(args: argparse.Namespace) -> dict[str, object]:
+    import xgboost as xgb
+
+    from train import load_channel
+
+    summary: dict[str, object] = {"rows": args.rows, "format": args.format, "load": {}}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp = Path(tmp_dir)
+        input_path = tmp / "train.csv"
+        write_synthetic_csv(input_path, args.rows, args.seed)
+        columns = read_columns(input_path)
+        labels = labels_from_columns(columns)
+        features = encode_columns(columns, *fill_values(columns))
+        del columns
+        train_path = tmp / channel_file_name("train_xgb", args.format)
+        write_matrix(train_path, labels, features, args.format)
+        del labels, features
+        cache_dir = tmp / "dmatrix_cache"
+
+        timings = {}
+        for label, cache in (("parse", None), ("cache_miss", cache_dir), ("cache_hit", cache_dir)):
+            start = time.perf_counter()
+            matrix, state = load_channel(train_path, args.format, args.nthread[0], cache)
+            timings[label] = (time.perf_counter() - start, state, matrix)
+        summary["load"] = {
+            label: {"seconds": round(seconds, 3), "cache": state}
+            for label, (seconds, state, _) in timings.items()
+        }
+        parsed = timings["parse"][2]
+        summary["load"]["buffer_megabytes"] = round(
+            sum(p.stat().st_size for p in cache_dir.iterdir()) / 2**20, 1
+        )
+
+        runs = {}
+        for nthread in args.nthread:
+            for tree_method in ("approx", "hist"):
+                params = {
+                    "objective": "binary:logistic",
+                    "max_depth": 5,
+                    "eta": 0.2,
+                    "tree_method": tree_method,
+                    "nthread": nthread,
+                    "seed": 0,
+                }
+                start = time.perf_counter()
+                booster = xgb.train(params, parsed, num_boost_round=args.num_round)
+                runs[f"{tree_method},nthread={nthread}"] = {
+                    "train_seconds": round(time.perf_counter() - start, 3),
+                    "train_logloss": float(booster.eval(parsed).split(":")[1]),
+                }
+        summary["train"] = runs
+    return summary
+
+
+def synthetic_encoded_rows(rows: int, seed: int) -> tuple[np.ndarray, np.ndarray]:
+    """Labels and encoded Titanic-like features, without going through the raw CSV."""
+    rng = np.random.default_rng(seed)
+    features = np.column_stack(
+        [
+            rng.integers(1, 4, rows),
+            rng.integers(0, 2, rows),
+            rng.normal(30.0, 14.0, rows).round(1),
+            rng.integers(0, 5, rows),
+            rng.integers(0, 4, rows),
+            rng.gamma(2.0, 16.0, rows).round(2),
+            rng.integers(0, 3, rows),
+        ]
+    ).astype(np.float64)
+    logit = 1.2 * features[:, 1] - 0.8 * (features[:, 0] - 2) - 0.02 * (features[:, 2] - 30)
+    labels = (rng.random(rows) < 1 / (1 + np.exp(0.5 - logit))).astype(np.int64)
+    return labels, features
+
+
+def write_synthetic_channel(directory: Path, rows: int, shards: int, fmt: str) -> None:
+    """Encoded rows written shard by shard, so the writer never holds them all."""
+    for index in range(shards):
+        count = rows // shards + (index < rows % shards)
+        labels, features = synthetic_encoded_rows(count, index)
+        write_matrix(directory / part_file_name("train_xgb", index, fmt), labels, features, fmt)
+
+
+def benchmark_search(args: argparse.Namespace) -> dict[str, object]:
+    import xgboost as xgb
+
+    from search import rung_rounds, sample_candidates, successive_halving
+
+    labels, features = synthetic_encoded_rows(args.rows, args.seed)
+    split = int(args.rows * 0.8)
+    dtrain = xgb.QuantileDMatrix(features[:split], label=labels[:split])
+    dvalidation = xgb.QuantileDMatrix(features[split:], label=labels[split:], ref=dtrain)
+    del labels, features
+    candidates = sample_candidates(args.candidates, args.seed)
+    base_params = {"objective": "binary:logistic", "tree_method": "hist", "seed": 0}
+
+    summary: dict[str, object] = {
+        "rows": args.rows,
+        "candidates": args.candidates,
+        "num_round": args.num_round,
+        "runs": {},
+    }
+    plans = {
+        # One rung of num_round rounds trains every candidate to the end.
+        "full": [args.num_round],
+        "halving": rung_rounds(args.min_rounds, args.num_round, args.factor),
+    }
+    ranking: dict[str, list[int]] = {}
+    for workers in args.workers:
+        params = {**base_params, "nthread": max(1, args.nthread // workers)}
+        for plan, rungs in plans.items():
+            start = time.perf_counter()
+            best, _, leaderboard = successive_halving(
+                params, candidates, dtrain, dvalidation, rungs, args.factor, workers
+            )
+            summary["runs"][f"{plan},workers={workers}"] = {
+                "seconds": round(time.perf_counter() - start, 2),
+                "rungs": rungs,
+                "rounds_trained": sum(entry["rounds"] for entry in leaderboard),
+                "best_candidate": best,
+                "best_validation_logloss": round(leaderboard[0]["validation_logloss"], 5),
+            }
+            ranking[plan] = [entry["candidate"] for entry in leaderboard]
+    # Where the halving winner ranks once every candidate has trained all num_round rounds.
+    summary["halving_best_rank_in_full"] = ranking["full"].index(ranking["halving"][0]) + 1
+    return summary
+
+
+def _status_mib(field: str) -> int:
+    """A /proc/self/status memory field in MiB: VmRSS now, VmHWM the peak."""
+    with open("/proc/self/status", encoding="utf-8") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith(field)) // 1024
+
+
+def _in_forked_child(function, *arguments) -> tuple[float, int, object]:
+    """Run function(*arguments) in a forked child; returns (seconds, peak RSS in MiB, result).
+
+    Every run starts from the parent's memory, and its peak is not hidden by an earlier run's.
+    """
+    import multiprocessing
+
+    context = multiprocessing.get_context("fork")
+    queue = context.Queue()
+
+    def run() -> None:
+        start = time.perf_counter()
+        result = function(*arguments)
+        queue.put((time.perf_counter() - start, _status_mib("VmHWM"), result))
+
+    process = context.Process(target=run)
+    process.start()
+    outcome = queue.get()
+    process.join()
+    return outcome
+
+
+def benchmark_cv(args: argparse.Namespace) -> dict[str, object]:
+    import xgboost as xgb
+
+    from crossval import cross_validate, fold_metrics
+    from splits import stratified_folds
+
+    labels, features = synthetic_encoded_rows(args.rows, args.seed)
+    features = features.astype(np.float32)
+    start = time.perf_counter()
+    folds = stratified_folds(labels, args.folds, args.seed)
+    assignment_seconds = time.perf_counter() - start
+    base_params = {"objective": "binary:logistic", "tree_method": "hist", "max_depth": 5}
+
+    def shared(workers: int) -> dict[str, object]:
+        matrix = xgb.QuantileDMatrix(features, label=labels, nthread=args.nthread)
+        params = {**base_params, "nthread": max(1, args.nthread // workers)}
+        report = cross_validate(params, matrix, labels, folds, args.num_round, workers)
+        return report["out_of_fold"]
+
+    def sliced() -> dict[str, object]:
+        # What a per-fold split does: copy the rows of both sides and quantize them again.
+        out_of_fold = np.empty(len(labels))
+        params = {**base_params, "nthread": args.nthread}
+        for fold in range(args.folds):
+            held_out = folds == fold
+            dtrain = xgb.QuantileDMatrix(features[~held_out], label=labels[~held_out])
+            dtest = xgb.QuantileDMatrix(features[held_out], ref=dtrain)
+            booster = xgb.train(params, dtrain, num_boost_round=args.num_round)
+            out_of_fold[held_out] = booster.predict(dtest)
+            del dtrain, dtest
+        return fold_metrics(labels, out_of_fold)
+
+    summary: dict[str, object] = {
+        "rows": args.rows,
+        "folds": args.folds,
+        "num_round": args.num_round,
+        "features_mib": round(features.nbytes / 2**20, 1),
+        # stratified_folds is dominated by hash_units' per-row blake2b loop.
+        "fold_assignment_seconds": round(assignment_seconds, 3),
+        "fold_assignment_us_per_row": round(assignment_seconds / args.rows * 1e6, 2),
+        "rss_before_fork_mib": _status_mib("VmRSS"),
+        "runs": {},
+    }
+    runs = {f"shared,workers={workers}": (shared, workers) for workers in args.workers}
+    runs["sliced"] = (sliced,)
+    for name, (function, *arguments) in runs.items():
+        seconds, peak, metrics = _in_forked_child(function, *arguments)
+        summary["runs"][name] = {
+            "seconds": round(seconds, 2),
+            "peak_rss_mib": peak,
+            "out_of_fold_accuracy": round(metrics["accuracy"], 5),
+            "out_of_fold_log_loss": round(metrics["log_loss"], 5),
+        }
+    return summary
+
+
+def benchmark_external(args: argparse.Namespace) -> dict[str, object]:
+    import resource
+    import subprocess
+
+    script = REPO_ROOT / "pipeline" / "code" / "train.py"
+    limit = args.memory_limit_mib * 2**20
+
+    def limit_memory() -> None:
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    summary: dict[str, object] = {
+        "rows": args.rows,
+        "shards": args.shards,
+        "format": args.format,
+        "memory_limit_mib": args.memory_limit_mib,
+        "runs": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp = Path(tmp_dir)
+        channel = tmp / "train"
+        write_synthetic_channel(channel, args.rows, args.shards, args.format)
+        summary["channel_megabytes"] = round(
+            sum(p.stat().st_size for p in channel.iterdir()) / 2**20, 1
+        )
+        for mode in ("memory", "quantile", "external"):
+            output_dir = tmp / mode
+            command = [
+                sys.executable,
+                str(script),
+                "--train",
+                str(channel),
+                "--validation",
+                "",
+                "--format",
+                args.format,
+                "--output-dir",
+                str(output_dir),
+                "--dmatrix-cache-dir",
+                "",
+                "--data-mode",
+                mode,
+                "--num-round",
+                str(args.num_round),
+                "--nthread",
+                str(args.nthread),
+            ]
+            start = time.perf_counter()
+            result = subprocess.run(
+                command,
+                capture_output=True,
+                text=True,
+                preexec_fn=limit_memory if limit else None,
+            )
+            seconds = time.perf_counter() - start
+            if result.returncode:
+                errors = [line for line in result.stderr.splitlines() if "Error" in line]
+                error = errors[-1] if errors else f"exit status {result.returncode}"
+                summary["runs"][mode] = {"seconds": round(seconds, 2), "failed": error}
+                continue
+            training = json.loads((output_dir / "training.json").read_text(encoding="utf-8"))
+            summary["runs"][mode] = {
+                "seconds": round(seconds, 2),
+                "phase_seconds": training["timings"]["seconds"],
+                "peak_rss_mib": training["peak_rss_mib"],
+                "train_logloss": training["eval"]["train-logloss"],
+            }
+    return summary
+
+
+def _run_evaluate(arguments: list[str]) -> tuple[float, int, dict]:
+    """Run evaluate.py in a fresh interpreter; returns (seconds, peak RSS in MiB, payload)."""
+    import subprocess
+
+    script = REPO_ROOT / "pipeline" / "code" / "evaluate.py"
+    # VmHWM belongs to the new address space; ru_maxrss would carry over the forked parent's.
+    wrapper = (
+        "import runpy, sys; "
+        f"sys.argv = {[str(script), *arguments]!r}; sys.path.insert(0, {str(script.parent)!r}); "
+        f"runpy.run_path({str(script)!r}, run_name='__main__'); "
+        "print('MAXRSS', [l.split()[1] for l in open('/proc/self/status') if "
+        "l.startswith('VmHWM')][0])"
+    )
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", wrapper], check=True, capture_output=True, text=True
+    )
+    seconds = time.perf_counter() - start
+    max_rss_kib = int(result.stdout.rsplit("MAXRSS", 1)[1])
+    output = Path(arguments[arguments.index("--output") + 1])
+    return seconds, max_rss_kib // 1024, json.loads(output.read_text(encoding="utf-8"))
+
+
+def benchmark_evaluate(args: argparse.Namespace) -> dict[str, object]:
+    import tarfile
+
+    import xgboost as xgb
+
+    summary: dict[str, object] = {"rows": args.rows, "format": args.format, "runs": {}}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp = Path(tmp_dir)
+        input_path = tmp / "validation.csv"
+        write_synthetic_csv(input_path, args.rows, args.seed)
+        columns = read_columns(input_path)
+        labels = labels_from_columns(columns)
+        features = encode_columns(columns, *fill_values(columns))
+        del columns
+        validation_path = tmp / channel_file_name("validation_xgb", args.format)
+        write_matrix(validation_path, labels, features, args.format)
+        summary["file_mib"] = round(validation_path.stat().st_size / 1024**2, 1)
+
+        params = {"objective": "binary:logistic", "max_depth": 5, "eta": 0.2, "nthread": 1}
+        train_rows = min(args.rows, 100_000)
+        matrix = xgb.DMatrix(features[:train_rows], label=labels[:train_rows])
+        booster = xgb.train(params, matrix, num_boost_round=20)
+        del labels, features, matrix
+        model_path = tmp / "xgboost-model"
+        booster.save_model(str(model_path))
+        with tarfile.open(tmp / "model.tar.gz", "w:gz") as tar:
+            tar.add(model_path, arcname="xgboost-model")
+
+        base = [
+            "--model-artifact",
+            str(tmp / "model.tar.gz"),
+            "--validation",
+            str(validation_path),
+            "--validation-format",
+            args.format,
+        ]
+        seconds, rss, _ = _run_evaluate(base + ["--output", str(tmp / "whole.json")])
+        summary["runs"]["whole_file"] = {"seconds": round(seconds, 2), "peak_rss_mib": rss}
+        for chunk_rows in args.chunk_rows:
+            output = tmp / f"chunked-{chunk_rows}.json"
+            seconds, rss, _ = _run_evaluate(
+                base + ["--output", str(output), "--chunk-rows", str(chunk_rows)]
+            )
+            summary["runs"][f"chunk_rows={chunk_rows}"] = {
+                "seconds": round(seconds, 2),
+                "peak_rss_mib": rss,
+            }
+    return summary
+
+
+def reference_extract(model_artifact: Path, extract_dir: Path) -> Path:
+    """The original extraction: validate with getmembers(), then extractall() everything."""
+    import tarfile
+
+    from evaluate import _is_within_dir
+
+    with tarfile.open(model_artifact, "r:gz") as tar:
+        for member in tar.getmembers():
+            if member.issym() or member.islnk():
+                raise ValueError(f"Refusing to extract link entry from archive: {member.name}")
+            if not _is_within_dir(extract_dir, extract_dir / member.name):
+                raise ValueError(f"Refusing to extract path outside target dir: {member.name}")
+        tar.extractall(extract_dir)
+    return extract_dir / "xgboost-model"
+
+
+def benchmark_extract(args: argparse.Namespace) -> dict[str, object]:
+    import tarfile
+
+    from evaluate import ensure_model_file
+
+    rng = np.random.default_rng(args.seed)
+    extra_bytes = int(args.extra_file_mib * 1024**2)
+    summary: dict[str, object] = {"extra_files": args.extra_files, "runs": {}}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp = Path(tmp_dir)
+        model_bytes = rng.bytes(1024**2)
+        artifact = tmp / "model.tar.gz"
+        with tarfile.open(artifact, "w:gz") as tar:
+            for index in range(args.extra_files):
+                # Half random, half zeros: roughly what checkpoints and code bundles compress to.
+                payload = rng.bytes(extra_bytes // 2) + bytes(extra_bytes - extra_bytes // 2)
+                info = tarfile.TarInfo(f"code/extra-{index:04d}.bin")
+                info.size = len(payload)
+                tar.addfile(info, io.BytesIO(payload))
+            info = tarfile.TarInfo("xgboost-model")
+            info.size = len(model_bytes)
+            tar.addfile(info, io.BytesIO(model_bytes))
+        summary["artifact_mib"] = round(artifact.stat().st_size / 1024**2, 1)
+
+        start = time.perf_counter()
+        reference_extract(artifact, tmp / "reference")
+        summary["runs"]["getmembers_extractall"] = {
+            "seconds": round(time.perf_counter() - start, 3)
+        }
+
+        cache_dir = tmp / "cache"
+        for run in ("single_pass_cold", "cache_hit"):
+            start = time.perf_counter()
+            model_file = ensure_model_file(artifact, cache_dir)
+            summary["runs"][run] = {"seconds": round(time.perf_counter() - start, 3)}
+        summary["cache_entry_files"] = sorted(p.name for p in model_file.parent.iterdir())
+    return summary
+
+
+def benchmark_predict(args: argparse.Namespace) -> dict[str, object]:
+    import xgboost as xgb
+
+    from evaluate import predict_scores
+
+    summary: dict[str, object] = {"rows": args.rows, "format": args.format, "runs": {}}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp = Path(tmp_dir)
+        input_path = tmp / "validation.csv"
+        write_synthetic_csv(input_path, args.rows, args.seed)
+        columns = read_columns(input_path)
+        labels = labels_from_columns(columns)
+        features = encode_columns(columns, *fill_values(columns))
+        del columns
+        validation_path = tmp / channel_file_name("validation_xgb", args.format)
+        write_matrix(validation_path, labels, features, args.format)
+
+        params = {"objective": "binary:logistic", "max_depth": 5, "eta": 0.2, "nthread": 1}
+        train_rows = min(args.rows, 100_000)
+        matrix = xgb.DMatrix(features[:train_rows], label=labels[:train_rows])
+        booster = xgb.train(params, matrix, num_boost_round=50)
+        del labels, features, matrix
+
+        for nthread in args.nthread:
+            booster.set_param({"nthread": nthread})
+            start = time.perf_counter()
+            _, features64 = read_matrix(validation_path, args.format)
+            load = time.perf_counter() - start
+            start = time.perf_counter()
+            booster.predict(xgb.DMatrix(features64, nthread=nthread))
+            summary["runs"][f"dmatrix_float64,nthread={nthread}"] = {
+                "load_seconds": round(load, 3),
+                "predict_seconds": round(time.perf_counter() - start, 3),
+            }
+            del features64
+
+            start = time.perf_counter()
+            _, features32 = read_matrix(validation_path, args.format, dtype=np.float32)
+            load = time.perf_counter() - start
+            for batch_rows in args.batch_rows:
+                start = time.perf_counter()
+                predict_scores(booster, features32, batch_rows)
+                summary["runs"][f"inplace_float32,nthread={nthread},batch={batch_rows}"] = {
+                    "load_seconds": round(load, 3),
+                    "predict_seconds": round(time.perf_counter() - start, 3),
+                }
+            del features32
+    return summary
+
+
+def benchmark_compare(args: argparse.Namespace) -> dict[str, object]:
+    import tarfile
+
+    import xgboost as xgb
+
+    summary: dict[str, object] = {"rows": args.rows, "models": args.models, "format": args.format}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp = Path(tmp_dir)
+        input_path = tmp / "validation.csv"
+        write_synthetic_csv(input_path, args.rows, args.seed)
+        columns = read_columns(input_path)
+        labels = labels_from_columns(columns)
+        features = encode_columns(columns, *fill_values(columns))
+        del columns
+        validation_path = tmp / channel_file_name("validation_xgb", args.format)
+        write_matrix(validation_path, labels, features, args.format)
+
+        train_rows = min(args.rows, 100_000)
+        matrix = xgb.DMatrix(features[:train_rows], label=labels[:train_rows])
+        artifacts = []
+        for index in range(args.models):
+            params = {
+                "objective": "binary:logistic",
+                "max_depth": 3 + index,
+                "eta": 0.2,
+                "nthread": 1,
+                "seed": index,
+            }
+            booster = xgb.train(params, matrix, num_boost_round=50)
+            model_path = tmp / f"model-{index}" / "xgboost-model"
+            model_path.parent.mkdir()
+            booster.save_model(str(model_path))
+            artifact = tmp / f"model-{index}.tar.gz"
+            with tarfile.open(artifact, "w:gz") as tar:
+                tar.add(model_path, arcname="xgboost-model")
+            artifacts.append(artifact)
+        del labels, features, matrix
+
+        base = ["--validation", str(validation_path), "--validation-format", args.format]
+        separate_seconds = 0.0
+        separate_rss = 0
+        for index, artifact in enumerate(artifacts):
+            seconds, rss, _ = _run_evaluate(
+                base
+                + ["--model-artifact", str(artifact), "--output", str(tmp / f"alone-{index}.json")]
+                + ["--model-cache-dir", str(tmp / f"cache-alone-{index}")]
+            )
+            separate_seconds += seconds
+            separate_rss = max(separate_rss, rss)
+
+        names = ["candidate"] + [f"model_{index}" for index in range(1, args.models)]
+        compare_arguments = ["--compare-models"] + [
+            f"{name}={artifact}" for name, artifact in zip(names[1:], artifacts[1:])
+        ]
+        seconds, rss, payload = _run_evaluate(
+            base
+            + ["--model-artifact", str(artifacts[0]), "--output", str(tmp / "together.json")]
+            + ["--model-cache-dir", str(tmp / "cache-together")]
+            + compare_arguments
+        )
+        summary["separate_runs"] = {
+            "seconds": round(separate_seconds, 2),
+            "peak_rss_mib": separate_rss,
+        }
+        summary["one_run"] = {
+            "seconds": round(seconds, 2),
+            "peak_rss_mib": rss,
+            "phases": payload["timings"]["seconds"],
+        }
+        summary["deltas"] = payload["comparison"]["deltas"]
+    return summary
+
+
+def main() -> None:
+    args = parse_args()
+    handlers = {
+        "encode": benchmark_encode,
+        "formats": benchmark_formats,
+        "shards": benchmark_shards,
+        "s3": benchmark_s3,
+        "quantiles": benchmark_quantiles,
+        "metrics": benchmark_metrics,
+        "evaluate": benchmark_evaluate,
+        "extract": benchmark_extract,
+        "predict": benchmark_predict,
+        "bootstrap": benchmark_bootstrap,
+        "slices": benchmark_slices,
+        "compare": benchmark_compare,
+        "calibration": benchmark_calibration,
+        "predictions": benchmark_predictions,
+        "train": benchmark_train,
+        "external": benchmark_external,
+        "search": benchmark_search,
+        "cv": benchmark_cv,
+    }
+    summary = handlers[args.command](args)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -122,6 +122,18 @@ def pipeline_inline_policy(manifest: dict[str, Any], env: dict[str, str]) -> str
                 "Action": ["s3:GetObject", "s3:PutObject", "s3:AbortMultipartUpload"],
                 "Resource": [f"arn:aws:s3:::{bucket_name}/pipeline/runtime/*"],
             },
+            {
+                "Sid": "EvictPreprocessCache",
+                "Effect": "Allow",
+                "Action": ["s3:DeleteObject"],
+                "Resource": [f"arn:aws:s3:::{bucket_name}/pipeline/runtime/*/preprocess-cache/*"],
+            },
+            {
+                "Sid": "PruneTrainingCheckpoints",
+                "Effect": "Allow",
+                "Action": ["s3:DeleteObject"],
+                "Resource": [f"arn:aws:s3:::{bucket_name}/pipeline/runtime/*/checkpoints/*"],
+            },
             {
                 "Sid": "AllowCloudWatchLogs",
                 "Effect": "Allow",
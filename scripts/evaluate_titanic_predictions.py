@@ -1,14 +1,34 @@
 #!/usr/bin/env python3
 """
 Compute binary classification metrics from prediction scores and labels.
+
+Metrics come from pipeline/code/metrics.py, the same vectorized code evaluate.py uses,
+including ROC-AUC, PR-AUC, the best threshold and downsampled ROC/PR curves. Both files are
+parsed in bulk by formats.read_first_column, so batch-transform outputs with millions of lines
+never become Python lists.
 """
 
 from __future__ import annotations
 
 import argparse
 import json
+import sys
 from pathlib import Path
 
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / "pipeline" / "code"))
+
+from formats import read_first_column  # noqa: E402
+from metrics import (  # noqa: E402
+    DEFAULT_CURVE_POINTS,
+    THRESHOLD_METRICS,
+    classification_metrics,
+    confusion_matrix,
+    ranking_metrics,
+)
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Evaluate Titanic prediction scores.")
@@ -28,6 +48,18 @@ def parse_args() -> argparse.Namespace:
         default=0.5,
         help="Probability threshold used to turn scores into class predictions.",
     )
+    parser.add_argument(
+        "--optimize-metric",
+        choices=THRESHOLD_METRICS,
+        default="f1",
+        help="Metric maximized by best_threshold in the threshold sweep.",
+    )
+    parser.add_argument(
+        "--curve-points",
+        type=int,
+        default=DEFAULT_CURVE_POINTS,
+        help="Thresholds kept in the downsampled ROC/PR curves.",
+    )
     parser.add_argument(
         "--output",
         default="data/titanic/sagemaker/metrics.json",
@@ -36,78 +68,33 @@ def parse_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
-def read_first_column_as_float(path: Path) -> list[float]:
-    values: list[float] = []
-    with path.open("r", encoding="utf-8") as f:
-        for raw_line in f:
-            line = raw_line.strip()
-            if not line:
-                continue
-            first = line.split(",")[0].strip()
-            values.append(float(first))
-    if not values:
-        raise ValueError(f"No values found in file: {path}")
-    return values
-
-
-def read_first_column_as_int(path: Path) -> list[int]:
-    values: list[int] = []
-    with path.open("r", encoding="utf-8") as f:
-        for raw_line in f:
-            line = raw_line.strip()
-            if not line:
-                continue
-            first = line.split(",")[0].strip()
-            values.append(int(float(first)))
-    if not values:
-        raise ValueError(f"No values found in file: {path}")
-    return values
-
-
-def safe_div(num: float, den: float) -> float:
-    return num / den if den else 0.0
-
-
 def main() -> None:
     args = parse_args()
     predictions_path = Path(args.predictions)
     labels_path = Path(args.labels)
     output_path = Path(args.output)
 
-    scores = read_first_column_as_float(predictions_path)
-    labels = read_first_column_as_int(labels_path)
-
-    if len(scores) != len(labels):
+    scores = read_first_column(predictions_path)
+    labels = read_first_column(labels_path).astype(np.int64)
+    if scores.size != labels.size:
         raise ValueError(
-            f"Predictions/labels size mismatch: predictions={len(scores)} labels={len(labels)}"
+            f"{predictions_path} has {scores.size} scores but {labels_path} has "
+            f"{labels.size} labels; both files must have one value per row."
         )
 
-    tp = tn = fp = fn = 0
-    for score, label in zip(scores, labels):
-        pred = 1 if score >= args.threshold else 0
-        if pred == 1 and label == 1:
-            tp += 1
-        elif pred == 0 and label == 0:
-            tn += 1
-        elif pred == 1 and label == 0:
-            fp += 1
-        else:
-            fn += 1
-
-    total = len(labels)
-    accuracy = safe_div(tp + tn, total)
-    precision = safe_div(tp, tp + fp)
-    recall = safe_div(tp, tp + fn)
-    f1 = safe_div(2 * precision * recall, precision + recall)
+    confusion = confusion_matrix(labels, scores, threshold=args.threshold)
+    rates = classification_metrics(confusion)
+    ranking = ranking_metrics(labels, scores, args.optimize_metric, args.curve_points)
 
     metrics = {
-        "total": total,
+        "total": int(labels.size),
         "threshold": args.threshold,
-        "accuracy": accuracy,
-        "precision": precision,
-        "recall": recall,
-        "f1": f1,
-        "confusion_matrix": {"tp": tp, "tn": tn, "fp": fp, "fn": fn},
+        **rates,
+        "roc_auc": ranking["roc_auc"],
+        "pr_auc": ranking["pr_auc"],
+        "confusion_matrix": confusion,
+        "best_threshold": ranking["best_threshold"],
+        "curves": ranking["curves"],
     }
 
     output_path.parent.mkdir(parents=True, exist_ok=True)
@@ -115,10 +102,12 @@ def main() -> None:
 
     print(
         "Computed metrics:",
-        f"accuracy={accuracy:.4f}",
-        f"precision={precision:.4f}",
-        f"recall={recall:.4f}",
-        f"f1={f1:.4f}",
+        f"accuracy={rates['accuracy']:.4f}",
+        f"precision={rates['precision']:.4f}",
+        f"recall={rates['recall']:.4f}",
+        f"f1={rates['f1']:.4f}",
+        f"roc_auc={ranking['roc_auc']:.4f}",
+        f"best_{args.optimize_metric}_threshold={ranking['best_threshold']['threshold']:.4f}",
         f"output={output_path}",
     )
 
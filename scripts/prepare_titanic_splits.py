@@ -1,6 +1,13 @@
 #!/usr/bin/env python3
 """
 Create deterministic train/validation CSV splits from Titanic dataset.
+
+Two methods are available:
+- shuffle (default): loads every row, shuffles each `Survived` group with the seed and takes an
+  exact validation share per group.
+- hash: streams rows in one pass with O(1) memory. Each row goes to validation when a keyed hash
+  of (seed, Survived, PassengerId) falls below the ratio, so the split is stratified by label in
+  expectation, input order is kept, and appending rows never moves existing ones.
 """
 
 from __future__ import annotations
@@ -8,8 +15,18 @@ from __future__ import annotations
 import argparse
 import csv
 import random
+import sys
 from pathlib import Path
 
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / "pipeline" / "code"))
+
+from splits import split_hash_unit  # noqa: E402
+
+SPLIT_METHODS = ("shuffle", "hash")
+ID_COLUMN = "PassengerId"
+LABEL_COLUMN = "Survived"
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Prepare Titanic train/validation splits.")
@@ -40,9 +57,59 @@ def parse_args() -> argparse.Namespace:
         default=42,
         help="Random seed for deterministic splits.",
     )
+    parser.add_argument(
+        "--method",
+        choices=SPLIT_METHODS,
+        default="shuffle",
+        help="shuffle: exact per-label shares in memory; hash: one streaming pass.",
+    )
     return parser.parse_args()
 
 
+def split_streaming(
+    input_path: Path,
+    train_path: Path,
+    validation_path: Path,
+    validation_ratio: float,
+    seed: int,
+) -> tuple[int, int]:
+    train_count = validation_count = 0
+    with (
+        input_path.open("r", newline="", encoding="utf-8") as f,
+        train_path.open("w", newline="", encoding="utf-8") as f_train,
+        validation_path.open("w", newline="", encoding="utf-8") as f_val,
+    ):
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header:
+            raise ValueError("Input CSV has no headers.")
+        if LABEL_COLUMN not in header:
+            raise ValueError("Input CSV must include 'Survived' column.")
+        if ID_COLUMN not in header:
+            raise ValueError("Input CSV must include 'PassengerId' column for --method hash.")
+        label_index = header.index(LABEL_COLUMN)
+        id_index = header.index(ID_COLUMN)
+
+        train_writer = csv.writer(f_train, lineterminator="\n")
+        validation_writer = csv.writer(f_val, lineterminator="\n")
+        train_writer.writerow(header)
+        validation_writer.writerow(header)
+        for row in reader:
+            if not row:
+                continue
+            if len(row) <= max(label_index, id_index) or not row[id_index].strip():
+                raise ValueError(f"Row {reader.line_num} has no PassengerId or Survived value.")
+            # Pad short rows like csv.DictWriter does for missing fields.
+            row += [""] * (len(header) - len(row))
+            if split_hash_unit(seed, row[label_index], row[id_index]) < validation_ratio:
+                validation_writer.writerow(row)
+                validation_count += 1
+            else:
+                train_writer.writerow(row)
+                train_count += 1
+    return train_count, validation_count
+
+
 def main() -> None:
     args = parse_args()
 
@@ -56,6 +123,23 @@ def main() -> None:
     train_path.parent.mkdir(parents=True, exist_ok=True)
     validation_path.parent.mkdir(parents=True, exist_ok=True)
 
+    if args.method == "hash":
+        train_count, validation_count = split_streaming(
+            input_path,
+            train_path,
+            validation_path,
+            args.validation_ratio,
+            args.seed,
+        )
+        print(
+            "Created splits:",
+            f"train={train_count}",
+            f"validation={validation_count}",
+            f"total={train_count + validation_count}",
+            "method=hash",
+        )
+        return
+
     with input_path.open("r", newline="", encoding="utf-8") as f:
         reader = csv.DictReader(f)
         fieldnames = reader.fieldnames
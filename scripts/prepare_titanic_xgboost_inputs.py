@@ -7,13 +7,55 @@ Outputs are numeric-only CSV files without headers:
 - validation_xgb.csv: label + features
 - validation_features_xgb.csv: features only (for batch transform)
 - validation_labels.csv: label only (for offline metric calculation)
+
+Encoding is shared with pipeline/code/preprocess.py through pipeline/code/features.py.
+
+Use --streaming for inputs that do not fit in memory: fill statistics come from one pass over
+the train split and every output is written one fixed-size block at a time in a second pass.
+Rows are never held in memory; the exact fills keep one count per distinct Age and Fare value,
+so only --fill-estimator sketch bounds the fill statistics as well.
+
+Missing Age/Fare are imputed with a quantile of the train split (--fill-quantile, median by
+default), computed exactly or with a bounded-memory KLL sketch (--fill-estimator sketch).
+
+The fitted fills and category maps are saved to --preprocessor-output (preprocessor.json).
+Pass it back with --preprocessor to skip fitting, or together with --transform-input to encode
+new (possibly unlabeled) rows into a features-only CSV without reading the train split at all.
 """
 
 from __future__ import annotations
 
 import argparse
-import csv
+import sys
+from contextlib import ExitStack
 from pathlib import Path
+from typing import TextIO
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT / "pipeline" / "code"))
+
+from features import (  # noqa: E402
+    FEATURE_COLUMNS,
+    FILL_COLUMNS,
+    batch_rows,
+    fill_state_values,
+    fill_strategy,
+    fill_values,
+    fit_preprocessor,
+    iter_column_batches,
+    labels_from_columns,
+    new_fill_state,
+    preprocessor_fills,
+    read_columns,
+    read_preprocessor,
+    transform_columns,
+    update_fill_state,
+    write_csv_rows,
+    write_preprocessor,
+)
+from quantiles import DEFAULT_SKETCH_K, QUANTILE_ESTIMATORS  # noqa: E402
 
 
 def parse_args() -> argparse.Namespace:
@@ -44,117 +86,189 @@ def parse_args() -> argparse.Namespace:
         default="data/titanic/sagemaker/validation_labels.csv",
         help="Output CSV with validation labels only (for metric calculation).",
     )
+    parser.add_argument(
+        "--preprocessor-output",
+        default="data/titanic/sagemaker/preprocessor.json",
+        help="Where to save the fitted preprocessor (fills, category maps, schema version).",
+    )
+    parser.add_argument(
+        "--preprocessor",
+        help="Fitted preprocessor.json to transform with instead of fitting on the train split.",
+    )
+    parser.add_argument(
+        "--transform-input",
+        help="Transform-only mode: CSV to encode with --preprocessor (Survived is optional).",
+    )
+    parser.add_argument(
+        "--transform-output",
+        default="data/titanic/sagemaker/transform_features_xgb.csv",
+        help="Features-only CSV written in transform-only mode.",
+    )
+    parser.add_argument(
+        "--fill-quantile",
+        type=float,
+        default=0.5,
+        help="Quantile of the train split used to impute missing Age/Fare (default: median).",
+    )
+    parser.add_argument(
+        "--fill-estimator",
+        choices=QUANTILE_ESTIMATORS,
+        default="exact",
+        help=(
+            "exact: selection, or with --streaming one count per distinct Age/Fare value; "
+            "sketch: bounded-memory mergeable KLL sketch."
+        ),
+    )
+    parser.add_argument(
+        "--sketch-k",
+        type=int,
+        default=DEFAULT_SKETCH_K,
+        help="KLL sketch size for --fill-estimator sketch; rank error is about 1.65 / k.",
+    )
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help=(
+            "Bounded-memory mode: one pass over the train split for fill statistics and a second "
+            "pass that encodes and writes every output one fixed-size block at a time. Exact "
+            "fills still grow with the distinct Age/Fare values; add --fill-estimator sketch to "
+            "bound them too."
+        ),
+    )
     return parser.parse_args()
 
 
-def read_rows(path: Path) -> list[dict[str, str]]:
-    with path.open("r", newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        rows = list(reader)
+def write_outputs(path: Path, labels: np.ndarray | None, features: np.ndarray | None) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", newline="", encoding="utf-8") as f:
+        write_csv_rows(f, labels, features)
+
+
+def compute_fill_values_streaming(
+    path: Path,
+    strategy: dict[str, object],
+) -> tuple[float, float]:
+    state = new_fill_state(strategy)
+    rows = 0
+    with path.open("rb") as f:
+        for batch in iter_column_batches(f, columns=FILL_COLUMNS):
+            rows += batch_rows(batch)
+            update_fill_state(state, batch)
     if not rows:
         raise ValueError(f"Input CSV has no rows: {path}")
-    return rows
+    return fill_state_values(state, strategy)
 
 
-def parse_float(value: str | None) -> float | None:
-    if value is None:
-        return None
-    stripped = value.strip()
-    if not stripped:
-        return None
-    return float(stripped)
-
-
-def median(values: list[float]) -> float:
-    if not values:
-        return 0.0
-    sorted_values = sorted(values)
-    mid = len(sorted_values) // 2
-    if len(sorted_values) % 2 == 0:
-        return (sorted_values[mid - 1] + sorted_values[mid]) / 2.0
-    return sorted_values[mid]
-
-
-def to_int(value: str | None, default: int = 0) -> int:
-    if value is None:
-        return default
-    stripped = value.strip()
-    if not stripped:
-        return default
-    return int(float(stripped))
-
-
-def encode_features(row: dict[str, str], age_fill: float, fare_fill: float) -> list[float]:
-    sex_map = {"male": 0.0, "female": 1.0}
-    embarked_map = {"C": 0.0, "Q": 1.0, "S": 2.0}
-
-    pclass = float(to_int(row.get("Pclass"), default=3))
-    sex = sex_map.get((row.get("Sex") or "").strip().lower(), -1.0)
-    age = parse_float(row.get("Age"))
-    age = age_fill if age is None else age
-    sibsp = float(to_int(row.get("SibSp"), default=0))
-    parch = float(to_int(row.get("Parch"), default=0))
-    fare = parse_float(row.get("Fare"))
-    fare = fare_fill if fare is None else fare
-    embarked = embarked_map.get((row.get("Embarked") or "").strip().upper(), -1.0)
-
-    return [pclass, sex, age, sibsp, parch, fare, embarked]
-
-
-def label_from_row(row: dict[str, str]) -> int:
-    label_raw = row.get("Survived")
-    if label_raw is None:
-        raise ValueError("Missing 'Survived' column in row.")
-    return to_int(label_raw, default=0)
-
-
-def write_csv(path: Path, rows: list[list[float | int]]) -> None:
+def open_output(stack: ExitStack, path: Path) -> TextIO:
     path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f, lineterminator="\n")
-        writer.writerows(rows)
-
+    return stack.enter_context(path.open("w", newline="", encoding="utf-8"))
 
-def main() -> None:
-    args = parse_args()
 
+def prepare_streaming(
+    args: argparse.Namespace,
+    preprocessor: dict[str, object] | None,
+) -> tuple[int, int, dict[str, object]]:
     train_input = Path(args.train_input)
     validation_input = Path(args.validation_input)
 
-    train_rows = read_rows(train_input)
-    validation_rows = read_rows(validation_input)
-
-    train_ages = [v for v in (parse_float(r.get("Age")) for r in train_rows) if v is not None]
-    train_fares = [v for v in (parse_float(r.get("Fare")) for r in train_rows) if v is not None]
-    age_fill = median(train_ages)
-    fare_fill = median(train_fares)
-
-    train_encoded: list[list[float | int]] = []
-    validation_encoded: list[list[float | int]] = []
-    validation_features: list[list[float | int]] = []
-    validation_labels: list[list[float | int]] = []
-
-    for row in train_rows:
-        label = label_from_row(row)
-        features = encode_features(row, age_fill=age_fill, fare_fill=fare_fill)
-        train_encoded.append([label, *features])
+    if preprocessor is None:
+        strategy = fill_strategy(args.fill_quantile, args.fill_estimator, args.sketch_k)
+        fills = compute_fill_values_streaming(train_input, strategy)
+        preprocessor = fit_preprocessor(*fills, strategy)
+
+    train_count = 0
+    validation_count = 0
+    with ExitStack() as stack:
+        train_out = open_output(stack, Path(args.train_output))
+        validation_out = open_output(stack, Path(args.validation_output))
+        features_out = open_output(stack, Path(args.validation_features_output))
+        labels_out = open_output(stack, Path(args.validation_labels_output))
+
+        with train_input.open("rb") as f:
+            for batch in iter_column_batches(f):
+                labels = labels_from_columns(batch)
+                features = transform_columns(batch, preprocessor)
+                write_csv_rows(train_out, labels, features)
+                train_count += len(labels)
+
+        with validation_input.open("rb") as f:
+            for batch in iter_column_batches(f):
+                labels = labels_from_columns(batch)
+                features = transform_columns(batch, preprocessor)
+                write_csv_rows(validation_out, labels, features)
+                write_csv_rows(features_out, None, features)
+                write_csv_rows(labels_out, labels, None)
+                validation_count += len(labels)
+
+    # A loaded preprocessor skips the fill pass, which would otherwise reject an empty train split.
+    if not train_count:
+        raise ValueError(f"Input CSV has no rows: {train_input}")
+    if not validation_count:
+        raise ValueError(f"Input CSV has no rows: {validation_input}")
+    return train_count, validation_count, preprocessor
+
+
+def transform_only(input_path: Path, output_path: Path, preprocessor: dict[str, object]) -> int:
+    rows = 0
+    with ExitStack() as stack:
+        features_out = open_output(stack, output_path)
+        with input_path.open("rb") as f:
+            for batch in iter_column_batches(f, columns=FEATURE_COLUMNS):
+                features = transform_columns(batch, preprocessor)
+                write_csv_rows(features_out, None, features)
+                rows += len(features)
+    if not rows:
+        raise ValueError(f"Input CSV has no rows: {input_path}")
+    return rows
 
-    for row in validation_rows:
-        label = label_from_row(row)
-        features = encode_features(row, age_fill=age_fill, fare_fill=fare_fill)
-        validation_encoded.append([label, *features])
-        validation_features.append(features)
-        validation_labels.append([label])
 
-    write_csv(Path(args.train_output), train_encoded)
-    write_csv(Path(args.validation_output), validation_encoded)
-    write_csv(Path(args.validation_features_output), validation_features)
-    write_csv(Path(args.validation_labels_output), validation_labels)
+def main() -> None:
+    args = parse_args()
+    preprocessor = read_preprocessor(Path(args.preprocessor)) if args.preprocessor else None
+
+    if args.transform_input:
+        if preprocessor is None:
+            raise ValueError("--transform-input requires --preprocessor.")
+        rows = transform_only(Path(args.transform_input), Path(args.transform_output), preprocessor)
+        print("Transformed rows:", f"rows={rows}", f"output={args.transform_output}")
+        return
+
+    if args.streaming:
+        train_count, validation_count, preprocessor = prepare_streaming(args, preprocessor)
+        write_preprocessor(Path(args.preprocessor_output), preprocessor)
+        age_fill, fare_fill = preprocessor_fills(preprocessor)
+        print(
+            "Prepared XGBoost inputs (streaming):",
+            f"train={train_count}",
+            f"validation={validation_count}",
+            f"age_fill={age_fill:.4f}",
+            f"fare_fill={fare_fill:.4f}",
+        )
+        return
+
+    train_columns = read_columns(Path(args.train_input))
+    validation_columns = read_columns(Path(args.validation_input))
+
+    if preprocessor is None:
+        strategy = fill_strategy(args.fill_quantile, args.fill_estimator, args.sketch_k)
+        preprocessor = fit_preprocessor(*fill_values(train_columns, strategy), strategy)
+    age_fill, fare_fill = preprocessor_fills(preprocessor)
+
+    train_labels = labels_from_columns(train_columns)
+    train_features = transform_columns(train_columns, preprocessor)
+    validation_labels = labels_from_columns(validation_columns)
+    validation_features = transform_columns(validation_columns, preprocessor)
+
+    write_outputs(Path(args.train_output), train_labels, train_features)
+    write_outputs(Path(args.validation_output), validation_labels, validation_features)
+    write_outputs(Path(args.validation_features_output), None, validation_features)
+    write_outputs(Path(args.validation_labels_output), validation_labels, None)
+    write_preprocessor(Path(args.preprocessor_output), preprocessor)
 
     print(
         "Prepared XGBoost inputs:",
-        f"train={len(train_encoded)}",
-        f"validation={len(validation_encoded)}",
+        f"train={len(train_labels)}",
+        f"validation={len(validation_labels)}",
         f"age_fill={age_fill:.4f}",
         f"fare_fill={fare_fill:.4f}",
     )
@@ -11,6 +11,8 @@ EMIT_EXPORTS=0
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 REPO_ROOT="$(cd "${SCRIPT_DIR}/.." && pwd)"
 PIPELINE_CODE_DIR="${REPO_ROOT}/pipeline/code"
+# Modules imported by the entry scripts; mounted at /opt/ml/processing/input/shared.
+SHARED_MODULES=(features.py formats.py sharding.py cache.py s3io.py quantiles.py metrics.py)
 
 usage() {
   cat <<'EOF'
@@ -30,6 +32,7 @@ Outputs:
   - s3://<bucket>/<prefix>/<code-version>/pipeline_code.tar.gz
   - s3://<bucket>/<prefix>/scripts/preprocess.py
   - s3://<bucket>/<prefix>/scripts/evaluate.py
+  - s3://<bucket>/<prefix>/scripts/shared/<module>.py
 EOF
 }
 
@@ -109,6 +112,10 @@ validate_inputs() {
   [[ -d "${PIPELINE_CODE_DIR}" ]] || fatal "Missing directory ${PIPELINE_CODE_DIR}"
   [[ -f "${PIPELINE_CODE_DIR}/preprocess.py" ]] || fatal "Missing ${PIPELINE_CODE_DIR}/preprocess.py"
   [[ -f "${PIPELINE_CODE_DIR}/evaluate.py" ]] || fatal "Missing ${PIPELINE_CODE_DIR}/evaluate.py"
+  local module
+  for module in "${SHARED_MODULES[@]}"; do
+    [[ -f "${PIPELINE_CODE_DIR}/${module}" ]] || fatal "Missing ${PIPELINE_CODE_DIR}/${module}"
+  done
 }
 
 publish_artifacts() {
@@ -137,6 +144,12 @@ publish_artifacts() {
   log "Uploading evaluate.py to ${EVALUATE_SCRIPT_S3_URI}"
   aws_cmd s3 cp "${PIPELINE_CODE_DIR}/evaluate.py" "${EVALUATE_SCRIPT_S3_URI}" >/dev/null
 
+  local module
+  for module in "${SHARED_MODULES[@]}"; do
+    log "Uploading ${module} to s3://${BUCKET}/${PREFIX}/scripts/shared/${module}"
+    aws_cmd s3 cp "${PIPELINE_CODE_DIR}/${module}" "s3://${BUCKET}/${PREFIX}/scripts/shared/${module}" >/dev/null
+  done
+
   if [[ -f "${PIPELINE_CODE_DIR}/requirements.txt" ]]; then
     log "Uploading requirements.txt to s3://${BUCKET}/${PREFIX}/scripts/requirements.txt"
     aws_cmd s3 cp "${PIPELINE_CODE_DIR}/requirements.txt" "s3://${BUCKET}/${PREFIX}/scripts/requirements.txt" >/dev/null
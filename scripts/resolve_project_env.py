@@ -87,6 +87,8 @@ def build_env(manifest: dict[str, Any]) -> dict[str, str]:
         "TRAINING_IMAGE_URI": str(manifest["training_image_uri"]),
         "EVALUATION_IMAGE_URI": str(manifest["evaluation_image_uri"]),
         "QUALITY_THRESHOLD_ACCURACY": str(manifest["quality_threshold_accuracy"]),
+        # Optional: without it the quality gate does not check ROC-AUC.
+        "QUALITY_THRESHOLD_ROC_AUC": str(manifest.get("quality_threshold_roc_auc") or ""),
         "MODEL_APPROVAL_STATUS": str(manifest["model_approval_status"]),
         "SAGEMAKER_EXECUTION_ROLE_NAME": execution_role_name,
         "SAGEMAKER_EXECUTION_ROLE_ARN": f"arn:aws:iam::{account_id}:role/{execution_role_name}",
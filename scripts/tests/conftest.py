@@ -0,0 +1,11 @@
+"""Put scripts/ and the shared pipeline/code modules on the import path, as the scripts do."""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+for path in (REPO_ROOT / "scripts", REPO_ROOT / "pipeline" / "code"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import csv
+import math
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SCRIPT = REPO_ROOT / "scripts" / "prepare_titanic_splits.py"
+RAW_DATASET = REPO_ROOT / "data" / "titanic" / "raw" / "titanic.csv"
+
+
+def read_rows(path: Path) -> list[list[str]]:
+    with path.open("r", newline="", encoding="utf-8") as f:
+        return list(csv.reader(f))
+
+
+def write_passengers(path: Path, copies: int) -> list[list[str]]:
+    """The raw rows repeated `copies` times with fresh PassengerIds; returns header + rows."""
+    header, *source = read_rows(RAW_DATASET)
+    id_index = header.index("PassengerId")
+    rows = []
+    for _ in range(copies):
+        for row in source:
+            row = list(row)
+            row[id_index] = str(len(rows) + 1)
+            rows.append(row)
+    with path.open("w", newline="", encoding="utf-8") as f:
+        csv.writer(f, lineterminator="\n").writerows([header, *rows])
+    return [header, *rows]
+
+
+def split(tmp_path: Path, input_path: Path, name: str, *extra: str) -> tuple[list, list]:
+    """(train rows, validation rows) of a `--method hash` run, headers included."""
+    train, validation = tmp_path / f"{name}_train.csv", tmp_path / f"{name}_validation.csv"
+    subprocess.run(
+        [
+            sys.executable,
+            str(SCRIPT),
+            "--method",
+            "hash",
+            "--input",
+            str(input_path),
+            "--train-output",
+            str(train),
+            "--validation-output",
+            str(validation),
+            *extra,
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return read_rows(train), read_rows(validation)
+
+
+def test_hash_split_is_the_same_across_runs(tmp_path: Path) -> None:
+    first = split(tmp_path, RAW_DATASET, "first")
+    second = split(tmp_path, RAW_DATASET, "second")
+    assert first == second
+    assert len(first[0]) + len(first[1]) - 2 == len(read_rows(RAW_DATASET)) - 1
+    assert split(tmp_path, RAW_DATASET, "other_seed", "--seed", "7") != first
+
+
+def test_appended_rows_never_move_existing_ones(tmp_path: Path) -> None:
+    original = tmp_path / "original.csv"
+    rows = write_passengers(original, copies=1)[1:]
+    grown = tmp_path / "grown.csv"
+    grown_rows = write_passengers(grown, copies=3)[1:]
+    assert grown_rows[: len(rows)] == rows
+
+    before = split(tmp_path, original, "before")
+    after = split(tmp_path, grown, "after")
+    for old, new in zip(before, after):
+        # Input order is kept, so the old rows are exactly the head of each new output.
+        assert new[: len(old)] == old
+    assert sum(len(side) - 1 for side in after) == len(grown_rows)
+
+
+@pytest.mark.parametrize("ratio", [0.2, 0.35])
+def test_validation_share_per_label_is_near_the_ratio(tmp_path: Path, ratio: float) -> None:
+    source = tmp_path / "passengers.csv"
+    header, *rows = write_passengers(source, copies=20)
+    label_index = header.index("Survived")
+    _, validation = split(tmp_path, source, "split", "--validation-ratio", str(ratio))
+    for label in ("0", "1"):
+        total = sum(row[label_index] == label for row in rows)
+        held_out = sum(row[label_index] == label for row in validation[1:])
+        # Each row is an independent Bernoulli(ratio) draw; allow four standard deviations.
+        tolerance = 4 * math.sqrt(ratio * (1 - ratio) / total)
+        assert abs(held_out / total - ratio) < tolerance
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import csv
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SCRIPT = REPO_ROOT / "scripts" / "prepare_titanic_xgboost_inputs.py"
+SPLITS = REPO_ROOT / "data" / "titanic" / "splits"
+OUTPUTS = ("train", "validation", "features", "labels", "preprocessor")
+
+
+def run_script(*arguments: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, str(SCRIPT), *arguments], check=True, capture_output=True
+    )
+
+
+def prepare(output_dir: Path, *extra: str) -> dict[str, bytes]:
+    paths = {name: output_dir / f"{name}.out" for name in OUTPUTS}
+    run_script(
+        "--train-input",
+        str(SPLITS / "train.csv"),
+        "--validation-input",
+        str(SPLITS / "validation.csv"),
+        "--train-output",
+        str(paths["train"]),
+        "--validation-output",
+        str(paths["validation"]),
+        "--validation-features-output",
+        str(paths["features"]),
+        "--validation-labels-output",
+        str(paths["labels"]),
+        "--preprocessor-output",
+        str(paths["preprocessor"]),
+        *extra,
+    )
+    return {name: path.read_bytes() for name, path in paths.items()}
+
+
+@pytest.mark.parametrize("estimator", ["exact", "sketch"])
+def test_streaming_outputs_match_in_memory(tmp_path: Path, estimator: str) -> None:
+    (tmp_path / "memory").mkdir()
+    (tmp_path / "streaming").mkdir()
+    in_memory = prepare(tmp_path / "memory", "--fill-estimator", estimator)
+    streaming = prepare(tmp_path / "streaming", "--fill-estimator", estimator, "--streaming")
+    assert streaming == in_memory
+    assert in_memory["train"].count(b"\n") == 713
+    assert in_memory["labels"].count(b"\n") == 178
+
+
+def test_streaming_rejects_an_empty_validation_split(tmp_path: Path) -> None:
+    empty = tmp_path / "empty.csv"
+    empty.write_bytes((SPLITS / "validation.csv").read_bytes().split(b"\n", 1)[0] + b"\n")
+    with pytest.raises(subprocess.CalledProcessError) as error:
+        prepare(tmp_path, "--streaming", "--validation-input", str(empty))
+    assert b"Input CSV has no rows" in error.value.stderr
+
+
+@pytest.mark.parametrize("mode", [(), ("--streaming",)])
+def test_loaded_preprocessor_rejects_an_empty_train_split(tmp_path: Path, mode: tuple) -> None:
+    (tmp_path / "fit").mkdir()
+    preprocessor = tmp_path / "fit" / "preprocessor.out"
+    prepare(tmp_path / "fit")
+    empty = tmp_path / "empty.csv"
+    empty.write_bytes((SPLITS / "train.csv").read_bytes().split(b"\n", 1)[0] + b"\n")
+    with pytest.raises(subprocess.CalledProcessError) as error:
+        prepare(
+            tmp_path, *mode, "--preprocessor", str(preprocessor), "--train-input", str(empty)
+        )
+    assert b"Input CSV has no rows" in error.value.stderr
+
+
+def transform(tmp_path: Path, input_path: Path, preprocessor: Path) -> bytes:
+    output = tmp_path / "transform.out"
+    run_script(
+        "--transform-input",
+        str(input_path),
+        "--preprocessor",
+        str(preprocessor),
+        "--transform-output",
+        str(output),
+    )
+    return output.read_bytes()
+
+
+def write_without_label(source: Path, target: Path) -> Path:
+    with source.open("r", newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    fieldnames = [name for name in rows[0] if name != "Survived"]
+    with target.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(
+            f, fieldnames=fieldnames, extrasaction="ignore", lineterminator="\n"
+        )
+        writer.writeheader()
+        writer.writerows(rows)
+    return target
+
+
+@pytest.mark.parametrize("label", [True, False])
+def test_transform_only_reproduces_the_fitted_features(tmp_path: Path, label: bool) -> None:
+    (tmp_path / "fit").mkdir()
+    fitted = prepare(tmp_path / "fit", "--fill-estimator", "sketch")
+    source = SPLITS / "validation.csv"
+    if not label:
+        source = write_without_label(source, tmp_path / "unlabeled.csv")
+    features = transform(tmp_path, source, tmp_path / "fit" / "preprocessor.out")
+    assert features == fitted["features"]
+
+
+def test_transform_only_rejects_an_empty_input(tmp_path: Path) -> None:
+    (tmp_path / "fit").mkdir()
+    prepare(tmp_path / "fit")
+    empty = tmp_path / "empty.csv"
+    empty.write_bytes((SPLITS / "validation.csv").read_bytes().split(b"\n", 1)[0] + b"\n")
+    with pytest.raises(subprocess.CalledProcessError) as error:
+        transform(tmp_path, empty, tmp_path / "fit" / "preprocessor.out")
+    assert b"Input CSV has no rows" in error.value.stderr
+
+
+def test_preprocessor_of_another_schema_version_is_rejected(tmp_path: Path) -> None:
+    (tmp_path / "fit").mkdir()
+    preprocessor = tmp_path / "fit" / "preprocessor.out"
+    prepare(tmp_path / "fit")
+    payload = json.loads(preprocessor.read_text(encoding="utf-8"))
+    payload["schema_version"] += 1
+    preprocessor.write_text(json.dumps(payload), encoding="utf-8")
+    with pytest.raises(subprocess.CalledProcessError) as error:
+        transform(tmp_path, SPLITS / "validation.csv", preprocessor)
+    assert b"Unsupported preprocessor schema_version" in error.value.stderr
@@ -5,10 +5,20 @@ from __future__ import annotations
 
 import argparse
 import json
+import sys
 
 import boto3
 
-from resolve_project_env import build_env, load_manifest
+from resolve_project_env import REPO_ROOT, build_env, load_manifest
+
+sys.path.insert(0, str(REPO_ROOT / "pipeline" / "code"))
+
+from formats import OUTPUT_FORMATS, channel_file_name, content_type  # noqa: E402
+from metrics import MODEL_METRICS  # noqa: E402
+
+PREPROCESS_INPUT_MODES = ("script", "Pipe", "File")
+TRAINING_MAX_RUNTIME_SECONDS = 3600
+CHECKPOINT_LOCAL_PATH = "/opt/ml/checkpoints"
 
 
 def build_boto_session(env: dict[str, str]) -> boto3.Session:
@@ -20,6 +30,23 @@ def build_boto_session(env: dict[str, str]) -> boto3.Session:
     return boto3.Session(region_name=region)
 
 
+def resolve_approved_model_data_url(boto_session: boto3.Session, group_name: str) -> str | None:
+    """ModelDataUrl of the newest Approved package in the model package group, if any."""
+    sm_client = boto_session.client("sagemaker")
+    response = sm_client.list_model_packages(
+        ModelPackageGroupName=group_name,
+        ModelApprovalStatus="Approved",
+        SortBy="CreationTime",
+        SortOrder="Descending",
+        MaxResults=1,
+    )
+    summaries = response.get("ModelPackageSummaryList", [])
+    if not summaries:
+        return None
+    package = sm_client.describe_model_package(ModelPackageName=summaries[0]["ModelPackageArn"])
+    return package["InferenceSpecification"]["Containers"][0]["ModelDataUrl"]
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser()
     parser.add_argument("--manifest", help="Path to config/project-manifest.json")
@@ -27,9 +54,208 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--input-train-uri")
     parser.add_argument("--input-validation-uri")
     parser.add_argument("--accuracy-threshold", type=float)
+    parser.add_argument(
+        "--roc-auc-threshold",
+        type=float,
+        help="Gate on ROC-AUC too (default: quality_threshold_roc_auc, if the manifest has it).",
+    )
     parser.add_argument("--approval-status")
     parser.add_argument("--definition-only", action="store_true")
-    return parser.parse_args()
+    parser.add_argument(
+        "--output-format",
+        choices=OUTPUT_FORMATS,
+        default="csv",
+        help=(
+            "Format of the DataPreProcessing training channels (see pipeline/code/formats.py); "
+            "dmatrix runs DataPreProcessing in the XGBoost training image."
+        ),
+    )
+    parser.add_argument(
+        "--preprocessor-uri",
+        help=(
+            "S3 URI of a fitted preprocessor.json; DataPreProcessing then transforms with it "
+            "instead of refitting fills on the train split."
+        ),
+    )
+    parser.add_argument(
+        "--preprocess-cache",
+        action="store_true",
+        help="Reuse DataPreProcessing outputs from a content-addressed cache (runtime prefix).",
+    )
+    parser.add_argument(
+        "--preprocess-cache-max-gb",
+        type=float,
+        default=10.0,
+        help="Size budget of the preprocess output cache before LRU eviction.",
+    )
+    parser.add_argument(
+        "--preprocess-input-mode",
+        choices=PREPROCESS_INPUT_MODES,
+        default="script",
+        help=(
+            "How DataPreProcessing gets its inputs. script (streams): preprocess.py reads them "
+            "with concurrent ranged S3 GETs. Pipe (streams): SageMaker feeds each input object "
+            "into a FIFO that preprocess.py parses as bytes arrive; the input URIs must each name "
+            "one object. File (does not stream): SageMaker downloads every object under each "
+            "prefix before the container starts, then they are read as one CSV."
+        ),
+    )
+    parser.add_argument(
+        "--preprocess-instance-type",
+        default="ml.m5.large",
+        help="Instance type of the DataPreProcessing job.",
+    )
+    parser.add_argument(
+        "--preprocess-instance-count",
+        type=int,
+        default=1,
+        help="Instances of the DataPreProcessing job; each host encodes its own shards.",
+    )
+    parser.add_argument(
+        "--preprocess-shards",
+        type=int,
+        default=1,
+        help="Byte-range shards per input; >1 writes part files into each channel prefix.",
+    )
+    parser.add_argument(
+        "--evaluation-chunk-rows",
+        type=int,
+        default=0,
+        help="Stream the validation channel through ModelEvaluation in blocks of this many rows.",
+    )
+    parser.add_argument(
+        "--evaluation-nthread",
+        type=int,
+        default=0,
+        help="Prediction threads in ModelEvaluation (0: every core of the processing instance).",
+    )
+    parser.add_argument(
+        "--preprocess-fill-quantile",
+        type=float,
+        default=0.5,
+        help="Train-split quantile used to impute missing Age/Fare (default: median).",
+    )
+    parser.add_argument(
+        "--preprocess-fill-estimator",
+        choices=("exact", "sketch"),
+        default="exact",
+        help="exact fills, or a bounded-memory KLL sketch merged across shards.",
+    )
+    parser.add_argument(
+        "--evaluation-bootstrap-replicates",
+        type=int,
+        default=0,
+        help="Bootstrap replicates for metric confidence intervals in ModelEvaluation.",
+    )
+    parser.add_argument(
+        "--evaluation-slice-columns",
+        nargs="*",
+        default=["Pclass", "Sex", "Embarked"],
+        help="Cohorts reported under slices in evaluation.json (see evaluate.py --slice-columns).",
+    )
+    parser.add_argument(
+        "--champion-model-data-url",
+        default=None,
+        help="model.tar.gz of the champion model that ModelEvaluation compares the candidate with.",
+    )
+    parser.add_argument(
+        "--compare-approved-champion",
+        action="store_true",
+        help="Use the newest Approved package of the model package group as the champion.",
+    )
+    parser.add_argument(
+        "--champion-metric",
+        choices=MODEL_METRICS,
+        default="roc_auc",
+        help="Metric whose candidate-minus-champion delta the quality gate checks.",
+    )
+    parser.add_argument(
+        "--champion-min-delta",
+        type=float,
+        default=0.0,
+        help="Minimum candidate-minus-champion delta (negative tolerates a small regression).",
+    )
+    parser.add_argument(
+        "--training-mode",
+        choices=("builtin", "script"),
+        default="builtin",
+        help=(
+            "builtin runs the XGBoost container's own trainer; script runs pipeline/code/train.py "
+            "from the code bundle in the same image (hist, binary DMatrix cache)."
+        ),
+    )
+    parser.add_argument(
+        "--training-early-stopping-rounds",
+        type=int,
+        default=0,
+        help="Early stopping on the validation channel (script training mode only).",
+    )
+    parser.add_argument(
+        "--training-data-mode",
+        choices=("memory", "quantile", "external"),
+        default="memory",
+        help="How train.py holds the channels (script training mode only; see train.py).",
+    )
+    parser.add_argument(
+        "--training-checkpoints",
+        action="store_true",
+        help=(
+            "Sync /opt/ml/checkpoints of TrainModel to S3, so a restarted job resumes from the "
+            "newest checkpoint of its pipeline execution."
+        ),
+    )
+    parser.add_argument(
+        "--training-checkpoint-interval",
+        type=int,
+        default=10,
+        help="Rounds between train.py checkpoints (script training mode).",
+    )
+    parser.add_argument(
+        "--training-checkpoint-keep",
+        type=int,
+        default=3,
+        help="Newest checkpoints train.py keeps (script training mode).",
+    )
+    parser.add_argument(
+        "--training-spot",
+        action="store_true",
+        help="Run TrainModel on managed spot capacity (needs --training-checkpoints).",
+    )
+    parser.add_argument(
+        "--training-spot-max-wait-seconds",
+        type=int,
+        default=2 * TRAINING_MAX_RUNTIME_SECONDS,
+        help="Spot capacity wait plus run time allowed for TrainModel (at least its max runtime).",
+    )
+    parser.add_argument(
+        "--quality-gate-bound",
+        choices=("point", "lower"),
+        default="point",
+        help="Gate on the point metrics or on their bootstrap lower bounds.",
+    )
+    args = parser.parse_args()
+    if args.training_early_stopping_rounds and args.training_mode != "script":
+        parser.error("--training-early-stopping-rounds needs --training-mode script.")
+    if args.training_data_mode != "memory" and args.training_mode != "script":
+        parser.error("--training-data-mode needs --training-mode script.")
+    if args.training_checkpoint_interval < 1 or args.training_checkpoint_keep < 1:
+        parser.error("--training-checkpoint-interval and --training-checkpoint-keep must be >= 1.")
+    if args.training_spot and not args.training_checkpoints:
+        parser.error("--training-spot needs --training-checkpoints to survive interruptions.")
+    if args.training_spot and args.training_spot_max_wait_seconds < TRAINING_MAX_RUNTIME_SECONDS:
+        parser.error(
+            f"--training-spot-max-wait-seconds must be >= {TRAINING_MAX_RUNTIME_SECONDS}, the "
+            "TrainModel max runtime."
+        )
+    has_champion = args.champion_model_data_url or args.compare_approved_champion
+    binned_metric = args.champion_metric in ("roc_auc", "pr_auc")
+    if args.evaluation_chunk_rows and has_champion and binned_metric:
+        parser.error(
+            "--evaluation-chunk-rows only reports binned AUCs; pick a threshold --champion-metric."
+        )
+    if args.quality_gate_bound == "lower" and not args.evaluation_bootstrap_replicates:
+        parser.error("--quality-gate-bound lower needs --evaluation-bootstrap-replicates > 0.")
+    return args
 
 
 def build_pipeline(args: argparse.Namespace):
@@ -45,6 +271,7 @@ def build_pipeline(args: argparse.Namespace):
     )
     from sagemaker.core.workflow import (
         ConditionGreaterThanOrEqualTo,
+        ExecutionVariables,
         Join,
         JsonGet,
         ParameterFloat,
@@ -58,7 +285,13 @@ def build_pipeline(args: argparse.Namespace):
     from sagemaker.mlops.workflow.steps import CacheConfig, ProcessingStep, TrainingStep
     from sagemaker.serve.model_builder import ModelBuilder
     from sagemaker.train import ModelTrainer
-    from sagemaker.train.configs import Compute, InputData
+    from sagemaker.train.configs import (
+        CheckpointConfig,
+        Compute,
+        InputData,
+        SourceCode,
+        StoppingCondition,
+    )
 
     manifest = load_manifest(args.manifest)
     env = build_env(manifest)
@@ -70,7 +303,25 @@ def build_pipeline(args: argparse.Namespace):
         if args.accuracy_threshold is not None
         else float(env["QUALITY_THRESHOLD_ACCURACY"])
     )
+    # The ROC-AUC condition is opt-in: only an explicit threshold adds it to the quality gate.
+    roc_auc_default = args.roc_auc_threshold
+    if roc_auc_default is None and env["QUALITY_THRESHOLD_ROC_AUC"]:
+        roc_auc_default = float(env["QUALITY_THRESHOLD_ROC_AUC"])
+    if roc_auc_default is not None and args.evaluation_chunk_rows:
+        raise ValueError(
+            "A ROC-AUC quality gate needs the exact AUC; --evaluation-chunk-rows only reports "
+            "a binned one."
+        )
     approval_status = args.approval_status or env["MODEL_APPROVAL_STATUS"]
+    # train.py reads any format; only the built-in container needs a channel content type.
+    channel_content_type = None
+    if args.training_mode != "script":
+        channel_content_type = content_type(args.output_format)
+    sharded = args.preprocess_shards > 1 or args.preprocess_instance_count > 1
+    # Sharded channels are prefixes of part files; evaluate.py reads the whole directory.
+    validation_path = "/opt/ml/processing/validation"
+    if not sharded:
+        validation_path += "/" + channel_file_name("validation_xgb", args.output_format)
 
     boto_session = build_boto_session(env)
     pipeline_session = PipelineSession(
@@ -80,6 +331,14 @@ def build_pipeline(args: argparse.Namespace):
     )
     _ = Session(boto_session=boto_session, default_bucket=env["DATA_BUCKET"])
 
+    champion_url = args.champion_model_data_url
+    if champion_url is None and args.compare_approved_champion:
+        champion_url = resolve_approved_model_data_url(
+            boto_session, env["MODEL_PACKAGE_GROUP_NAME"]
+        )
+        if champion_url is None:
+            print("No Approved model package yet; the pipeline runs without a champion.")
+
     code_bundle_uri = ParameterString(
         name="CodeBundleUri",
         default_value=args.code_bundle_uri,
@@ -96,24 +355,106 @@ def build_pipeline(args: argparse.Namespace):
         name="AccuracyThreshold",
         default_value=accuracy_default,
     )
+    threshold_parameters = [accuracy_threshold]
+    roc_auc_arguments = []
+    if roc_auc_default is not None:
+        roc_auc_threshold = ParameterFloat(
+            name="RocAucThreshold",
+            default_value=roc_auc_default,
+        )
+        threshold_parameters.append(roc_auc_threshold)
+        roc_auc_arguments = ["--roc-auc-threshold", roc_auc_threshold]
+    champion_parameters = []
+    if champion_url:
+        champion_model_uri = ParameterString(name="ChampionModelUri", default_value=champion_url)
+        champion_min_delta = ParameterFloat(
+            name="ChampionMinDelta",
+            default_value=args.champion_min_delta,
+        )
+        champion_parameters = [champion_model_uri, champion_min_delta]
 
     cache_config = CacheConfig(enable_caching=True, expire_after="P30D")
     preprocess_script_uri = f"s3://{env['DATA_BUCKET']}/{env['CODE_S3_PREFIX']}/scripts/preprocess.py"
     evaluate_script_uri = f"s3://{env['DATA_BUCKET']}/{env['CODE_S3_PREFIX']}/scripts/evaluate.py"
+    shared_code_uri = f"s3://{env['DATA_BUCKET']}/{env['CODE_S3_PREFIX']}/scripts/shared"
     runtime_root = f"s3://{env['DATA_BUCKET']}/{env['PIPELINE_RUNTIME_S3_PREFIX']}"
+    shared_code_input = ProcessingInput(
+        input_name="shared",
+        s3_input=ProcessingS3Input(
+            s3_uri=shared_code_uri,
+            local_path="/opt/ml/processing/input/shared",
+            s3_data_type="S3Prefix",
+            s3_input_mode="File",
+            s3_data_distribution_type="FullyReplicated",
+        ),
+    )
+
+    preprocess_inputs = [shared_code_input]
+    preprocess_input_paths = {"train": input_train_uri, "validation": input_validation_uri}
+    if args.preprocess_input_mode != "script":
+        # preprocess.py lists local_path for the File-mode files or the Pipe-mode FIFO, so it
+        # never depends on the name SageMaker gives the FIFO. Pipe concatenates every object
+        # under the prefix into one stream, which is why Pipe inputs must name a single object.
+        for name, source_uri in list(preprocess_input_paths.items()):
+            local_path = f"/opt/ml/processing/input/{name}"
+            preprocess_inputs.append(
+                ProcessingInput(
+                    input_name=name,
+                    s3_input=ProcessingS3Input(
+                        s3_uri=source_uri,
+                        local_path=local_path,
+                        s3_data_type="S3Prefix",
+                        s3_input_mode=args.preprocess_input_mode,
+                        s3_data_distribution_type="FullyReplicated",
+                    ),
+                )
+            )
+            preprocess_input_paths[name] = local_path
+
+    preprocess_arguments = [
+        "--input-train-uri",
+        preprocess_input_paths["train"],
+        "--input-validation-uri",
+        preprocess_input_paths["validation"],
+        "--code-bundle-uri",
+        code_bundle_uri,
+        "--output-format",
+        args.output_format,
+        "--shards",
+        str(args.preprocess_shards),
+        "--fill-quantile",
+        str(args.preprocess_fill_quantile),
+        "--fill-estimator",
+        args.preprocess_fill_estimator,
+    ]
+    if args.preprocessor_uri:
+        preprocess_arguments += ["--preprocessor-uri", args.preprocessor_uri]
+    if args.preprocess_cache:
+        preprocess_arguments += [
+            "--cache-uri",
+            f"{runtime_root}/preprocess-cache",
+            "--cache-max-gb",
+            str(args.preprocess_cache_max_gb),
+        ]
 
+    # The scikit-learn processing image has no xgboost. dmatrix buffers are written in the
+    # training image instead, with the same XGBoost version that loads them in TrainModel.
+    preprocess_image_uri = env["PROCESSING_IMAGE_URI"]
+    if args.output_format == "dmatrix":
+        preprocess_image_uri = env["TRAINING_IMAGE_URI"]
     preprocess_processor = ScriptProcessor(
         role=env["SAGEMAKER_PIPELINE_ROLE_ARN"],
-        image_uri=env["PROCESSING_IMAGE_URI"],
+        image_uri=preprocess_image_uri,
         command=["python3"],
-        instance_count=1,
-        instance_type="ml.m5.large",
+        instance_count=args.preprocess_instance_count,
+        instance_type=args.preprocess_instance_type,
         volume_size_in_gb=30,
         base_job_name=f"{env['PIPELINE_NAME']}-preprocess",
         sagemaker_session=pipeline_session,
     )
     preprocess_args = preprocess_processor.run(
         code=preprocess_script_uri,
+        inputs=preprocess_inputs,
         outputs=[
             ProcessingOutput(
                 output_name="train",
@@ -131,15 +472,16 @@ def build_pipeline(args: argparse.Namespace):
                     s3_upload_mode="EndOfJob",
                 ),
             ),
+            ProcessingOutput(
+                output_name="preprocessor",
+                s3_output=ProcessingS3Output(
+                    s3_uri=f"{runtime_root}/preprocess/preprocessor",
+                    local_path="/opt/ml/processing/output/preprocessor",
+                    s3_upload_mode="EndOfJob",
+                ),
+            ),
         ],
-        arguments=[
-            "--input-train-uri",
-            input_train_uri,
-            "--input-validation-uri",
-            input_validation_uri,
-            "--code-bundle-uri",
-            code_bundle_uri,
-        ],
+        arguments=preprocess_arguments,
     )
     step_preprocess = ProcessingStep(
         name="DataPreProcessing",
@@ -147,41 +489,83 @@ def build_pipeline(args: argparse.Namespace):
         cache_config=cache_config,
     )
 
+    hyperparameters = {
+        "objective": "binary:logistic",
+        "num_round": 200,
+        "max_depth": 5,
+        "eta": 0.2,
+        "subsample": 0.8,
+        "eval_metric": "logloss",
+    }
+    source_code = None
+    if args.training_mode == "script":
+        # train.py reads these from hyperparameters.json with the built-in key names.
+        hyperparameters.update(
+            {
+                "format": args.output_format,
+                "tree_method": "hist",
+                "early_stopping_rounds": args.training_early_stopping_rounds,
+                "data_mode": args.training_data_mode,
+            }
+        )
+        if args.training_checkpoints:
+            hyperparameters["checkpoint_interval"] = args.training_checkpoint_interval
+            hyperparameters["checkpoint_keep"] = args.training_checkpoint_keep
+        # publish_pipeline_code.sh tars the pipeline/code directory itself, hence the code/ prefix.
+        source_code = SourceCode(source_dir=args.code_bundle_uri, entry_script="code/train.py")
+
+    checkpoint_config = None
+    if args.training_checkpoints:
+        # One prefix per execution: a job restarted after a spot interruption resumes its own
+        # run, and a new execution never starts from another one's model. The built-in container
+        # checkpoints there on its own; train.py does every --training-checkpoint-interval rounds.
+        checkpoint_config = CheckpointConfig(
+            s3_uri=Join(
+                on="/",
+                values=[f"{runtime_root}/checkpoints", ExecutionVariables.PIPELINE_EXECUTION_ID],
+            ),
+            local_path=CHECKPOINT_LOCAL_PATH,
+        )
+    stopping_condition = None
+    if args.training_spot:
+        # Managed spot needs a max wait (queueing plus running) of at least the max runtime.
+        stopping_condition = StoppingCondition(
+            max_runtime_in_seconds=TRAINING_MAX_RUNTIME_SECONDS,
+            max_wait_time_in_seconds=args.training_spot_max_wait_seconds,
+        )
+
     model_trainer = ModelTrainer(
         training_image=env["TRAINING_IMAGE_URI"],
+        source_code=source_code,
         compute=Compute(
             instance_type="ml.m5.large",
             instance_count=1,
             volume_size_in_gb=30,
+            enable_managed_spot_training=args.training_spot,
         ),
+        checkpoint_config=checkpoint_config,
+        stopping_condition=stopping_condition,
         base_job_name=f"{env['PIPELINE_NAME']}-train",
         sagemaker_session=pipeline_session,
         role=env["SAGEMAKER_PIPELINE_ROLE_ARN"],
         output_data_config=shapes.OutputDataConfig(
             s3_output_path=f"{runtime_root}/training",
         ),
-        hyperparameters={
-            "objective": "binary:logistic",
-            "num_round": 200,
-            "max_depth": 5,
-            "eta": 0.2,
-            "subsample": 0.8,
-            "eval_metric": "logloss",
-        },
+        hyperparameters=hyperparameters,
         input_data_config=[
             InputData(
                 channel_name="train",
                 data_source=step_preprocess.properties.ProcessingOutputConfig.Outputs[
                     "train"
                 ].S3Output.S3Uri,
-                content_type="text/csv",
+                content_type=channel_content_type,
             ),
             InputData(
                 channel_name="validation",
                 data_source=step_preprocess.properties.ProcessingOutputConfig.Outputs[
                     "validation"
                 ].S3Output.S3Uri,
-                content_type="text/csv",
+                content_type=channel_content_type,
             ),
         ],
     )
@@ -207,9 +591,32 @@ def build_pipeline(args: argparse.Namespace):
         base_job_name=f"{env['PIPELINE_NAME']}-evaluate",
         sagemaker_session=pipeline_session,
     )
+    champion_inputs = []
+    champion_arguments = []
+    if champion_url:
+        champion_inputs.append(
+            ProcessingInput(
+                input_name="champion",
+                s3_input=ProcessingS3Input(
+                    s3_uri=champion_model_uri,
+                    local_path="/opt/ml/processing/champion",
+                    s3_data_type="S3Prefix",
+                    s3_input_mode="File",
+                    s3_data_distribution_type="FullyReplicated",
+                ),
+            )
+        )
+        # evaluate.py picks the single *.tar.gz in the directory, whatever ChampionModelUri
+        # names it at run time.
+        champion_arguments = ["--compare-models", "champion=/opt/ml/processing/champion"]
+    # dmatrix buffers do not expose the feature values that slices group rows by.
+    slice_arguments = []
+    if args.output_format != "dmatrix" and args.evaluation_slice_columns:
+        slice_arguments = ["--slice-columns", *args.evaluation_slice_columns]
     evaluation_args = evaluation_processor.run(
         code=evaluate_script_uri,
         inputs=[
+            shared_code_input,
             ProcessingInput(
                 input_name="model",
                 s3_input=ProcessingS3Input(
@@ -232,6 +639,7 @@ def build_pipeline(args: argparse.Namespace):
                     s3_data_distribution_type="FullyReplicated",
                 ),
             ),
+            *champion_inputs,
         ],
         outputs=[
             ProcessingOutput(
@@ -247,9 +655,22 @@ def build_pipeline(args: argparse.Namespace):
             "--model-artifact",
             "/opt/ml/processing/model/model.tar.gz",
             "--validation",
-            "/opt/ml/processing/validation/validation_xgb.csv",
+            validation_path,
+            "--validation-format",
+            args.output_format,
             "--accuracy-threshold",
             accuracy_threshold,
+            *roc_auc_arguments,
+            "--chunk-rows",
+            str(args.evaluation_chunk_rows),
+            "--nthread",
+            str(args.evaluation_nthread),
+            "--bootstrap-replicates",
+            str(args.evaluation_bootstrap_replicates),
+            "--gate-bound",
+            args.quality_gate_bound,
+            *slice_arguments,
+            *champion_arguments,
         ],
     )
     step_evaluation = ProcessingStep(
@@ -290,6 +711,39 @@ def build_pipeline(args: argparse.Namespace):
             skip_model_validation="None",
         ),
     )
+    # evaluate.py writes the bootstrap lower bounds under bootstrap.intervals.<metric>.lower.
+    gate_paths = {
+        name: (
+            f"bootstrap.intervals.{name}.lower"
+            if args.quality_gate_bound == "lower"
+            else f"metrics.{name}"
+        )
+        for name in ("accuracy", "roc_auc")
+    }
+    gate_conditions = []
+    if roc_auc_default is not None:
+        gate_conditions.append(
+            ConditionGreaterThanOrEqualTo(
+                left=JsonGet(
+                    step_name=step_evaluation.name,
+                    property_file=evaluation_property_file,
+                    json_path=gate_paths["roc_auc"],
+                ),
+                right=roc_auc_threshold,
+            )
+        )
+    if champion_url:
+        # evaluate.py writes candidate minus champion under comparison.deltas.champion.
+        gate_conditions.append(
+            ConditionGreaterThanOrEqualTo(
+                left=JsonGet(
+                    step_name=step_evaluation.name,
+                    property_file=evaluation_property_file,
+                    json_path=f"comparison.deltas.champion.{args.champion_metric}",
+                ),
+                right=champion_min_delta,
+            )
+        )
     quality_gate = ConditionStep(
         name="QualityGateAccuracy",
         conditions=[
@@ -297,10 +751,11 @@ def build_pipeline(args: argparse.Namespace):
                 left=JsonGet(
                     step_name=step_evaluation.name,
                     property_file=evaluation_property_file,
-                    json_path="metrics.accuracy",
+                    json_path=gate_paths["accuracy"],
                 ),
                 right=accuracy_threshold,
-            )
+            ),
+            *gate_conditions,
         ],
         if_steps=[register_step],
         else_steps=[],
@@ -312,7 +767,8 @@ def build_pipeline(args: argparse.Namespace):
             code_bundle_uri,
             input_train_uri,
             input_validation_uri,
-            accuracy_threshold,
+            *threshold_parameters,
+            *champion_parameters,
         ],
         steps=[
             step_preprocess,